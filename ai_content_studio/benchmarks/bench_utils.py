@@ -0,0 +1,262 @@
+"""
+Benchmark Utilities - Shared helpers for the performance benchmark scripts
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Add src to path
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+# SD 1.5 configs/tokenizer shipped in models/3d_cache (no weights needed)
+LOCAL_SD15_REPO = BASE_DIR / "models" / "3d_cache" / "models--runwayml--stable-diffusion-v1-5"
+
+BENCH_PROMPT = "a ceramic coffee mug on a wooden table, studio lighting"
+BENCH_NEGATIVE = "blurry, low quality"
+
+
+def local_sd15_snapshot() -> Path:
+    """Get the local SD 1.5 snapshot directory"""
+    snapshots = sorted((LOCAL_SD15_REPO / "snapshots").iterdir())
+    if not snapshots:
+        raise FileNotFoundError(f"No SD 1.5 snapshot found under {LOCAL_SD15_REPO}")
+    return snapshots[0]
+
+
+def build_tiny_pipeline(sample_size: int = 64, seed: int = 0):
+    """
+    Build a small randomly-initialized SD 1.5-style pipeline from local files
+
+    Uses the tokenizer and scheduler config from the local SD 1.5 snapshot and
+    shrunken UNet/VAE/text-encoder configs, so benchmarks run offline in seconds.
+    Images are noise, but relative timings and similarity deltas are meaningful.
+
+    Args:
+        sample_size: Latent size (image size = sample_size * 2 for this 2-block VAE)
+        seed: Seed for the random weights
+
+    Returns:
+        StableDiffusionPipeline on CPU in float32
+    """
+    from diffusers import (
+        StableDiffusionPipeline, UNet2DConditionModel, AutoencoderKL,
+        DPMSolverMultistepScheduler
+    )
+    from transformers import CLIPTextConfig, CLIPTextModel, CLIPTokenizer
+
+    snapshot = local_sd15_snapshot()
+    torch.manual_seed(seed)
+
+    unet = UNet2DConditionModel(
+        block_out_channels=(64, 128),
+        layers_per_block=2,
+        sample_size=sample_size,
+        in_channels=4,
+        out_channels=4,
+        down_block_types=("DownBlock2D", "CrossAttnDownBlock2D"),
+        up_block_types=("CrossAttnUpBlock2D", "UpBlock2D"),
+        cross_attention_dim=64,
+        attention_head_dim=8,
+    )
+    vae = AutoencoderKL(
+        block_out_channels=[32, 64],
+        in_channels=3,
+        out_channels=3,
+        down_block_types=["DownEncoderBlock2D", "DownEncoderBlock2D"],
+        up_block_types=["UpDecoderBlock2D", "UpDecoderBlock2D"],
+        latent_channels=4,
+        sample_size=sample_size * 2,
+    )
+    tokenizer = CLIPTokenizer.from_pretrained(snapshot / "tokenizer")
+    text_encoder = CLIPTextModel(CLIPTextConfig(
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+        hidden_size=64,
+        intermediate_size=128,
+        num_attention_heads=4,
+        num_hidden_layers=4,
+        vocab_size=tokenizer.vocab_size,
+    ))
+    scheduler = DPMSolverMultistepScheduler.from_pretrained(snapshot / "scheduler")
+
+    pipe = StableDiffusionPipeline(
+        unet=unet,
+        vae=vae,
+        text_encoder=text_encoder,
+        tokenizer=tokenizer,
+        scheduler=scheduler,
+        safety_checker=None,
+        feature_extractor=None,
+        requires_safety_checker=False,
+    )
+    pipe.set_progress_bar_config(disable=True)
+    return pipe.to("cpu")
+
+
+def tiny_model_dir(sample_size: int = 64) -> Path:
+    """
+    Save the tiny pipeline to a temp directory so it loads like a real model
+
+    Lets benchmarks drive ImageGenerator(model_name=...) end to end offline.
+
+    Returns:
+        Directory usable as a from_pretrained() model path
+    """
+    model_dir = Path(tempfile.gettempdir()) / f"ai_content_studio_tiny_sd_{sample_size}"
+    if not (model_dir / "model_index.json").exists():
+        build_tiny_pipeline(sample_size=sample_size).save_pretrained(model_dir)
+    return model_dir
+
+
+def load_pipeline(model: str, device: str = "cpu", dtype=torch.float32, sample_size: int = 64):
+    """
+    Load a pipeline for benchmarking
+
+    Args:
+        model: "tiny" for the local random pipeline, or a HuggingFace model id/path
+        device: Device to run on
+        dtype: Weight dtype for pretrained models
+        sample_size: Latent size of the tiny pipeline
+
+    Returns:
+        Diffusers text-to-image pipeline
+    """
+    if model == "tiny":
+        return build_tiny_pipeline(sample_size=sample_size)
+
+    from diffusers import StableDiffusionPipeline, StableDiffusionXLPipeline
+
+    pipeline_cls = StableDiffusionXLPipeline if "xl" in model.lower() else StableDiffusionPipeline
+    pipe = pipeline_cls.from_pretrained(model, torch_dtype=dtype)
+    pipe.set_progress_bar_config(disable=True)
+    return pipe.to(device)
+
+
+def image_similarity(image_a: Image.Image, image_b: Image.Image) -> float:
+    """
+    Structural similarity (SSIM) between two images on the luminance channel
+
+    Returns:
+        Score in [-1, 1]; 1.0 means identical
+    """
+    from scipy.ndimage import gaussian_filter
+
+    if image_a.size != image_b.size:
+        image_b = image_b.resize(image_a.size, Image.Resampling.BICUBIC)
+
+    a = np.asarray(image_a.convert("L"), dtype=np.float64)
+    b = np.asarray(image_b.convert("L"), dtype=np.float64)
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    sigma = 1.5
+
+    mu_a = gaussian_filter(a, sigma)
+    mu_b = gaussian_filter(b, sigma)
+    var_a = gaussian_filter(a * a, sigma) - mu_a ** 2
+    var_b = gaussian_filter(b * b, sigma) - mu_b ** 2
+    cov = gaussian_filter(a * b, sigma) - mu_a * mu_b
+
+    ssim_map = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / (
+        (mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2)
+    )
+    return float(ssim_map.mean())
+
+
+def time_call(fn, repeats: int = 3, warmup: int = 1) -> dict:
+    """
+    Time a callable
+
+    Args:
+        fn: Zero-argument callable; its last return value is kept
+        repeats: Timed runs
+        warmup: Untimed runs first (kernel selection, lazy init, compile)
+
+    Returns:
+        Dict with 'mean', 'min' seconds and the last 'result'
+    """
+    result = None
+    for _ in range(warmup):
+        result = fn()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    return {
+        'mean': sum(times) / len(times),
+        'min': min(times),
+        'result': result,
+    }
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (Linux /proc only)"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakRSS:
+    """
+    Context manager sampling this process's peak resident memory
+
+    After the block, .peak is the highest RSS seen and .added the peak
+    above the RSS on entry, in bytes.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def added(self) -> int:
+        return self.peak - self.baseline
+
+    def _sample(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.peak = rss_bytes()
+        self._done.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+        return False
+
+
+def print_table(headers: list, rows: list):
+    """Print rows as an aligned text table"""
+    columns = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(row[i])) for row in columns) for i in range(len(headers))]
+
+    def fmt(row):
+        return " | ".join(str(cell).ljust(width) for cell, width in zip(row, widths))
+
+    print(fmt(headers))
+    print("-+-".join("-" * width for width in widths))
+    for row in rows:
+        print(fmt(row))
@@ -0,0 +1,87 @@
+"""
+Benchmark: background removal with and without a shared rembg session
+
+Compares per-image latency of rembg.remove(image) without a session (a new
+ONNX session per image, as the generators used to do) against the pooled
+session with one batch call, and against the analytic white-background
+matte that runs before rembg.
+
+Usage:
+    python benchmarks/benchmark_background_removal.py --images 8 --size 1024
+"""
+
+import argparse
+import sys
+import time
+
+from bench_utils import build_tiny_pipeline, time_call, print_table
+
+from PIL import Image
+
+from core.background_removal import RembgSessionPool, DEFAULT_REMBG_MODEL, white_background_matte
+
+
+def benchmark_background_removal(args):
+    """Time background removal per image before and after session pooling"""
+    print("=" * 70)
+    print("Benchmark: Background Removal Sessions")
+    print("=" * 70)
+
+    from rembg import remove
+
+    # Decode a real (if untrained) latent so the images have generator-like texture
+    pipe = build_tiny_pipeline()
+    base = pipe("benchmark", num_inference_steps=1).images[0]
+    images = [
+        base.rotate(90 * i).resize((args.size, args.size), Image.Resampling.BICUBIC)
+        for i in range(args.images)
+    ]
+    print(f"Images: {len(images)} x {args.size}x{args.size}, model: {args.model}")
+
+    # Before: every call builds its own ONNX session
+    before = time_call(
+        lambda: [remove(image) for image in images], repeats=args.repeats, warmup=0
+    )
+
+    # After: the first call creates the session, later calls reuse it
+    pool = RembgSessionPool()
+    start = time.perf_counter()
+    pool.session(args.model)
+    session_s = time.perf_counter() - start
+    after = time_call(
+        lambda: pool.remove_batch(images, args.model), repeats=args.repeats, warmup=0
+    )
+
+    matte = time_call(
+        lambda: [white_background_matte(image) for image in images], repeats=args.repeats
+    )
+
+    before_ms = before['mean'] / len(images) * 1000
+    after_ms = after['mean'] / len(images) * 1000
+    matte_ms = matte['mean'] / len(images) * 1000
+    print()
+    print_table(
+        ["mode", "ms / image", "speedup"],
+        [
+            ["new session per image", f"{before_ms:.1f}", "1.00x"],
+            ["pooled session, batch", f"{after_ms:.1f}", f"{before_ms / after_ms:.2f}x"],
+            ["white-background matte", f"{matte_ms:.1f}", f"{before_ms / matte_ms:.2f}x"],
+        ]
+    )
+    print(f"\nOne-time session creation: {session_s * 1000:.0f} ms")
+    return before_ms, after_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rembg session pooling benchmark")
+    parser.add_argument("--model", default=DEFAULT_REMBG_MODEL, help="rembg model name")
+    parser.add_argument("--images", type=int, default=8, help="Images per batch")
+    parser.add_argument("--size", type=int, default=1024, help="Image width/height")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    try:
+        benchmark_background_removal(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
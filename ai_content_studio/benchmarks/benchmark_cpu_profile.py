@@ -0,0 +1,102 @@
+"""
+Benchmark: CPU inference profile vs. the default CPU load path
+
+Compares seconds per image of a plain fp32 pipeline against the same
+pipeline with CPUInferenceProfile applied (bf16 autocast where supported,
+channels_last, SDPA attention, thread settings, optional torch.compile).
+
+Usage:
+    python benchmarks/benchmark_cpu_profile.py                 # tiny local pipeline
+    python benchmarks/benchmark_cpu_profile.py --model runwayml/stable-diffusion-v1-5 --steps 20
+"""
+
+import argparse
+import sys
+
+from bench_utils import (
+    load_pipeline, image_similarity, time_call, print_table,
+    BENCH_PROMPT, BENCH_NEGATIVE
+)
+
+import torch
+
+from core.cpu_profile import CPUInferenceProfile, cpu_supports_bf16
+
+
+def run_pipeline(pipe, args, autocast=None):
+    """Generate one image with a fixed seed"""
+    generator = torch.Generator("cpu").manual_seed(args.seed)
+    with torch.inference_mode():
+        if autocast is not None:
+            with autocast:
+                return pipe(
+                    BENCH_PROMPT, negative_prompt=BENCH_NEGATIVE,
+                    num_inference_steps=args.steps, generator=generator
+                ).images[0]
+        return pipe(
+            BENCH_PROMPT, negative_prompt=BENCH_NEGATIVE,
+            num_inference_steps=args.steps, generator=generator
+        ).images[0]
+
+
+def benchmark_cpu_profile(args):
+    """Run the default vs. profile comparison and print a table"""
+    print("=" * 70)
+    print("Benchmark: CPU Inference Profile")
+    print("=" * 70)
+    print(f"Model: {args.model}, steps: {args.steps}, repeats: {args.repeats}")
+    print(f"CPU bf16 support: {cpu_supports_bf16()}")
+
+    variants = [("default", None)]
+    variants.append(("profile", CPUInferenceProfile(bf16="auto", compile_unet=False)))
+    if args.compile:
+        variants.append(("profile+compile", CPUInferenceProfile(bf16="auto", compile_unet=True)))
+
+    rows = []
+    reference = None
+    baseline = None
+
+    for name, profile in variants:
+        print(f"\nRunning variant: {name}")
+        pipe = load_pipeline(args.model)
+        if profile is not None:
+            profile.apply(pipe)
+
+        timing = time_call(
+            lambda: run_pipeline(pipe, args, profile.autocast() if profile else None),
+            repeats=args.repeats,
+            warmup=1
+        )
+        image = timing['result']
+
+        if reference is None:
+            reference, baseline = image, timing['mean']
+
+        rows.append([
+            name,
+            f"{timing['mean']:.3f}",
+            f"{timing['min']:.3f}",
+            f"{baseline / timing['mean']:.2f}x",
+            f"{image_similarity(reference, image):.4f}",
+        ])
+        del pipe
+
+    print()
+    print_table(["variant", "s/image (mean)", "s/image (min)", "speedup", "SSIM vs default"], rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU inference profile benchmark")
+    parser.add_argument("--model", default="tiny", help='"tiny" (local, offline) or a model id/path')
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compile", action="store_true", help="Also benchmark torch.compile of the UNet")
+    args = parser.parse_args()
+
+    try:
+        benchmark_cpu_profile(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
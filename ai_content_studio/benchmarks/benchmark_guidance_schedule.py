@@ -0,0 +1,89 @@
+"""
+Benchmark: guidance schedules (CFG truncation / decay) vs full classifier-free guidance
+
+Generates the same seeded prompt with regular guidance and with truncated
+and decaying guidance schedules at a few cutoffs, and reports wall time,
+speedup, the number of steps that still run the unconditional pass, and
+SSIM of each image against the full-CFG one. All runs share one loaded
+pipeline. With the untrained tiny pipeline the SSIM column is noise; pass a
+real model to judge quality.
+
+Usage:
+    python benchmarks/benchmark_guidance_schedule.py                 # tiny local pipeline
+    python benchmarks/benchmark_guidance_schedule.py --model runwayml/stable-diffusion-v1-5 \\
+        --size 512 --steps 30
+"""
+
+import argparse
+import sys
+
+from bench_utils import tiny_model_dir, image_similarity, time_call, print_table, BENCH_PROMPT, BENCH_NEGATIVE
+
+from core.guidance import GuidanceSchedule
+from core.image_generator import ImageGenerator
+
+
+def benchmark_guidance_schedule(args):
+    """Compare wall time and similarity of guidance schedules against full CFG"""
+    print("=" * 70)
+    print("Benchmark: Guidance Schedules")
+    print("=" * 70)
+
+    model_dir = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    generator = ImageGenerator(model_name=model_dir, hardware_config={'device': args.device})
+    generator.load_model()
+    print(f"Model: {model_dir}, {args.size}x{args.size}, {args.steps} steps, "
+          f"guidance {args.guidance_scale}")
+
+    def run(schedule):
+        return generator._run_pipeline(
+            prompts=[BENCH_PROMPT], negative_prompts=[BENCH_NEGATIVE], seeds=[0],
+            num_inference_steps=args.steps, guidance_scale=args.guidance_scale,
+            width=args.size, height=args.size, tiled=False,
+            step_callback=generator._make_step_callback(args.steps, 1, guidance_schedule=schedule),
+        )[0]
+
+    schedules = [("full CFG", None)]
+    for cutoff in args.cutoffs:
+        schedules.append((f"truncate {cutoff}", GuidanceSchedule("truncate", cutoff)))
+    for cutoff in args.cutoffs:
+        schedules.append((f"decay {cutoff}", GuidanceSchedule("decay", cutoff)))
+
+    rows = []
+    baseline = None
+    for name, schedule in schedules:
+        timing = time_call(lambda: run(schedule), repeats=args.repeats)
+        if baseline is None:
+            baseline = timing
+        guided = args.steps if schedule is None else schedule.guided_steps(args.guidance_scale, args.steps)
+        rows.append([
+            name,
+            f"{guided}/{args.steps}",
+            f"{timing['mean']:.2f}",
+            f"{baseline['mean'] / timing['mean']:.2f}x",
+            f"{image_similarity(baseline['result'], timing['result']):.3f}",
+        ])
+        print(f"  {name}: {rows[-1][2]} s")
+
+    print()
+    print_table(["schedule", "guided steps", "time (s)", "speedup", "SSIM vs full CFG"], rows)
+    generator.unload_model()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Guidance schedule benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--guidance-scale", type=float, default=7.5)
+    parser.add_argument("--cutoffs", type=float, nargs="+", default=[0.75, 0.5, 0.3])
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    try:
+        benchmark_guidance_schedule(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+"""
+Benchmark: two-stage hi-res mode vs native generation
+
+Generates the same seeded prompt at each final size once in a single
+full-resolution pass and once in hi-res mode (all steps at half size, latent
+upscale, short full-size img2img pass), and reports wall time, speedup and
+SSIM of the hi-res image against the native one. Both modes share one loaded
+pipeline, as they do in the app. With the untrained tiny pipeline the SSIM
+column is noise; pass a real model to judge quality.
+
+Usage:
+    python benchmarks/benchmark_hires.py                      # tiny local pipeline
+    python benchmarks/benchmark_hires.py --sizes 256 384 --steps 20
+"""
+
+import argparse
+import sys
+
+from bench_utils import tiny_model_dir, image_similarity, time_call, print_table, BENCH_PROMPT, BENCH_NEGATIVE
+
+from core.image_generator import ImageGenerator
+
+
+def benchmark_hires(args):
+    """Compare wall time of native and hi-res generation at equal final size"""
+    print("=" * 70)
+    print("Benchmark: Two-Stage Hi-Res Mode")
+    print("=" * 70)
+
+    model_dir = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    generator = ImageGenerator(model_name=model_dir, hardware_config={'device': args.device})
+    generator.load_model()
+    img2img_steps, refine_steps = generator._hires_steps(args.steps)
+    print(f"Model: {model_dir}, steps: {args.steps} (+{refine_steps} full-size in hi-res mode)")
+
+    def run(size, hires):
+        return generator._run_pipeline(
+            prompts=[BENCH_PROMPT], negative_prompts=[BENCH_NEGATIVE], seeds=[0],
+            num_inference_steps=args.steps, guidance_scale=7.5,
+            width=size, height=size, tiled=False, hires=hires,
+        )[0]
+
+    rows = []
+    for size in args.sizes:
+        native = time_call(lambda: run(size, False), repeats=args.repeats)
+        hires = time_call(lambda: run(size, True), repeats=args.repeats)
+        ssim = image_similarity(native['result'], hires['result'])
+        rows.append([
+            f"{size}x{size}",
+            f"{native['mean']:.2f}",
+            f"{hires['mean']:.2f}",
+            f"{native['mean'] / hires['mean']:.2f}x",
+            f"{ssim:.3f}",
+        ])
+        print(f"  {rows[-1][0]}: native {rows[-1][1]} s, hi-res {rows[-1][2]} s")
+
+    print()
+    print_table(["size", "native (s)", "hi-res (s)", "speedup", "SSIM vs native"], rows)
+    generator.unload_model()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-stage hi-res mode benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 384])
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        benchmark_hires(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
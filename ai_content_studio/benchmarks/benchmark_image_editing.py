@@ -0,0 +1,99 @@
+"""
+Benchmark: img2img on the loaded pipeline vs a separately loaded one
+
+Measures what generate_from_image() saves:
+  1. Setup: loading a separate img2img pipeline from disk vs deriving it
+     from the loaded text-to-image components (time and resident memory).
+  2. Repeated edits of one source: with the VAE encode cached vs encoding
+     the source again for every edit.
+
+Memory is sampled from /proc, so Linux only.
+
+Usage:
+    python benchmarks/benchmark_image_editing.py                 # tiny local pipeline
+    python benchmarks/benchmark_image_editing.py --model runwayml/stable-diffusion-v1-5 --size 512
+"""
+
+import argparse
+import sys
+import time
+
+from PIL import Image
+
+from bench_utils import tiny_model_dir, time_call, print_table, PeakRSS, BENCH_PROMPT, BENCH_NEGATIVE
+
+from core.image_generator import ImageGenerator
+from core.latent_cache import get_latent_cache
+
+
+def benchmark_image_editing(args):
+    """Compare pipeline setup and repeated edits with and without sharing"""
+    print("=" * 70)
+    print("Benchmark: Img2img on the Loaded Pipeline")
+    print("=" * 70)
+
+    model = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    size = args.size or (128 if args.model == "tiny" else 512)
+    generator = ImageGenerator(model_name=model, hardware_config={'device': args.device})
+    generator.load_model()
+    print(f"Model: {model}, size: {size}px, steps: {args.steps}, strength: {args.strength}")
+
+    mb = 1024 ** 2
+    setup_rows = []
+
+    # Derived first: a separately loaded pipeline would be measured into its numbers otherwise
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        generator._img2img_pipeline()
+        derived_s = time.perf_counter() - start
+    setup_rows.append(["derived from loaded pipeline", f"{derived_s:.3f}", f"{rss.added / mb:.0f}"])
+
+    from diffusers import StableDiffusionImg2ImgPipeline, StableDiffusionXLImg2ImgPipeline
+    pipeline_cls = StableDiffusionXLImg2ImgPipeline if generator.is_sdxl else StableDiffusionImg2ImgPipeline
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        separate = pipeline_cls.from_pretrained(model, torch_dtype=generator.torch_dtype)
+        separate_s = time.perf_counter() - start
+    setup_rows.append(["separate from_pretrained", f"{separate_s:.3f}", f"{rss.added / mb:.0f}"])
+    del separate
+
+    source = Image.radial_gradient("L").convert("RGB").resize((size, size))
+    edit_rows = []
+
+    def edit(prompt):
+        return generator._run_edit(
+            source, None, [prompt], [BENCH_NEGATIVE], [0], args.steps, 7.5, size, size, args.strength
+        )[0]
+
+    def cold_edit():
+        get_latent_cache().clear()
+        return edit(BENCH_PROMPT)
+
+    cold = time_call(cold_edit, repeats=args.repeats)
+    warm = time_call(lambda: edit(BENCH_PROMPT), repeats=args.repeats)
+    edit_rows.append(["source encoded per edit", f"{cold['mean']:.3f}", "1.00x"])
+    edit_rows.append(["cached source latents", f"{warm['mean']:.3f}", f"{cold['mean'] / warm['mean']:.2f}x"])
+
+    print()
+    print_table(["img2img pipeline", "setup (s)", "added RSS (MB)"], setup_rows)
+    print()
+    print_table(["repeated edit", "per edit (s)", "speedup"], edit_rows)
+    generator.unload_model()
+    return setup_rows, edit_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Img2img component sharing benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--size", type=int, default=None, help="Image size (default: native)")
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--strength", type=float, default=0.5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        benchmark_image_editing(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+"""
+Benchmark: image encoding cost per output format
+
+Measures how long encoding and writing one generated-size image takes for
+each output format, and how long the generation thread is blocked when the
+write goes through the background ImageWriter instead.
+
+Usage:
+    python benchmarks/benchmark_image_writer.py --size 1024
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import build_tiny_pipeline, time_call, print_table
+
+from PIL import Image
+
+from core.image_writer import ImageWriter, SaveOptions, write_image
+
+FORMATS = [
+    ("png (PIL default)", SaveOptions("png", png_compress_level=6)),
+    ("png level 1", SaveOptions("png", png_compress_level=1)),
+    ("webp lossless", SaveOptions("webp")),
+    ("jpeg q95", SaveOptions("jpeg", quality=95)),
+]
+
+
+def benchmark_image_writer(args):
+    """Time synchronous and background writes for each format"""
+    print("=" * 70)
+    print("Benchmark: Image Writer Formats")
+    print("=" * 70)
+
+    # Decode a real (if untrained) latent so the image has generator-like texture
+    pipe = build_tiny_pipeline()
+    image = pipe("benchmark", num_inference_steps=1).images[0]
+    image = image.resize((args.size, args.size), Image.Resampling.BICUBIC)
+    print(f"Image: {image.size[0]}x{image.size[1]}")
+
+    writer = ImageWriter()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, options in FORMATS:
+            path = Path(tmp) / f"bench{options.extension}"
+            sync = time_call(lambda: write_image(image, path, options), repeats=args.repeats)
+
+            def submit():
+                start = time.perf_counter()
+                future = writer.submit(image, path, options)
+                blocked = time.perf_counter() - start
+                future.result()
+                return blocked
+
+            blocked = time_call(submit, repeats=args.repeats)['result']
+            rows.append([
+                name,
+                f"{sync['mean'] * 1000:.1f}",
+                f"{blocked * 1000:.2f}",
+                f"{path.stat().st_size / 1024:.0f}",
+            ])
+
+    writer.shutdown()
+    print()
+    print_table(["format", "sync write (ms)", "caller blocked (ms)", "size (KB)"], rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Image writer format benchmark")
+    parser.add_argument("--size", type=int, default=1024, help="Image width/height")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        benchmark_image_writer(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Benchmark: speed presets (scheduler + solver order + steps)
+
+For each preset in SPEED_PRESETS, records seconds per image and SSIM against
+a 50-step reference rendered with the model's default scheduler and the
+same seed, to pick presets from data.
+
+Usage:
+    python benchmarks/benchmark_presets.py                  # tiny local pipeline
+    python benchmarks/benchmark_presets.py --model runwayml/stable-diffusion-v1-5 --size 512
+"""
+
+import argparse
+import sys
+
+from bench_utils import tiny_model_dir, image_similarity, time_call, print_table, BENCH_PROMPT
+
+from core.image_generator import ImageGenerator, SPEED_PRESETS
+
+REFERENCE_STEPS = 50
+
+
+def render(generator, args, steps, preset=None):
+    """Render one image in memory with a fixed seed"""
+    return generator._run_pipeline(
+        prompts=[generator._enhance_prompt(BENCH_PROMPT)],
+        negative_prompts=[generator._enhance_negative_prompt("")],
+        seeds=[args.seed],
+        num_inference_steps=steps,
+        guidance_scale=args.guidance,
+        width=args.size,
+        height=args.size,
+        preset=preset,
+    )[0]
+
+
+def benchmark_presets(args):
+    """Time every preset and compare it against the 50-step reference"""
+    print("=" * 70)
+    print("Benchmark: Speed Presets")
+    print("=" * 70)
+
+    model = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    generator = ImageGenerator(model_name=model)
+    generator.load_model()
+    generator.pipe.set_progress_bar_config(disable=True)
+    print(f"Model: {args.model}, size: {args.size}, seed: {args.seed}")
+
+    print(f"\nRendering {REFERENCE_STEPS}-step reference ({generator._scheduler_name()})...")
+    reference = time_call(lambda: render(generator, args, REFERENCE_STEPS), repeats=1, warmup=0)
+    rows = [[
+        "reference", generator._scheduler_name(), REFERENCE_STEPS,
+        f"{reference['mean']:.3f}", "1.00x", "1.0000"
+    ]]
+
+    for name, spec in SPEED_PRESETS.items():
+        print(f"Running preset: {name}")
+        # Preset pipelines get their own progress bar config on first use
+        generator._pipeline_for_preset(name).set_progress_bar_config(disable=True)
+        timing = time_call(
+            lambda: render(generator, args, spec["steps"], preset=name),
+            repeats=args.repeats,
+            warmup=1
+        )
+        rows.append([
+            name,
+            generator._scheduler_name(name),
+            spec["steps"],
+            f"{timing['mean']:.3f}",
+            f"{reference['mean'] / timing['mean']:.2f}x",
+            f"{image_similarity(reference['result'], timing['result']):.4f}",
+        ])
+
+    print()
+    print_table(["preset", "scheduler", "steps", "s/image", "speedup", "SSIM vs ref"], rows)
+    generator.unload_model()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed preset benchmark")
+    parser.add_argument("--model", default="tiny", help='"tiny" (local, offline) or a model id/path')
+    parser.add_argument("--size", type=int, default=128, help="Image width/height")
+    parser.add_argument("--guidance", type=float, default=7.0)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        benchmark_presets(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""
+Benchmark: dynamic int8 quantization vs fp32 on the CPU
+
+Loads the same model in three fresh processes - fp32, int8 quantized at
+load time, and int8 read from the on-disk cache - and reports load time,
+resident memory of the loaded pipeline, peak memory while generating,
+generation latency, and SSIM of the int8 image against the fp32 one (same
+seed). Memory is sampled from /proc, so Linux only. The tiny pipeline is
+mostly convolutions, so its deltas are small; SD 1.5 and SDXL keep most of
+their UNet and text-encoder weights in linear layers.
+
+Usage:
+    python benchmarks/benchmark_quantization.py                  # tiny local pipeline
+    python benchmarks/benchmark_quantization.py --model runwayml/stable-diffusion-v1-5 --size 512
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+
+from bench_utils import (
+    tiny_model_dir, image_similarity, time_call, print_table, rss_bytes, PeakRSS,
+    BENCH_PROMPT, BENCH_NEGATIVE
+)
+
+
+def _run(model: str, int8: bool, int8_cache_dir: str, size: int, steps: int, repeats: int) -> dict:
+    """Load and generate in this process; returns timings, memory and the image"""
+    from core.cpu_profile import CPUInferenceProfile
+    from core.image_generator import ImageGenerator
+    from core.memory_utils import estimate_size_bytes
+
+    profile = CPUInferenceProfile(bf16=False, int8=int8, int8_cache_dir=int8_cache_dir)
+    generator = ImageGenerator(model_name=model, cpu_profile=profile,
+                               hardware_config={'device': "cpu"})
+
+    baseline = rss_bytes()
+    start = time.perf_counter()
+    generator.load_model()
+    load_s = time.perf_counter() - start
+    loaded = rss_bytes() - baseline
+
+    def generate():
+        return generator._run_pipeline(
+            prompts=[BENCH_PROMPT], negative_prompts=[BENCH_NEGATIVE], seeds=[0],
+            num_inference_steps=steps, guidance_scale=7.5, width=size, height=size,
+        )[0]
+
+    with PeakRSS() as rss:
+        timing = time_call(generate, repeats=repeats)
+
+    return {
+        'load_s': load_s,
+        'loaded_bytes': loaded,
+        'weights_bytes': estimate_size_bytes(generator.pipe),
+        'generate_peak_bytes': rss.added,
+        'generate_s': timing['mean'],
+        'image': timing['result'],
+    }
+
+
+def benchmark_quantization(args):
+    """Compare fp32 and int8 loads and generation"""
+    print("=" * 70)
+    print("Benchmark: Dynamic Int8 Quantization (CPU)")
+    print("=" * 70)
+
+    model = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    size = args.size or (128 if args.model == "tiny" else 512)
+    print(f"Model: {model}, size: {size}px, steps: {args.steps}")
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as int8_cache_dir:
+        for name, int8 in (("fp32", False), ("int8 (quantize)", True), ("int8 (cached)", True)):
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(
+                    _run, (model, int8, int8_cache_dir, size, args.steps, args.repeats)
+                )
+            print(f"  {name}: load {results[name]['load_s']:.2f} s, "
+                  f"generate {results[name]['generate_s']:.2f} s")
+
+    reference = results["fp32"]
+    mb = 1024 ** 2
+    rows = []
+    for name, result in results.items():
+        rows.append([
+            name,
+            f"{result['load_s']:.2f}",
+            f"{result['weights_bytes'] / mb:.0f}",
+            f"{result['loaded_bytes'] / mb:.0f}",
+            f"{result['generate_peak_bytes'] / mb:.0f}",
+            f"{result['generate_s']:.2f}",
+            f"{reference['generate_s'] / result['generate_s']:.2f}x",
+            f"{image_similarity(reference['image'], result['image']):.3f}",
+        ])
+
+    print()
+    print_table(
+        ["mode", "load (s)", "weights (MB)", "loaded RSS (MB)", "generate peak (MB)",
+         "generate (s)", "speedup", "SSIM vs fp32"],
+        rows
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dynamic int8 quantization benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--size", type=int, default=None, help="Image size (default: native)")
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    try:
+        benchmark_quantization(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Benchmark: parameter sweep vs one generate() call per cell
+
+Runs the same seed x guidance grid twice on one loaded pipeline: cell by
+cell through generate(), the way the grid used to be produced from the GUI,
+and as one ImageGenerator.sweep(), which encodes the prompts once and
+denoises the seeds of each guidance value in one micro-batch. Reports the
+wall time of both and the number of pipeline calls. Cell images are
+identical between the two (same seeds), so no quality column is needed.
+
+Usage:
+    python benchmarks/benchmark_sweep.py                        # tiny local pipeline
+    python benchmarks/benchmark_sweep.py --seeds 1 2 3 4 --guidance 4 7 10
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import tiny_model_dir, print_table, BENCH_PROMPT, BENCH_NEGATIVE
+
+from core.image_generator import ImageGenerator
+
+
+def benchmark_sweep(args):
+    """Compare a sweep with the equivalent sequence of single generations"""
+    print("=" * 70)
+    print("Benchmark: Parameter Sweep")
+    print("=" * 70)
+
+    model_dir = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    generator = ImageGenerator(model_name=model_dir, hardware_config={'device': args.device})
+    generator.load_model()
+    size = args.size or (128 if args.model == "tiny" else 512)
+    axes = {'guidance_scale': args.guidance, 'seed': args.seeds}
+    num_cells = len(args.guidance) * len(args.seeds)
+    print(f"Model: {model_dir}, {len(args.seeds)} seeds x {len(args.guidance)} guidance scales, "
+          f"{size}px, {args.steps} steps")
+
+    # Warm up kernels and the prompt cache outside the timed runs
+    generator._run_pipeline([BENCH_PROMPT], [BENCH_NEGATIVE], [0], 1, 7.5, size, size)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_dir = Path(output_dir)
+
+        start = time.perf_counter()
+        for guidance_scale in args.guidance:
+            for seed in args.seeds:
+                generator.generate(
+                    BENCH_PROMPT, BENCH_NEGATIVE, num_inference_steps=args.steps,
+                    guidance_scale=guidance_scale, width=size, height=size, seed=seed,
+                    output_dir=output_dir,
+                )
+        sequential_s = time.perf_counter() - start
+        print(f"  generate() per cell: {sequential_s:.2f} s")
+
+        start = time.perf_counter()
+        result = generator.sweep(
+            BENCH_PROMPT, axes, negative_prompt=BENCH_NEGATIVE, num_inference_steps=args.steps,
+            width=size, height=size, output_dir=output_dir, max_batch_size=args.batch_size,
+        )
+        sweep_s = time.perf_counter() - start
+        print(f"  sweep(): {sweep_s:.2f} s")
+
+    print()
+    print_table(
+        ["mode", "pipeline calls", "total (s)", "per image (s)", "speedup"],
+        [
+            ["generate() per cell", str(num_cells), f"{sequential_s:.2f}",
+             f"{sequential_s / num_cells:.2f}", "1.00x"],
+            ["sweep()", str(result.timings['pipeline_calls']), f"{sweep_s:.2f}",
+             f"{sweep_s / num_cells:.2f}", f"{sequential_s / sweep_s:.2f}x"],
+        ]
+    )
+    print(f"\nSweep breakdown: encode {result.timings['encode_s']:.2f} s, "
+          f"denoise {result.timings['generate_s']:.2f} s, "
+          f"contact sheet {result.timings['contact_sheet_s']:.2f} s")
+    generator.unload_model()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--size", type=int, default=None, help="Image size (default: native)")
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--guidance", type=float, nargs="+", default=[4.0, 7.0, 10.0])
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Max images per pipeline call (default: sized from free memory)")
+    args = parser.parse_args()
+
+    try:
+        benchmark_sweep(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
@@ -0,0 +1,88 @@
+"""
+Benchmark: peak memory of tiled vs single-pass generation
+
+Generates the same prompt at increasing output sizes with and without
+tiling and records wall time and the peak resident memory added by the
+generation (sampled from /proc, so Linux only). Each run happens in a fresh
+process so the numbers are independent. Single-pass memory grows with the
+output area; tiled memory stays near the single-tile cost.
+
+Usage:
+    python benchmarks/benchmark_tiled_generation.py                      # tiny local pipeline
+    python benchmarks/benchmark_tiled_generation.py --sizes 512 768 1024
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from bench_utils import tiny_model_dir, print_table, PeakRSS, BENCH_PROMPT
+
+
+def _run(model_dir: str, tile_size: int, size: int, tiled: bool, steps: int) -> tuple:
+    """Generate one image in this process; returns (seconds, peak added bytes)"""
+    from core.image_generator import ImageGenerator
+
+    generator = ImageGenerator(model_name=model_dir, tile_size=tile_size,
+                               hardware_config={'device': "cpu"})
+    generator.load_model()
+
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        generator._run_pipeline(
+            prompts=[BENCH_PROMPT], negative_prompts=[""], seeds=[0],
+            num_inference_steps=steps, guidance_scale=7.5,
+            width=size, height=size, tiled=tiled,
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, rss.added
+
+
+def benchmark_tiled_generation(args):
+    """Compare memory and time of tiled and single-pass generation per size"""
+    print("=" * 70)
+    print("Benchmark: Tiled Generation Memory")
+    print("=" * 70)
+
+    if args.model == "tiny":
+        model_dir = str(tiny_model_dir(args.tile_size // 2))
+    else:
+        model_dir = args.model
+    print(f"Model: {model_dir}, tile size: {args.tile_size}px, steps: {args.steps}")
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for size in args.sizes:
+        for tiled in (False, True):
+            with context.Pool(1) as pool:
+                elapsed, peak = pool.apply(
+                    _run, (model_dir, args.tile_size, size, tiled, args.steps)
+                )
+            rows.append([
+                f"{size}x{size}",
+                "tiled" if tiled else "single pass",
+                f"{elapsed:.2f}",
+                f"{peak / 1024 ** 2:.0f}",
+            ])
+            print(f"  {rows[-1][0]} {rows[-1][1]}: {rows[-1][2]} s, +{rows[-1][3]} MB")
+
+    print()
+    print_table(["size", "mode", "seconds", "peak added RSS (MB)"], rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiled generation memory benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--tile-size", type=int, default=128,
+                        help="Tile size in px (the tiny pipeline's native size is 128)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 384, 512])
+    parser.add_argument("--steps", type=int, default=2)
+    args = parser.parse_args()
+
+    try:
+        benchmark_tiled_generation(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
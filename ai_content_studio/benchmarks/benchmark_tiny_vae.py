@@ -0,0 +1,118 @@
+"""
+Benchmark: tiny VAE (TAESD/TAESDXL) decode vs the full VAE decode
+
+Decodes the same latents with the SDXL VAE and with the tiny autoencoder
+and reports time per decode and peak added resident memory. Decode cost
+depends on the architecture, not the weights, so by default both models
+are built from their published configs with random weights (no download);
+pass --model / --tiny-model to load real checkpoints and also compare the
+decoded images. Memory is sampled from /proc, so Linux only.
+
+Usage:
+    python benchmarks/benchmark_tiny_vae.py                      # 512x512, random weights
+    python benchmarks/benchmark_tiny_vae.py --size 1024
+    python benchmarks/benchmark_tiny_vae.py --model stabilityai/stable-diffusion-xl-base-1.0 \\
+        --tiny-model madebyollin/taesdxl
+"""
+
+import argparse
+import sys
+from types import SimpleNamespace
+
+import torch
+
+from bench_utils import time_call, print_table, image_similarity, PeakRSS
+
+from diffusers.image_processor import VaeImageProcessor
+
+from core.tiny_vae import full_decode, tiny_decode
+
+
+# AutoencoderKL config of the SDXL VAE
+SDXL_VAE_CONFIG = dict(
+    in_channels=3,
+    out_channels=3,
+    down_block_types=["DownEncoderBlock2D"] * 4,
+    up_block_types=["UpDecoderBlock2D"] * 4,
+    block_out_channels=[128, 256, 512, 512],
+    layers_per_block=2,
+    latent_channels=4,
+    sample_size=1024,
+    scaling_factor=0.13025,
+    force_upcast=True,
+)
+
+
+def _load_vaes(args):
+    """Full and tiny VAE, random or from checkpoints"""
+    from diffusers import AutoencoderKL, AutoencoderTiny
+
+    torch.manual_seed(0)
+    if args.model is None:
+        full = AutoencoderKL(**SDXL_VAE_CONFIG)
+    else:
+        full = AutoencoderKL.from_pretrained(args.model, subfolder="vae")
+    tiny = AutoencoderTiny() if args.tiny_model is None else AutoencoderTiny.from_pretrained(args.tiny_model)
+    return full.to(args.device).eval(), tiny.to(args.device).eval()
+
+
+def benchmark_tiny_vae(args):
+    """Compare full and tiny VAE decode time and memory"""
+    print("=" * 70)
+    print("Benchmark: Tiny VAE Decode")
+    print("=" * 70)
+
+    full, tiny = _load_vaes(args)
+    # full_decode()/tiny_decode() only need the vae and image_processor of a pipeline
+    processor = VaeImageProcessor(vae_scale_factor=8)
+    full_pipe = SimpleNamespace(vae=full, image_processor=processor)
+    weights = "checkpoints" if args.model else "random weights"
+    print(f"Size: {args.size}px, batch: {args.batch}, device: {args.device}, {weights}")
+
+    generator = torch.Generator().manual_seed(0)
+    latents = torch.randn(args.batch, 4, args.size // 8, args.size // 8, generator=generator)
+
+    mb = 1024 ** 2
+    rows = []
+    results = {}
+    for name, decode in (
+        ("full VAE", lambda: full_decode(full_pipe, latents)),
+        ("tiny VAE", lambda: tiny_decode(tiny, full_pipe, latents)),
+    ):
+        with torch.inference_mode():
+            decode()  # warm-up outside the memory measurement
+            with PeakRSS() as rss:
+                timing = time_call(decode, repeats=args.repeats, warmup=0)
+        results[name] = timing
+        rows.append([name, f"{timing['mean']:.3f}", f"{rss.added / mb:.0f}"])
+
+    base = results["full VAE"]['mean']
+    for row, timing in zip(rows, results.values()):
+        row.append(f"{base / timing['mean']:.2f}x")
+    headers = ["decoder", "per decode (s)", "added RSS (MB)", "speedup"]
+    if args.model:
+        similarity = image_similarity(results["full VAE"]['result'][0], results["tiny VAE"]['result'][0])
+        rows[0].append("1.000")
+        rows[1].append(f"{similarity:.3f}")
+        headers.append("SSIM vs full")
+
+    print()
+    print_table(headers, rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiny VAE decode benchmark")
+    parser.add_argument("--model", default=None, help="Model id/path with a vae subfolder (default: random SDXL VAE)")
+    parser.add_argument("--tiny-model", default=None, help="AutoencoderTiny id/path (default: random TAESD)")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        benchmark_tiny_vae(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
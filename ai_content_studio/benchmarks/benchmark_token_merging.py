@@ -0,0 +1,88 @@
+"""
+Benchmark: token merging ratios vs the unpatched UNet
+
+Denoises the same seeded prompt at each size with several token-merging
+ratios and reports denoising wall time (the VAE decode is not affected by
+merging and is left out), speedup and SSIM of each decoded image against
+the unmerged one. All ratios run on one loaded pipeline: the patch is applied
+and removed around every pass without reloading weights. The gain grows
+with the output size, since self-attention cost is quadratic in the token
+count. With the untrained tiny pipeline the SSIM column only shows how far
+the output drifts; pass a real model to judge quality.
+
+Usage:
+    python benchmarks/benchmark_token_merging.py                    # tiny local pipeline
+    python benchmarks/benchmark_token_merging.py --model runwayml/stable-diffusion-v1-5 \\
+        --sizes 512 768 --steps 20
+"""
+
+import argparse
+import sys
+
+import torch
+
+from bench_utils import tiny_model_dir, image_similarity, time_call, print_table, BENCH_PROMPT, BENCH_NEGATIVE
+
+from core.image_generator import ImageGenerator
+from core.tiny_vae import full_decode
+
+
+def benchmark_token_merging(args):
+    """Compare wall time and similarity of token-merging ratios per output size"""
+    print("=" * 70)
+    print("Benchmark: Token Merging")
+    print("=" * 70)
+
+    model_dir = str(tiny_model_dir()) if args.model == "tiny" else args.model
+    generator = ImageGenerator(model_name=model_dir, hardware_config={'device': args.device})
+    generator.load_model()
+    print(f"Model: {model_dir}, {args.steps} steps, ratios: {args.ratios}")
+
+    def run(size):
+        return generator._run_pipeline(
+            prompts=[BENCH_PROMPT], negative_prompts=[BENCH_NEGATIVE], seeds=[0],
+            num_inference_steps=args.steps, guidance_scale=7.5,
+            width=size, height=size, tiled=False, output_type="latent",
+        )
+
+    rows = []
+    for size in args.sizes:
+        baseline = None
+        for ratio in [0.0] + [ratio for ratio in args.ratios if ratio > 0]:
+            generator.set_token_merging(ratio)
+            timing = time_call(lambda: run(size), repeats=args.repeats)
+            with torch.inference_mode():
+                timing['result'] = full_decode(generator.pipe, timing['result'])[0]
+            if baseline is None:
+                baseline = timing
+            rows.append([
+                f"{size}x{size}",
+                f"{ratio:.2f}",
+                f"{timing['mean']:.2f}",
+                f"{baseline['mean'] / timing['mean']:.2f}x",
+                f"{image_similarity(baseline['result'], timing['result']):.3f}",
+            ])
+            print(f"  {rows[-1][0]} ratio {rows[-1][1]}: {rows[-1][2]} s")
+
+    print()
+    print_table(["size", "ratio", "time (s)", "speedup", "SSIM vs unmerged"], rows)
+    generator.set_token_merging(0.0)
+    generator.unload_model()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Token merging benchmark")
+    parser.add_argument("--model", default="tiny", help="'tiny' or a model id/path")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 768])
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.25, 0.5, 0.75])
+    parser.add_argument("--steps", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        benchmark_token_merging(args)
+    except Exception as e:
+        print(f"\n✗ Benchmark failed with error: {e}")
+        sys.exit(1)
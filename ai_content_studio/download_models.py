@@ -40,6 +40,7 @@ def download_stable_diffusion(base_dir: Path):
     try:
         sys.path.insert(0, str(base_dir / "src"))
         from core.image_generator import ImageGenerator
+        from core.model_manifest import get_model_manifest
 
         cache_dir = base_dir / "models" / "stable_diffusion"
         cache_dir.mkdir(parents=True, exist_ok=True)
@@ -47,6 +48,9 @@ def download_stable_diffusion(base_dir: Path):
         print("Downloading: stabilityai/stable-diffusion-2-1")
         print("This may take several minutes...")
 
+        # Go to the hub even if a snapshot is recorded, then record the new one
+        get_model_manifest().refresh("stabilityai/stable-diffusion-2-1")
+
         generator = ImageGenerator(
             model_name="stabilityai/stable-diffusion-2-1",
             cache_dir=cache_dir
@@ -68,6 +72,7 @@ def download_triposr(base_dir: Path):
     try:
         sys.path.insert(0, str(base_dir / "src"))
         from core.model_3d_generator import Model3DGenerator
+        from core.model_manifest import get_model_manifest
 
         cache_dir = base_dir / "models" / "triposr"
         cache_dir.mkdir(parents=True, exist_ok=True)
@@ -75,6 +80,9 @@ def download_triposr(base_dir: Path):
         print("Downloading: stabilityai/TripoSR")
         print("This may take several minutes...")
 
+        get_model_manifest().refresh("stabilityai/TripoSR")
+        get_model_manifest().refresh("intel-isl/MiDaS")
+
         generator = Model3DGenerator(cache_dir=cache_dir)
         generator.load_model()
 
@@ -0,0 +1,241 @@
+"""
+Background Removal - Analytic white-background matte and shared rembg sessions
+
+Transparent-background and text-to-3D images are generated on a clean
+white studio background, which a flood fill from the image border cuts out
+in milliseconds. The neural rembg model only runs when that matte is not
+confident (busy or non-white backgrounds).
+
+rembg.remove(image) without a session builds a new ONNX segmentation session
+(model load plus graph optimization) for every image. The pool creates one
+session per rembg model on first use and keeps it for the life of the
+process, so only the first removal pays the setup cost.
+"""
+
+import math
+import threading
+from typing import Callable
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+
+DEFAULT_REMBG_MODEL = "u2net"
+
+# Analytic matte settings: pixels whose darkest channel is at least this
+# bright count as studio white, the object edge is feathered by this many
+# pixels, and rembg takes over below this confidence
+MATTE_WHITE_THRESHOLD = 0.90
+MATTE_FEATHER_PX = 1.5
+MATTE_MIN_CONFIDENCE = 0.8
+
+# Foreground specks smaller than this fraction of the image are dropped
+MATTE_MIN_SPECK_FRACTION = 0.001
+
+
+def has_transparency(image: Image.Image) -> bool:
+    """Whether an image already has transparent pixels (e.g. a removed background)"""
+    if image.mode == "P":
+        return "transparency" in image.info
+    if image.mode not in ("RGBA", "LA"):
+        return False
+    minimum, _ = image.getchannel("A").getextrema()
+    return minimum < 255
+
+
+def white_background_matte(image: Image.Image, white_threshold: float = MATTE_WHITE_THRESHOLD,
+                           feather_px: float = MATTE_FEATHER_PX) -> tuple:
+    """
+    Cut out an object on a plain white background without a neural model
+
+    Near-white pixels connected to the image border are background; white
+    areas enclosed by the object are kept. The confidence combines how much
+    of the border is white background with how much of the foreground is a
+    single object, and is 0 when the object is missing or fills the frame.
+
+    Args:
+        image: PIL image
+        white_threshold: Minimum darkest-channel value (0-1) of background pixels
+        feather_px: Width of the soft alpha edge in pixels
+
+    Returns:
+        Tuple (RGBA image, confidence 0-1)
+    """
+    from scipy import ndimage
+
+    rgb = np.asarray(image.convert("RGB"))
+    darkest = np.minimum(np.minimum(rgb[..., 0], rgb[..., 1]), rgb[..., 2])
+    near_white = darkest >= white_threshold * 255
+
+    # Background: near-white regions that touch the border
+    labels, count = ndimage.label(near_white)
+    is_border_label = np.zeros(count + 1, dtype=bool)
+    is_border_label[labels[0, :]] = True
+    is_border_label[labels[-1, :]] = True
+    is_border_label[labels[:, 0]] = True
+    is_border_label[labels[:, -1]] = True
+    is_border_label[0] = False
+    background = is_border_label[labels]
+
+    # Drop isolated specks (noise, dust) from the foreground
+    fg_labels, count = ndimage.label(~background)
+    sizes = np.bincount(fg_labels.ravel(), minlength=count + 1)
+    keep = sizes >= MATTE_MIN_SPECK_FRACTION * fg_labels.size
+    keep[0] = False
+    foreground = keep[fg_labels]
+    sizes = sizes[keep]
+    background = ~foreground
+
+    border = np.concatenate(
+        [background[0, :], background[-1, :], background[:, 0], background[:, -1]]
+    )
+    coverage = foreground.mean()
+    if sizes.size == 0 or not 0.01 <= coverage <= 0.9:
+        confidence = 0.0
+    else:
+        confidence = float(border.mean() * sizes.max() / sizes.sum())
+
+    # Feather inwards so no white fringe is left around the object
+    alpha = foreground.astype(np.uint8) * 255
+    if feather_px > 0:
+        blurred = np.asarray(Image.fromarray(alpha).filter(ImageFilter.GaussianBlur(feather_px)))
+        interior = ndimage.binary_erosion(foreground, iterations=max(1, math.ceil(2 * feather_px)))
+        alpha = np.where(interior, alpha, np.where(foreground, blurred, 0)).astype(np.uint8)
+
+    rgba = np.dstack([rgb, alpha])
+    return Image.fromarray(rgba, "RGBA"), confidence
+
+
+def remove_backgrounds(images: list, model_name: str = DEFAULT_REMBG_MODEL,
+                       min_confidence: float = MATTE_MIN_CONFIDENCE) -> tuple:
+    """
+    Remove backgrounds, trying the analytic matte before rembg
+
+    Args:
+        images: PIL images
+        model_name: rembg model used for images the matte cannot handle
+        min_confidence: Matte confidence needed to skip rembg (None = always rembg)
+
+    Returns:
+        Tuple (images, methods): RGBA images and, per image, the path taken:
+        "existing" (already transparent), "matte", "rembg" or "none" (failed,
+        original returned)
+    """
+    results = [None] * len(images)
+    methods = [None] * len(images)
+    fallback = []
+
+    for i, image in enumerate(images):
+        if has_transparency(image):
+            results[i], methods[i] = image.convert("RGBA"), "existing"
+            continue
+        image = image.convert("RGB")
+        results[i] = image
+        if min_confidence is not None:
+            matte, confidence = white_background_matte(image)
+            if confidence >= min_confidence:
+                print(f"Background removed with white-background matte (confidence {confidence:.2f})")
+                results[i], methods[i] = matte, "matte"
+                continue
+            print(f"Matte confidence {confidence:.2f} below {min_confidence:.2f}, using rembg")
+        fallback.append(i)
+
+    if fallback:
+        try:
+            print("Removing background using rembg...")
+            removed = get_rembg_pool().remove_batch([results[i] for i in fallback], model_name)
+            for i, image in zip(fallback, removed):
+                results[i], methods[i] = image, "rembg"
+            print("Background removed successfully")
+        except ImportError:
+            print("Warning: rembg not installed. Install with: pip install rembg")
+            print("Returning original image without background removal")
+            for i in fallback:
+                methods[i] = "none"
+        except Exception as e:
+            print(f"Error removing background: {e}")
+            for i in fallback:
+                methods[i] = "none"
+
+    return results, methods
+
+
+class RembgSessionPool:
+    """Lazily created rembg sessions, one per segmentation model"""
+
+    def __init__(self, session_factory: Callable = None):
+        """
+        Initialize the pool
+
+        Args:
+            session_factory: Called as session_factory(model_name) to create a
+                session (default: rembg.new_session)
+        """
+        self._session_factory = session_factory
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, model_name: str = DEFAULT_REMBG_MODEL):
+        """
+        Get the session for a model, creating it on first use
+
+        Raises:
+            ImportError: If rembg is not installed
+        """
+        with self._lock:
+            session = self._sessions.get(model_name)
+            if session is None:
+                factory = self._session_factory
+                if factory is None:
+                    from rembg import new_session
+                    factory = new_session
+                print(f"Creating rembg session: {model_name}")
+                session = factory(model_name)
+                self._sessions[model_name] = session
+            return session
+
+    def remove(self, image: Image.Image, model_name: str = DEFAULT_REMBG_MODEL) -> Image.Image:
+        """
+        Remove the background of one image
+
+        Returns:
+            RGBA image with a transparent background
+        """
+        return self.remove_batch([image], model_name)[0]
+
+    def remove_batch(self, images: list, model_name: str = DEFAULT_REMBG_MODEL) -> list:
+        """
+        Remove the backgrounds of several images with one session
+
+        Args:
+            images: PIL images
+            model_name: rembg model (u2net, isnet-general-use, ...)
+
+        Returns:
+            List of RGBA images in the same order
+        """
+        from rembg import remove
+
+        session = self.session(model_name)
+        return [remove(image, session=session) for image in images]
+
+    def clear(self):
+        """Drop all sessions (frees the ONNX models)"""
+        with self._lock:
+            self._sessions.clear()
+
+    def __contains__(self, model_name: str) -> bool:
+        return model_name in self._sessions
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_rembg_pool() -> RembgSessionPool:
+    """Get the process-wide rembg session pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RembgSessionPool()
+        return _pool
@@ -0,0 +1,189 @@
+"""
+CPU Inference Profile - Tuning for CPU-only render nodes
+
+Bundles the CPU-side optimizations that the default (GPU-oriented) load
+path skips: bf16 autocast on CPUs with native bf16 support, channels_last
+memory layout for the UNet/VAE convolutions, PyTorch SDPA attention,
+optional torch.compile of the UNet, optional dynamic int8 quantization of
+the linear layers (see quantization.py), and explicit thread settings.
+"""
+
+import contextlib
+import os
+from typing import Optional
+
+import torch
+
+
+def cpu_supports_bf16() -> bool:
+    """Check whether the CPU has native bf16 instructions (AVX512-BF16 or AMX)"""
+    try:
+        if torch.cpu._is_avx512_bf16_supported():
+            return True
+    except AttributeError:
+        pass
+    try:
+        if torch.cpu._is_amx_tile_supported():
+            return True
+    except AttributeError:
+        pass
+
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        return False
+
+
+def physical_core_count() -> int:
+    """
+    Physical cores this process may run on
+
+    Starts from the CPUs in the process's affinity mask (so taskset and
+    cpuset limits are honored) and removes SMT siblings using psutil's
+    physical/logical core ratio when psutil is available.
+    """
+    try:
+        allowed = len(os.sched_getaffinity(0))
+    except AttributeError:
+        allowed = os.cpu_count() or 1
+
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False)
+        logical = psutil.cpu_count(logical=True)
+        if physical and logical and physical < logical:
+            allowed = allowed * physical // logical
+    except ImportError:
+        pass
+
+    return max(1, allowed)
+
+
+class CPUInferenceProfile:
+    """CPU-optimized inference settings applied to a loaded pipeline"""
+
+    def __init__(self, bf16: str = False, channels_last: bool = True,
+                 sdpa_attention: bool = True, compile_unet: bool = False,
+                 intra_op_threads: int = None, inter_op_threads: int = None,
+                 int8: bool = False, int8_cache_dir: str = None):
+        """
+        Initialize the profile
+
+        Args:
+            bf16: "auto" (use bf16 autocast when the CPU supports it), True or
+                False (default; bf16 changes the generated images)
+            channels_last: Convert UNet/VAE weights to channels_last layout
+            sdpa_attention: Use PyTorch scaled_dot_product_attention processors
+            compile_unet: Wrap the UNet with torch.compile (slow first run)
+            intra_op_threads: Threads used inside an op (default: physical_core_count())
+            inter_op_threads: Threads used across independent ops (default: torch default)
+            int8: Dynamically quantize the text encoder and UNet linear layers to int8
+            int8_cache_dir: Where quantized weights are cached (default: models/int8)
+        """
+        if bf16 == "auto":
+            bf16 = cpu_supports_bf16()
+        if int8 and bf16:
+            # Dynamic int8 linear layers only accept fp32 activations
+            print("bf16 autocast is disabled with int8 quantization")
+            bf16 = False
+        self.bf16 = bool(bf16)
+        self.channels_last = channels_last
+        self.sdpa_attention = sdpa_attention
+        self.compile_unet = compile_unet
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.int8 = bool(int8)
+        self.int8_cache_dir = int8_cache_dir
+
+    @classmethod
+    def from_config(cls, hardware_config: dict) -> Optional["CPUInferenceProfile"]:
+        """
+        Create a profile from the 'hardware.cpu_profile' section of config.yaml
+
+        Returns:
+            CPUInferenceProfile, or None when the profile is disabled
+        """
+        profile_config = (hardware_config or {}).get('cpu_profile', {}) or {}
+        if not profile_config.get('enabled', False):
+            return None
+
+        return cls(
+            bf16=profile_config.get('bf16', False),
+            channels_last=profile_config.get('channels_last', True),
+            sdpa_attention=profile_config.get('sdpa_attention', True),
+            compile_unet=profile_config.get('compile_unet', False),
+            intra_op_threads=profile_config.get('intra_op_threads'),
+            inter_op_threads=profile_config.get('inter_op_threads'),
+            int8=profile_config.get('int8', False),
+            int8_cache_dir=profile_config.get('int8_cache_dir'),
+        )
+
+    def key(self) -> tuple:
+        """Settings that change the loaded pipeline (used in registry keys)"""
+        key = ("cpu_profile", self.channels_last, self.sdpa_attention, self.compile_unet)
+        return key + ("int8",) if self.int8 else key
+
+    def describe(self) -> str:
+        """Human-readable summary of the active settings"""
+        return (
+            f"bf16={self.bf16}, channels_last={self.channels_last}, "
+            f"sdpa={self.sdpa_attention}, compile_unet={self.compile_unet}, int8={self.int8}, "
+            f"threads={torch.get_num_threads()}/{torch.get_num_interop_threads()}"
+        )
+
+    def apply_threads(self):
+        """Set intra/inter-op thread counts"""
+        intra = self.intra_op_threads
+        if intra is None:
+            # Hyper-threads rarely help GEMM-heavy inference
+            intra = physical_core_count()
+        torch.set_num_threads(int(intra))
+
+        if self.inter_op_threads is not None:
+            try:
+                torch.set_num_interop_threads(int(self.inter_op_threads))
+            except RuntimeError as e:
+                # Can only be set before the first inter-op parallel work
+                print(f"Could not set inter-op threads: {e}")
+
+    def apply(self, pipe):
+        """
+        Apply layout, attention and compile settings to a pipeline in place
+
+        Args:
+            pipe: Loaded diffusers pipeline (base, refiner or img2img)
+        """
+        self.apply_threads()
+
+        unet = getattr(pipe, "unet", None)
+        vae = getattr(pipe, "vae", None)
+
+        if self.channels_last:
+            for module in (unet, vae):
+                if module is not None:
+                    module.to(memory_format=torch.channels_last)
+
+        if self.sdpa_attention and hasattr(torch.nn.functional, "scaled_dot_product_attention"):
+            try:
+                from diffusers.models.attention_processor import AttnProcessor2_0
+                for module in (unet, vae):
+                    if module is not None and hasattr(module, "set_attn_processor"):
+                        module.set_attn_processor(AttnProcessor2_0())
+            except Exception as e:
+                print(f"Could not enable SDPA attention: {e}")
+
+        if self.compile_unet and unet is not None and hasattr(torch, "compile"):
+            try:
+                pipe.unet = torch.compile(unet)
+            except Exception as e:
+                print(f"Could not compile UNet: {e}")
+
+        print(f"CPU inference profile applied: {self.describe()}")
+
+    def autocast(self):
+        """Context manager enabling bf16 autocast when the profile uses it"""
+        if self.bf16:
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
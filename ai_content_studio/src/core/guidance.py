@@ -0,0 +1,92 @@
+"""
+Guidance Schedule - Classifier-free guidance only where it matters
+
+With classifier-free guidance every denoising step runs the UNet twice,
+on the prompt and on the negative prompt. Guidance mostly shapes the
+composition in the early, high-noise steps; the late steps refine detail
+and barely change with it. A guidance schedule turns guidance off (scale
+1.0) after a fraction of the noise schedule, either at once ("truncate")
+or by decaying the scale linearly to 1.0 ("decay"). From then on the
+pipeline batch collapses to the conditional half, so each remaining step
+costs one UNet pass instead of two.
+
+Positions are fractions of the full noise schedule (0.0 = pure noise,
+1.0 = clean image), so a refiner or hi-res pass that starts midway picks
+up the schedule where it is.
+"""
+
+from typing import Optional
+
+
+GUIDANCE_MODES = ("constant", "truncate", "decay")
+
+
+class GuidanceSchedule:
+    """Guidance scale as a function of the position in the noise schedule"""
+
+    def __init__(self, mode: str = "truncate", cutoff: float = 0.6):
+        """
+        Initialize the schedule
+
+        Args:
+            mode: "constant" (regular CFG), "truncate" (full scale, then off at
+                cutoff) or "decay" (linear from the full scale to 1.0 at cutoff)
+            cutoff: Fraction of the noise schedule after which guidance is off
+        """
+        if mode not in GUIDANCE_MODES:
+            raise ValueError(
+                f"Unknown guidance schedule '{mode}' (available: {', '.join(GUIDANCE_MODES)})"
+            )
+        if not 0.0 < cutoff <= 1.0:
+            raise ValueError(f"Guidance cutoff must be in (0, 1], got {cutoff}")
+        self.mode = mode
+        self.cutoff = float(cutoff)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["GuidanceSchedule"]:
+        """
+        Create a schedule from 'generation.image.guidance_schedule' in config.yaml
+
+        Returns:
+            GuidanceSchedule, or None for regular (constant) guidance
+        """
+        schedule_config = (config or {}).get('generation', {}).get('image', {}).get('guidance_schedule', {}) or {}
+        mode = schedule_config.get('mode') or "constant"
+        if mode == "constant":
+            return None
+        return cls(mode, schedule_config.get('cutoff', 0.6))
+
+    @property
+    def is_constant(self) -> bool:
+        """Whether the schedule never changes the scale"""
+        return self.mode == "constant" or (self.mode == "truncate" and self.cutoff >= 1.0)
+
+    def scale_at(self, guidance_scale: float, position: float) -> float:
+        """
+        Guidance scale for the step starting at a position in the noise schedule
+
+        Args:
+            guidance_scale: The requested (full) guidance scale
+            position: Fraction of the noise schedule already denoised
+
+        Returns:
+            Scale to use; 1.0 or less means no unconditional pass
+        """
+        if self.mode == "constant" or guidance_scale <= 1.0:
+            return guidance_scale
+        if position >= self.cutoff:
+            return 1.0
+        if self.mode == "truncate":
+            return guidance_scale
+        return 1.0 + (guidance_scale - 1.0) * (1.0 - position / self.cutoff)
+
+    def guided_steps(self, guidance_scale: float, num_steps: int) -> int:
+        """Number of steps of a full schedule that still run the unconditional pass"""
+        return sum(self.scale_at(guidance_scale, step / num_steps) > 1.0 for step in range(num_steps))
+
+    def key(self) -> list:
+        """JSON-serializable description (part of the request parameters)"""
+        return [self.mode, self.cutoff]
+
+    def __repr__(self) -> str:
+        return f"GuidanceSchedule({self.mode!r}, cutoff={self.cutoff})"
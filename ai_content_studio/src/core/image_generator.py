@@ -32,15 +32,210 @@ from diffusers import (
     EulerAncestralDiscreteScheduler
 )
 from pathlib import Path
-import datetime
+import contextlib
+import copy
+import math
+import random
+import shutil
+import threading
+import time
 from PIL import Image
 
+from .model_registry import get_registry
+from .model_manifest import get_model_manifest
+from .memory_utils import available_device_memory_bytes
+from .prompt_cache import get_prompt_cache
+from .result_cache import ResultCache
+from .single_flight import get_single_flight
+from .profiling import GenerationProfile, current_profile, profile_stage, instrument_module
+from .latent_preview import latents_to_rgb
+from .latent_cache import get_latent_cache, image_digest
+from .tiny_vae import TINY_VAE_MODELS, full_decode, tiny_decode, get_draft_latents
+from .guidance import GuidanceSchedule
+from .token_merging import TokenMerging, token_merging
+from .cpu_profile import CPUInferenceProfile
+from .quantization import INT8_COMPONENTS, DEFAULT_INT8_CACHE_DIR, Int8ModuleCache, quantize_components
+from .offload import OffloadPolicy
+from .image_writer import SaveOptions, get_image_writer, write_image
+from .output_store import OutputStore, new_asset_id
+from .background_removal import remove_backgrounds
+from .tiled_diffusion import NATIVE_SIZE, TiledDiffusion, native_size, snapshot_native_size
+from .sweep import SweepResult, plan_sweep, group_cells, make_contact_sheet
+
+
+REFINER_MODEL = "stabilityai/stable-diffusion-xl-refiner-1.0"
+
+
+# Rough activation memory per output megapixel for one denoising step with
+# CFG at fp16 (weights excluded); used to size batched micro-batches
+ACTIVATION_BYTES_PER_MEGAPIXEL = {
+    "sdxl": 2.5 * 1024 ** 3,
+    "sd": 3.0 * 1024 ** 3,
+}
+BATCH_MEMORY_HEADROOM = 0.7  # Only plan against 70% of free memory
+MAX_MICRO_BATCH = 8
+
+# Fraction of the noise schedule the SDXL base denoises before handing its
+# still-noisy latents to the refiner, which finishes the remaining steps
+REFINER_HANDOFF = 0.8
+
+# Two-stage hi-res mode: the base pass runs every step at HIRES_BASE_SCALE of
+# the requested size, the latents are upscaled, and a short img2img pass at
+# HIRES_STRENGTH re-denoises them at full size for HIRES_REFINE_FRACTION of
+# the requested steps. See benchmarks/benchmark_hires.py.
+HIRES_BASE_SCALE = 0.5
+HIRES_STRENGTH = 0.5
+HIRES_REFINE_FRACTION = 0.25
+
+# Named speed presets: scheduler, solver order and step count chosen together.
+# A scheduler of None keeps the model's default (Euler Ancestral for SDXL,
+# DPM-Solver++ for SD 1.x/2.x). Drafts decode with the tiny VAE by default.
+# See benchmarks/benchmark_presets.py and benchmarks/benchmark_tiny_vae.py.
+SPEED_PRESETS = {
+    "draft": {
+        "scheduler": "DPMSolverMultistepScheduler",
+        "scheduler_options": {"solver_order": 2, "use_karras_sigmas": True},
+        "steps": 12,
+        "tiny_vae": True,
+    },
+    "balanced": {
+        "scheduler": "DPMSolverMultistepScheduler",
+        "scheduler_options": {"solver_order": 2, "use_karras_sigmas": True},
+        "steps": 25,
+        "tiny_vae": False,
+    },
+    "final": {
+        "scheduler": None,
+        "scheduler_options": {},
+        "steps": 50,
+        "tiny_vae": False,
+    },
+}
+
+# Tiny VAEs that failed to load (offline, missing); not retried in this process
+_UNAVAILABLE_TINY_VAES = set()
+
+
+class GenerationCancelled(Exception):
+    """Raised when a running generation is stopped through its cancel event"""
+
+
+class StepCallback:
+    """
+    Per-step hook for diffusers' callback_on_step_end
+
+    Reports step progress across base, refiner and micro-batches, emits cheap
+    latent previews every N steps, applies the guidance schedule, and aborts
+    the run when the cancel event is set.
+    """
+
+    # Batch-doubled tensors that collapse to their conditional half when guidance stops
+    CFG_TENSORS = ("prompt_embeds", "add_text_embeds", "add_time_ids")
+
+    def __init__(self, total_steps: int, progress_callback=None, cancel_event=None,
+                 preview_callback=None, preview_interval: int = 5, is_sdxl: bool = True,
+                 preview_decoder=None, guidance_schedule: GuidanceSchedule = None):
+        """
+        Args:
+            total_steps: Total denoising steps across all passes
+            progress_callback: Called as progress_callback(completed_steps, total_steps)
+            cancel_event: threading.Event; setting it stops the generation
+            preview_callback: Called with a small PIL preview image
+            preview_interval: Emit a preview every N steps
+            is_sdxl: Select the SDXL latent-to-RGB projection
+            preview_decoder: Optional callable turning a (1, C, H, W) latent into
+                the preview image (e.g. a tiny VAE decode) instead of the projection
+            guidance_schedule: Optional schedule that lowers or stops
+                classifier-free guidance in later steps
+        """
+        self.total_steps = total_steps
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.preview_callback = preview_callback
+        self.preview_interval = preview_interval
+        self.is_sdxl = is_sdxl
+        self.preview_decoder = preview_decoder
+        self.guidance_schedule = guidance_schedule
+        self.offset = 0
+        self._pass = (None, 0.0, 1.0)
+
+    @property
+    def tensor_inputs(self) -> list:
+        """Tensors the pipeline should pass to the callback"""
+        if self.guidance_schedule is None:
+            return ["latents"]
+        return ["latents", "prompt_embeds"] + (["add_text_embeds", "add_time_ids"] if self.is_sdxl else [])
+
+    def begin_pass(self, guidance_scale: float, start: float = 0.0, end: float = 1.0) -> float:
+        """
+        Start a pipeline call covering [start, end] of the noise schedule
+
+        Returns:
+            Guidance scale to pass to the call (its first step's scale)
+        """
+        self._pass = (guidance_scale, start, end)
+        return self.guidance_at(0, 1)
+
+    def guidance_at(self, step: int, num_steps: int) -> float:
+        """Guidance scale for a step of the current pipeline call"""
+        guidance_scale, start, end = self._pass
+        if self.guidance_schedule is None:
+            return guidance_scale
+        return self.guidance_schedule.scale_at(guidance_scale, start + (end - start) * step / num_steps)
+
+    def _update_guidance(self, pipe, step: int, callback_kwargs: dict):
+        """Set the next step's scale; drop the unconditional half once guidance is off"""
+        if "prompt_embeds" not in callback_kwargs:
+            return  # Not a diffusers pipeline loop (tiled generation reads guidance_at())
+        guided = pipe.do_classifier_free_guidance
+        pipe._guidance_scale = self.guidance_at(step + 1, pipe.num_timesteps)
+        if guided and not pipe.do_classifier_free_guidance:
+            for name in self.CFG_TENSORS:
+                if callback_kwargs.get(name) is not None:
+                    callback_kwargs[name] = callback_kwargs[name].chunk(2)[1]
+
+    def check_cancelled(self):
+        """Raise GenerationCancelled if cancellation was requested"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise GenerationCancelled("Generation cancelled")
+
+    def advance(self, steps: int):
+        """Mark a finished pass so later step indices continue from here"""
+        self.offset += steps
+
+    def __call__(self, pipe, step: int, timestep, callback_kwargs: dict) -> dict:
+        self.check_cancelled()
+
+        completed = min(self.offset + step + 1, self.total_steps)
+        if self.progress_callback is not None:
+            self.progress_callback(completed, self.total_steps)
+
+        if self.guidance_schedule is not None and self._pass[0] is not None:
+            self._update_guidance(pipe, step, callback_kwargs)
+
+        if (self.preview_callback is not None and self.preview_interval
+                and (step + 1) % self.preview_interval == 0):
+            latents = callback_kwargs.get("latents")
+            if latents is not None:
+                if self.preview_decoder is not None:
+                    self.preview_callback(self.preview_decoder(latents[:1]))
+                else:
+                    self.preview_callback(latents_to_rgb(latents, self.is_sdxl))
+
+        return callback_kwargs
+
 
 class ImageGenerator:
     """Generate high-quality images using Stable Diffusion XL"""
 
     def __init__(self, model_name: str = "stabilityai/stable-diffusion-xl-base-1.0",
-                 cache_dir: Path = None, use_refiner: bool = False):
+                 cache_dir: Path = None, use_refiner: bool = False,
+                 refiner_model: str = REFINER_MODEL,
+                 result_cache: ResultCache = None, cpu_profile: CPUInferenceProfile = None,
+                 hardware_config: dict = None, save_options: SaveOptions = None,
+                 output_store: OutputStore = None, tile_size: int = None,
+                 profile_log: Path = None, tiny_vae_model: str = None,
+                 tiny_vae_previews: bool = False, token_merging: float = 0.0):
         """
         Initialize the image generator
 
@@ -48,100 +243,424 @@ class ImageGenerator:
             model_name: HuggingFace model identifier
             cache_dir: Directory to cache models
             use_refiner: Whether to use SDXL refiner for enhanced quality
+            refiner_model: SDXL refiner model identifier
+            result_cache: Optional on-disk cache for seeded (deterministic) requests
+            cpu_profile: Optional CPU inference tuning (only used when running on CPU)
+            hardware_config: 'hardware' section of config.yaml (device, use_gpu,
+                offload_mode, memory_budget_gb)
+            save_options: Default output format/encoder settings (PNG if not given)
+            output_store: Optional asset index that records every saved image
+            tile_size: Tile edge length in pixels for tiled generation (default:
+                the model's native size); larger outputs are generated in tiles
+            profile_log: Optional JSONL file; when set every generate() and
+                load_model() call is profiled per stage and appended to it
+            tiny_vae_model: Tiny autoencoder for drafts and previews (default:
+                TAESDXL / TAESD to match the model); loaded on first use
+            tiny_vae_previews: Decode live previews with the tiny VAE instead of
+                the latent-to-RGB projection
+            token_merging: Fraction of self-attention tokens merged in the UNet's
+                highest-resolution attention blocks (0 = off; see set_token_merging())
         """
         self.model_name = model_name
         self.cache_dir = cache_dir
         self.use_refiner = use_refiner
+        self.refiner_model = refiner_model
+        self.result_cache = result_cache
+        self.cpu_profile = cpu_profile
+        self.save_options = save_options or SaveOptions()
+        self.output_store = output_store
+        self.profile_log = profile_log
+        self.last_profile = None
         self.pipe = None
         self.refiner = None
+        self._pipe_lock = threading.RLock()
+        self._preset_pipes = {}
+        self._img2img_pipes = {}
+        self._inpaint_pipes = {}
+        self.offload_policy = OffloadPolicy.from_config(hardware_config)
         self.device = self._get_device()
+        self.torch_dtype = torch.float16 if self.device == "cuda" else torch.float32
         self.is_sdxl = "xl" in model_name.lower()
+        self.tiny_vae_model = tiny_vae_model or TINY_VAE_MODELS["sdxl" if self.is_sdxl else "sd"]
+        self.tiny_vae_previews = tiny_vae_previews
+        self.int8_cache = Int8ModuleCache(
+            (cpu_profile.int8_cache_dir if cpu_profile is not None else None) or DEFAULT_INT8_CACHE_DIR
+        )
+        self._fixed_tile_size = tile_size
+        self._snapshot_size = None
+        self.set_token_merging(token_merging)
+        self.offload_mode = self.offload_policy.choose_mode(
+            self.device,
+            "sdxl" if self.is_sdxl else "sd",
+            torch.finfo(self.torch_dtype).bits,
+            use_refiner=use_refiner and self.is_sdxl
+        )
+
+    @property
+    def tile_size(self) -> int:
+        """
+        Tile edge length in pixels for tiled generation
+
+        Unless set in the constructor this is the model's native size, taken
+        from the loaded UNet and VAE (or their configs on disk before the
+        load), so e.g. SD 2.1 tiles above 768 px and SD 1.5 above 512 px.
+        """
+        if self._fixed_tile_size:
+            return self._fixed_tile_size
+        if self.pipe is not None:
+            return native_size(self.pipe)
+        if self._snapshot_size is None:
+            path = get_model_manifest().resolve(self.model_name, self.cache_dir)
+            self._snapshot_size = (snapshot_native_size(path) if path is not None else None) or 0
+        return self._snapshot_size or NATIVE_SIZE["sdxl" if self.is_sdxl else "sd"]
 
     def _get_device(self):
-        """Get the appropriate device (CUDA/CPU)"""
-        if torch.cuda.is_available():
-            return "cuda"
-        elif torch.backends.mps.is_available():
-            return "mps"
-        else:
-            return "cpu"
+        """Get the appropriate device (CUDA/MPS/CPU) honoring the hardware config"""
+        return self.offload_policy.resolve_device()
+
+    def _weights_device(self) -> str:
+        """Where the pipeline weights are held between steps (RAM when offloading)"""
+        return self.device if self.offload_mode == "resident" else "cpu"
+
+    def _registry_key(self) -> tuple:
+        """Key identifying this generator's pipelines in the shared model registry"""
+        return (
+            "image", self.model_name, str(self.torch_dtype), self.device,
+            self.refiner_model if self.use_refiner else None, self.offload_mode, self._pipeline_variant()
+        )
 
-    def load_model(self):
-        """Load the Stable Diffusion model (SDXL or SD 1.5)"""
+    def _pipeline_variant(self) -> tuple:
+        """In-place pipeline modifications that must not be shared with plain loads"""
+        if self._cpu_profile_active():
+            return self.cpu_profile.key()
+        return ()
+
+    def _cpu_profile_active(self) -> bool:
+        """Whether the CPU inference profile applies to this generator"""
+        return self.cpu_profile is not None and self.device == "cpu"
+
+    def _int8_active(self) -> bool:
+        """Whether text encoder and UNet linear layers are quantized to int8"""
+        return self._cpu_profile_active() and self.cpu_profile.int8
+
+    def set_token_merging(self, ratio: float):
+        """
+        Set the token-merging ratio for the following generations
+
+        The UNets are patched in place with removable hooks for the duration
+        of each denoising pass and restored afterwards, so switching the ratio
+        (or back to 0) never reloads weights, and other generators sharing the
+        pipeline are unaffected.
+
+        Args:
+            ratio: Fraction of self-attention tokens to merge, in [0, 0.75]
+                (0 = off; around 0.5 is a good speed/quality trade-off)
+        """
+        TokenMerging(ratio)  # Validates the ratio
+        self.token_merging = ratio
+
+    def _token_merging(self, *pipes):
+        """Context applying token merging to the pipelines' UNets (no-op when off)"""
+        return token_merging([getattr(pipe, "unet", None) for pipe in pipes], self.token_merging)
+
+    def _autocast(self):
+        """Autocast context for denoising (bf16 on capable CPUs with the CPU profile)"""
+        if self._cpu_profile_active():
+            return self.cpu_profile.autocast()
+        return contextlib.nullcontext()
+
+    def load_model(self, profile: GenerationProfile = None):
+        """
+        Load the Stable Diffusion model (SDXL or SD 1.5) through the shared registry
+
+        Args:
+            profile: Optional profile to record the load in (see generate())
+        """
         if self.pipe is not None:
             return
 
+        with self._profiling(profile, "load_model"), profile_stage("load_model"):
+            # Generators sharing the pipelines take turns running them
+            self._pipe_lock = get_registry().usage_lock(self._registry_key())
+            self.pipe, self.refiner = get_registry().get_or_load(
+                self._registry_key(),
+                self._load_pipelines,
+                device=self._weights_device()
+            )
+
+            # The decode runs inside the pipeline calls; time it through hooks
+            for pipe in (self.pipe, self.refiner):
+                if pipe is not None:
+                    instrument_module(pipe.vae.decoder, "vae_decode")
+
+            # Precompute the default negative prompt embedding (a cache hit once encoded)
+            with torch.inference_mode(), profile_stage("encode"):
+                get_prompt_cache().encode(
+                    self.pipe, self._embedding_key(),
+                    self._enhance_negative_prompt(""), self.device
+                )
+
+    @contextlib.contextmanager
+    def _profiling(self, profile: GenerationProfile, label: str):
+        """
+        Activate a profile for a public call
+
+        Uses the given profile, or a new one when profile_log is set. Calls
+        made while a profile is already active (load_model() inside
+        generate()) record into it instead. Finished profiles are kept in
+        last_profile and appended to profile_log.
+        """
+        if profile is None and self.profile_log is not None and current_profile() is None:
+            profile = GenerationProfile(label=label, device=self.device)
+        if profile is None or current_profile() is profile:
+            yield profile
+            return
+        if not profile.label:
+            profile.label = label
+
+        try:
+            with profile.activate():
+                yield profile
+        finally:
+            self.last_profile = profile
+            if self.profile_log is not None:
+                try:
+                    profile.write_jsonl(self.profile_log)
+                except Exception as e:
+                    print(f"Could not write profile log: {e}")
+
+    def _load_pipelines(self) -> tuple:
+        """Build the base pipeline (and optional refiner) from pretrained weights"""
+        refiner = None
+
         print(f"Loading model: {self.model_name}")
         print(f"Using device: {self.device}")
+        print(f"Execution mode: {self.offload_mode}")
 
         # Determine which pipeline to use
         if self.is_sdxl:
             # Load SDXL pipeline for high quality
-            self.pipe = StableDiffusionXLPipeline.from_pretrained(
+            pipe = self._from_pretrained(
+                StableDiffusionXLPipeline,
                 self.model_name,
-                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                cache_dir=self.cache_dir,
+                int8_components=INT8_COMPONENTS,
+                torch_dtype=self.torch_dtype,
                 use_safetensors=True,
                 variant="fp16" if self.device == "cuda" else None,
             )
 
             # Use Euler Ancestral scheduler for better quality with SDXL
-            self.pipe.scheduler = EulerAncestralDiscreteScheduler.from_config(
-                self.pipe.scheduler.config
+            pipe.scheduler = EulerAncestralDiscreteScheduler.from_config(
+                pipe.scheduler.config
             )
 
             # Load refiner if requested
             if self.use_refiner:
                 print("Loading SDXL refiner for enhanced quality...")
                 try:
-                    from diffusers import StableDiffusionXLImg2ImgPipeline
-                    self.refiner = StableDiffusionXLImg2ImgPipeline.from_pretrained(
-                        "stabilityai/stable-diffusion-xl-refiner-1.0",
-                        torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                        cache_dir=self.cache_dir,
-                        use_safetensors=True,
-                        variant="fp16" if self.device == "cuda" else None,
-                    )
-                    self.refiner = self.refiner.to(self.device)
+                    refiner = self._load_refiner(pipe)
                     print("Refiner loaded successfully")
                 except Exception as e:
                     print(f"Could not load refiner: {e}")
-                    self.refiner = None
+                    refiner = None
         else:
             # Load standard SD 1.5 pipeline
-            self.pipe = StableDiffusionPipeline.from_pretrained(
+            pipe = self._from_pretrained(
+                StableDiffusionPipeline,
                 self.model_name,
-                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                cache_dir=self.cache_dir,
+                int8_components=("text_encoder", "unet"),
+                torch_dtype=self.torch_dtype,
                 safety_checker=None,
             )
 
             # Use DPM-Solver++ scheduler for faster inference
-            self.pipe.scheduler = DPMSolverMultistepScheduler.from_config(
-                self.pipe.scheduler.config
+            pipe.scheduler = DPMSolverMultistepScheduler.from_config(
+                pipe.scheduler.config
             )
 
-        # Move to device
-        self.pipe = self.pipe.to(self.device)
+        # Move to device (or set up offloading within the memory budget)
+        mode = self.offload_policy.apply(pipe, self.offload_mode, self.device)
+        if mode != self.offload_mode:
+            print(f"Execution mode: {mode}")
+        if refiner is not None:
+            # Resident, this only moves the refiner UNet (the shared modules are
+            # placed). With offloading the refiner re-hooks the shared VAE and
+            # text_encoder_2 into its own chain; each pipeline re-hooks all its
+            # components at the end of every call (maybe_free_model_hooks), so
+            # both keep offloading, they just take turns owning those hooks
+            self.offload_policy.apply(refiner, self.offload_mode, self.device)
 
         # Enable memory optimizations
         if self.device == "cuda":
-            self.pipe.enable_attention_slicing()
+            pipe.enable_attention_slicing()
             # Try to enable xformers if available
             try:
-                self.pipe.enable_xformers_memory_efficient_attention()
+                pipe.enable_xformers_memory_efficient_attention()
             except Exception:
                 pass
 
             # Enable VAE slicing for SDXL to reduce memory usage
             if self.is_sdxl:
                 try:
-                    self.pipe.enable_vae_slicing()
-                    self.pipe.enable_vae_tiling()
+                    pipe.enable_vae_slicing()
+                    pipe.enable_vae_tiling()
                 except Exception:
                     pass
 
+        # CPU-only nodes: layout, attention, compile and thread tuning
+        if self._cpu_profile_active():
+            self.cpu_profile.apply(pipe)
+            if refiner is not None:
+                self.cpu_profile.apply(refiner)
+
         print("Model loaded successfully")
+        return pipe, refiner
+
+    def _load_refiner(self, pipe):
+        """
+        Build the SDXL refiner around the base pipeline's modules
+
+        The refiner uses the same second text encoder, tokenizer and VAE as the
+        base model, so the base pipeline's instances are passed in rather than
+        loading a second copy; only the refiner UNet and scheduler are read
+        from the refiner checkpoint.
+
+        Args:
+            pipe: Loaded SDXL base pipeline (not yet moved to the device)
+
+        Returns:
+            StableDiffusionXLImg2ImgPipeline sharing the base modules
+        """
+        from diffusers import StableDiffusionXLImg2ImgPipeline
+        return self._from_pretrained(
+            StableDiffusionXLImg2ImgPipeline,
+            self.refiner_model,
+            int8_components=("unet",),
+            text_encoder=None,
+            tokenizer=None,
+            text_encoder_2=pipe.text_encoder_2,
+            tokenizer_2=pipe.tokenizer_2,
+            vae=pipe.vae,
+            torch_dtype=self.torch_dtype,
+            use_safetensors=True,
+            variant="fp16" if self.device == "cuda" else None,
+        )
+
+    def _from_pretrained(self, pipeline_cls, model_id: str, int8_components: tuple = (), **kwargs):
+        """
+        Load a pipeline, with int8 components when quantization is active
+
+        Quantized components come from the int8 cache when present, so their
+        fp32 weights are never read; otherwise they are quantized after the
+        load and cached for the next one.
+
+        Args:
+            pipeline_cls: Diffusers pipeline class
+            model_id: Model identifier or path
+            int8_components: Components to quantize with the int8 CPU profile
+            **kwargs: Passed to from_pretrained
+        """
+        if not (int8_components and self._int8_active()):
+            return self._load_pretrained(pipeline_cls, model_id, **kwargs)
+
+        revision = get_model_manifest().resolve(model_id, self.cache_dir)
+        revision = str(revision) if revision is not None else None
+        cached = self.int8_cache.load(model_id, revision, int8_components)
+        if cached:
+            print(f"Loaded cached int8 {', '.join(cached)} for {model_id}")
+            return self._load_pretrained(pipeline_cls, model_id, **kwargs, **cached)
+
+        pipe = self._load_pretrained(pipeline_cls, model_id, **kwargs)
+        start = time.perf_counter()
+        quantized = quantize_components(pipe, int8_components)
+        print(f"Quantized {', '.join(quantized)} of {model_id} to int8 "
+              f"in {time.perf_counter() - start:.1f}s")
+        self.int8_cache.save(model_id, revision, quantized)
+        return pipe
+
+    def _load_pretrained(self, pipeline_cls, model_id: str, **kwargs):
+        """
+        Load a pipeline, from the local snapshot when the manifest has one
+
+        A local snapshot is read with local_files_only, so no hub requests are
+        made. Without one (or if it turns out incomplete) the model is loaded
+        through the hub into cache_dir and the new snapshot is recorded.
+        """
+        manifest = get_model_manifest()
+        path = manifest.resolve(model_id, self.cache_dir)
+        if path is not None:
+            if str(path) != model_id:
+                print(f"Loading {model_id} from local snapshot: {path}")
+            try:
+                return pipeline_cls.from_pretrained(str(path), local_files_only=True, **kwargs)
+            except (OSError, ValueError) as e:
+                if Path(model_id).is_dir():
+                    raise
+                print(f"Local snapshot of {model_id} is incomplete ({e}); loading from the hub")
+                manifest.refresh(model_id)
+
+        pipe = pipeline_cls.from_pretrained(model_id, cache_dir=self.cache_dir, **kwargs)
+        manifest.record_download(model_id, self.cache_dir)
+        return pipe
+
+    def _tiny_vae_key(self) -> tuple:
+        """Key of the tiny VAE in the shared model registry"""
+        return ("tiny_vae", self.tiny_vae_model, str(self.torch_dtype), self.device)
+
+    def _tiny_vae(self):
+        """
+        The tiny autoencoder, loaded on first use and kept in the registry
+
+        Returns:
+            AutoencoderTiny, or None if it could not be loaded (the full VAE
+            is used instead)
+        """
+        if self.tiny_vae_model in _UNAVAILABLE_TINY_VAES:
+            return None
+        try:
+            return get_registry().get_or_load(
+                self._tiny_vae_key(), self._load_tiny_vae, device=self.device
+            )
+        except Exception as e:
+            print(f"Could not load tiny VAE {self.tiny_vae_model}, using the full VAE: {e}")
+            _UNAVAILABLE_TINY_VAES.add(self.tiny_vae_model)
+            return None
+
+    def _load_tiny_vae(self):
+        """Build the tiny autoencoder from pretrained weights"""
+        from diffusers import AutoencoderTiny
+        print(f"Loading tiny VAE: {self.tiny_vae_model}")
+        vae = self._load_pretrained(AutoencoderTiny, self.tiny_vae_model, torch_dtype=self.torch_dtype)
+        # A few MB; stays on the execution device even when the pipeline is offloaded
+        return vae.to(self.device).eval()
+
+    def _use_tiny_vae(self, preset: str = None, tiny_vae: bool = None) -> bool:
+        """Whether a request decodes with the tiny VAE (the preset decides when None)"""
+        if tiny_vae is None:
+            spec = self._preset_spec(preset)
+            tiny_vae = spec is not None and spec.get("tiny_vae", False)
+        return bool(tiny_vae) and self._tiny_vae() is not None
+
+    def _decode_drafts(self, latents, params: list) -> list:
+        """
+        Decode latents with the tiny VAE and keep them for a later full decode
+
+        Args:
+            latents: Latent batch from _run_pipeline(output_type="latent")
+            params: Request parameters, one per latent
+
+        Returns:
+            List of tuples (image, draft_key)
+        """
+        with torch.inference_mode(), self._autocast(), profile_stage("vae_decode"):
+            images = tiny_decode(self._tiny_vae(), self.pipe, latents)
+
+        drafts = []
+        for i, (image, request) in enumerate(zip(images, params)):
+            key = ResultCache.make_key(**request)
+            get_draft_latents().put(key, latents[i:i + 1], request)
+            drafts.append((image, key))
+        return drafts
 
     def generate(
         self,
@@ -153,7 +672,20 @@ class ImageGenerator:
         height: int = 1024,
         seed: int = None,
         output_dir: Path = None,
-        transparent_background: bool = False
+        transparent_background: bool = False,
+        clip_skip: int = None,
+        progress_callback=None,
+        cancel_event=None,
+        preview_callback=None,
+        preview_interval: int = 5,
+        preset: str = None,
+        save_options: SaveOptions = None,
+        async_save: bool = False,
+        tiled: bool = None,
+        hires: bool = False,
+        profile: GenerationProfile = None,
+        tiny_vae: bool = None,
+        guidance_schedule: GuidanceSchedule = None
     ) -> Path:
         """
         Generate a high-quality image from a text prompt
@@ -168,88 +700,1092 @@ class ImageGenerator:
             seed: Random seed for reproducibility
             output_dir: Directory to save the generated image
             transparent_background: Whether to remove background and make transparent
+            clip_skip: Number of CLIP layers to skip when encoding the prompt
+            progress_callback: Called as progress_callback(step, total_steps) after each step
+            cancel_event: threading.Event; set it to stop the run (raises GenerationCancelled)
+            preview_callback: Called with a cheap latent preview (PIL image) every few steps
+            preview_interval: Steps between previews
+            preset: Speed preset name from SPEED_PRESETS ("draft", "balanced", "final");
+                sets the scheduler and overrides num_inference_steps
+            save_options: Output format/encoder settings for this request
+            async_save: Return a Future for the path instead of waiting for the write
+            tiled: Denoise in overlapping native-size tiles with a tiled VAE decode,
+                bounding memory by the tile size (None = only above the native size)
+            hires: Two-stage hi-res mode: denoise at a lower resolution, upscale
+                the latents and finish with a short full-size img2img pass
+            profile: Optional GenerationProfile that records wall time, CPU time
+                and peak memory per stage (load_model, encode, denoise,
+                vae_decode, refiner, background_removal, save); also kept in
+                self.last_profile
+            tiny_vae: Decode with the tiny VAE (None = the preset decides; on for
+                "draft"). The latents are kept so redecode() can produce the
+                full-VAE image later; unseeded drafts get a random seed
+            guidance_schedule: Optional GuidanceSchedule that stops classifier-free
+                guidance after part of the schedule; unguided steps run the UNet
+                on the prompt only, halving their cost
 
         Returns:
-            Path to the generated image
+            Path to the generated image (a Future resolving to it with async_save)
         """
-        # Load model if not already loaded
-        self.load_model()
+        with self._profiling(profile, "generate") as active_profile:
+            num_inference_steps = self._preset_steps(preset, num_inference_steps)
+            if hires:
+                tiled = False
 
-        # Enhance prompt for quality
-        enhanced_prompt = self._enhance_prompt(prompt, transparent_background)
+            # Drafts are always seeded, so the full decode matches a full render
+            tiny_vae = self._use_tiny_vae(preset, tiny_vae)
+            if tiny_vae and seed is None:
+                seed = random.randrange(2 ** 32)
+                print(f"Draft seed: {seed}")
 
-        # Enhance negative prompt for quality
-        enhanced_negative = self._enhance_negative_prompt(negative_prompt)
+            # Enhance prompt for quality
+            enhanced_prompt = self._enhance_prompt(prompt, transparent_background)
+
+            # Enhance negative prompt for quality
+            enhanced_negative = self._enhance_negative_prompt(negative_prompt)
 
-        # Set seed for reproducibility
-        generator = None
-        if seed is not None:
-            generator = torch.Generator(device=self.device).manual_seed(seed)
+            params = self._request_params(
+                enhanced_prompt, enhanced_negative, seed, num_inference_steps,
+                guidance_scale, width, height, transparent_background, clip_skip, preset,
+                tiled, hires, tiny_vae, guidance_schedule
+            )
+            if active_profile is not None:
+                active_profile.params = params
+            draft_key = ResultCache.make_key(**params) if tiny_vae else None
 
-        # Generate image
-        print(f"Generating high-quality image with prompt: {prompt}")
-        print(f"Enhanced prompt: {enhanced_prompt}")
+            # Seeded requests are deterministic: serve repeats from the result cache
+            # (not drafts: a cached image has no latents to decode in full later)
+            cache_key = None
+            if self.result_cache is not None and seed is not None and not tiny_vae:
+                cache_key = ResultCache.make_key(**params)
+                cached_path = self.result_cache.get(cache_key)
+                if cached_path is not None:
+                    with profile_stage("save"):
+                        future = self._copy_cached(cached_path, output_dir, save_options=save_options,
+                                                   params=params)
+                        return self._finish_write(future, async_save, "Cached image copied to")
 
-        with torch.inference_mode():
-            if self.is_sdxl:
-                # SDXL generation
-                result = self.pipe(
-                    prompt=enhanced_prompt,
-                    negative_prompt=enhanced_negative,
+            def compute():
+                # Load model if not already loaded
+                self.load_model()
+
+                # Generate image
+                print(f"Generating high-quality image with prompt: {prompt}")
+                print(f"Enhanced prompt: {enhanced_prompt}")
+
+                step_callback = self._make_step_callback(
+                    num_inference_steps, 1, progress_callback, cancel_event,
+                    preview_callback, preview_interval, hires, tiny_vae, guidance_schedule
+                )
+
+                start = time.perf_counter()
+                result = self._run_pipeline(
+                    prompts=[enhanced_prompt],
+                    negative_prompts=[enhanced_negative],
+                    seeds=[seed],
                     num_inference_steps=num_inference_steps,
                     guidance_scale=guidance_scale,
                     width=width,
                     height=height,
-                    generator=generator,
-                    output_type="pil" if not self.use_refiner else "latent",
+                    clip_skip=clip_skip,
+                    step_callback=step_callback,
+                    preset=preset,
+                    tiled=tiled,
+                    hires=hires,
+                    output_type="latent" if tiny_vae else "pil",
                 )
+                if tiny_vae:
+                    (image, _), = self._decode_drafts(result, [params])
+                else:
+                    image = result[0]
+                timings = {'generate_s': time.perf_counter() - start}
 
-                # Apply refiner if available
-                if self.refiner is not None:
-                    print("Applying refiner for enhanced quality...")
-                    result = self.refiner(
-                        prompt=enhanced_prompt,
-                        negative_prompt=enhanced_negative,
-                        image=result.images,
-                        num_inference_steps=20,
-                        strength=0.3,
-                        generator=generator,
+                # Remove background if requested
+                if transparent_background:
+                    print("Removing background for transparency...")
+                    start = time.perf_counter()
+                    with profile_stage("background_removal"):
+                        (image,), (method,) = self._remove_backgrounds([image])
+                    timings['background_s'] = time.perf_counter() - start
+                    timings['background_method'] = method
+
+                if cache_key is not None:
+                    get_image_writer().submit_call(self.result_cache.put, cache_key, image)
+                return image, timings
+
+            # Unseeded requests are meant to differ; seeded duplicates share one run
+            if seed is None:
+                image, timings = compute()
+            else:
+                # Time spent waiting on another caller's identical run lands here
+                with profile_stage("shared_wait"):
+                    image, timings = self._single_flight(
+                        cache_key or ResultCache.make_key(**params), compute, cancel_event
                     )
 
-                image = result.images[0]
+            with profile_stage("save"):
+                future = self._save_image(image, output_dir, save_options=save_options,
+                                          params=params, timings=timings, draft_key=draft_key)
+                return self._finish_write(future, async_save, "High-quality image saved to")
+
+    def redecode(
+        self,
+        draft_path: Path,
+        output_dir: Path = None,
+        save_options: SaveOptions = None,
+        async_save: bool = False,
+        profile: GenerationProfile = None
+    ) -> Path:
+        """
+        Decode a tiny-VAE draft's latents with the full VAE
+
+        No denoising is repeated: the result is the image generate() returns
+        for the same request without the tiny VAE.
+
+        Args:
+            draft_path: Path of a draft saved by generate()/generate_batch() in
+                this process
+            output_dir: Directory to save the full-quality image
+            save_options: Output format/encoder settings
+            async_save: Return a Future for the path instead of waiting for the write
+            profile: Optional GenerationProfile (see generate())
+
+        Returns:
+            Path to the full-VAE image (a Future resolving to it with async_save)
+        """
+        draft = get_draft_latents().get(draft_path)
+        if draft is None:
+            raise ValueError(
+                f"No latents kept for {draft_path}; only recent tiny-VAE drafts "
+                f"from this session can be re-decoded"
+            )
+        latents, draft_params = draft
+        if draft_params['model'] != self.model_name:
+            raise ValueError(
+                f"{draft_path} was generated with {draft_params['model']}, not {self.model_name}"
+            )
+
+        with self._profiling(profile, "redecode"):
+            self.load_model()
+            start = time.perf_counter()
+            with self._pipe_lock, torch.inference_mode(), self._autocast():
+                image = full_decode(self.pipe, latents)[0]
+            timings = {'decode_s': time.perf_counter() - start}
+
+            if draft_params['transparent_background']:
+                with profile_stage("background_removal"):
+                    (image,), (method,) = self._remove_backgrounds([image])
+                timings['background_method'] = method
+
+            # Same parameters as a full render of the request, so it is cached as one
+            params = {key: value for key, value in draft_params.items() if key != 'vae'}
+            if self.result_cache is not None:
+                get_image_writer().submit_call(
+                    self.result_cache.put, ResultCache.make_key(**params), image
+                )
+
+            with profile_stage("save"):
+                future = self._save_image(image, output_dir, save_options=save_options,
+                                          params=dict(params, redecoded_from=str(draft_path)),
+                                          timings=timings)
+                return self._finish_write(future, async_save, "Full-VAE image saved to")
+
+    def _single_flight(self, key: str, compute, cancel_event=None) -> tuple:
+        """
+        Run a seeded request once, even if identical requests arrive concurrently
+
+        Callers with the same request hash wait for the first one's denoise and
+        get the same image; each still saves its own copy. A waiting caller
+        honors its own cancel event, and runs the request itself if the
+        caller it waited on was cancelled.
+
+        Args:
+            key: Request hash (the result-cache key)
+            compute: Returns (image, timings); run by the first caller only
+
+        Returns:
+            Tuple (image, timings)
+        """
+        def check_cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("Generation cancelled")
+
+        while True:
+            start = time.perf_counter()
+            try:
+                (image, timings), shared = get_single_flight().do(key, compute, check_cancelled)
+            except GenerationCancelled:
+                check_cancelled()
+                print("Identical request was cancelled, generating it here")
+                continue
+
+            if shared:
+                print("Identical request already running, shared its result")
+                timings = dict(timings, shared=True, wait_s=time.perf_counter() - start)
+            return image, timings
+
+    def generate_from_image(
+        self,
+        image,
+        prompt: str,
+        negative_prompt: str = "",
+        strength: float = 0.6,
+        num_inference_steps: int = 30,
+        guidance_scale: float = 7.5,
+        width: int = None,
+        height: int = None,
+        seed: int = None,
+        output_dir: Path = None,
+        clip_skip: int = None,
+        progress_callback=None,
+        cancel_event=None,
+        preset: str = None,
+        save_options: SaveOptions = None,
+        async_save: bool = False
+    ) -> Path:
+        """
+        Generate a variation of an existing image (img2img)
+
+        The img2img pipeline shares every component of the loaded model, and
+        the source image's VAE latents are cached, so repeated edits of the
+        same source only run the denoising steps.
+
+        Args:
+            image: Source image (PIL image or path)
+            prompt: Text description of the desired image
+            negative_prompt: Things to avoid in the image
+            strength: How far to move away from the source (0-1; 1 ignores it)
+            num_inference_steps: Steps of the full schedule; about strength of
+                them actually run
+            guidance_scale: Guidance scale for generation
+            width: Output width (default: source width, rounded down to a multiple of 8)
+            height: Output height (default: source height, rounded down to a multiple of 8)
+            seed: Random seed for reproducibility
+            output_dir: Directory to save the generated image
+            clip_skip: Number of CLIP layers to skip when encoding the prompt
+            progress_callback: Called as progress_callback(step, total_steps) after each step
+            cancel_event: threading.Event; set it to stop the run (raises GenerationCancelled)
+            preset: Speed preset name from SPEED_PRESETS
+            save_options: Output format/encoder settings for this request
+            async_save: Return a Future for the path instead of waiting for the write
+
+        Returns:
+            Path to the generated image (a Future resolving to it with async_save)
+        """
+        return self._generate_edit(
+            image, None, prompt, negative_prompt, strength, num_inference_steps,
+            guidance_scale, width, height, seed, output_dir, clip_skip,
+            progress_callback, cancel_event, preset, save_options, async_save
+        )
+
+    def inpaint(
+        self,
+        image,
+        mask_image,
+        prompt: str,
+        negative_prompt: str = "",
+        strength: float = 0.9,
+        num_inference_steps: int = 30,
+        guidance_scale: float = 7.5,
+        width: int = None,
+        height: int = None,
+        seed: int = None,
+        output_dir: Path = None,
+        clip_skip: int = None,
+        progress_callback=None,
+        cancel_event=None,
+        preset: str = None,
+        save_options: SaveOptions = None,
+        async_save: bool = False
+    ) -> Path:
+        """
+        Regenerate the masked part of an image (inpainting)
+
+        Uses the loaded model's components like generate_from_image(); the
+        source latents are cached, so trying several masks or prompts on the
+        same image encodes it once.
+
+        Args:
+            image: Source image (PIL image or path)
+            mask_image: Mask (PIL image or path); white areas are regenerated,
+                black areas are kept
+            prompt: Text description of the masked area's new content
+            strength: How much of the masked area is re-noised (1 = fully)
+
+        Other arguments are the same as for generate_from_image().
+
+        Returns:
+            Path to the generated image (a Future resolving to it with async_save)
+        """
+        return self._generate_edit(
+            image, mask_image, prompt, negative_prompt, strength, num_inference_steps,
+            guidance_scale, width, height, seed, output_dir, clip_skip,
+            progress_callback, cancel_event, preset, save_options, async_save
+        )
+
+    def _generate_edit(self, image, mask_image, prompt: str, negative_prompt: str,
+                       strength: float, num_inference_steps: int, guidance_scale: float,
+                       width: int, height: int, seed: int, output_dir: Path, clip_skip: int,
+                       progress_callback, cancel_event, preset: str,
+                       save_options: SaveOptions, async_save: bool):
+        """Shared implementation of generate_from_image() and inpaint()"""
+        num_inference_steps = self._preset_steps(preset, num_inference_steps)
+        image = self._load_source_image(image)
+        mask_image = None if mask_image is None else self._load_source_image(mask_image).convert("L")
+        width, height = self._edit_size(image, width, height)
+        mode = "img2img" if mask_image is None else "inpaint"
+
+        enhanced_prompt = self._enhance_prompt(prompt)
+        enhanced_negative = self._enhance_negative_prompt(negative_prompt)
+
+        params = self._request_params(
+            enhanced_prompt, enhanced_negative, seed, num_inference_steps,
+            guidance_scale, width, height, False, clip_skip, preset, tiled=False
+        )
+        params['refiner'] = None
+        params['source'] = {
+            'mode': mode,
+            'image': image_digest(image),
+            'mask': None if mask_image is None else image_digest(mask_image),
+            'strength': strength,
+        }
+
+        cache_key = None
+        if self.result_cache is not None and seed is not None:
+            cache_key = ResultCache.make_key(**params)
+            cached_path = self.result_cache.get(cache_key)
+            if cached_path is not None:
+                future = self._copy_cached(cached_path, output_dir, save_options=save_options,
+                                           params=params)
+                return self._finish_write(future, async_save, "Cached image copied to")
+
+        self.load_model()
+
+        print(f"Running {mode} with prompt: {prompt} (strength {strength})")
+
+        step_callback = self._make_step_callback(
+            self._edit_steps(num_inference_steps, strength), 1, progress_callback, cancel_event
+        )
+
+        start = time.perf_counter()
+        result = self._run_edit(
+            image, mask_image,
+            prompts=[enhanced_prompt],
+            negative_prompts=[enhanced_negative],
+            seeds=[seed],
+            num_inference_steps=num_inference_steps,
+            guidance_scale=guidance_scale,
+            width=width,
+            height=height,
+            strength=strength,
+            clip_skip=clip_skip,
+            step_callback=step_callback,
+            preset=preset,
+        )[0]
+        timings = {'generate_s': time.perf_counter() - start}
+
+        if cache_key is not None:
+            get_image_writer().submit_call(self.result_cache.put, cache_key, result)
+
+        future = self._save_image(result, output_dir, save_options=save_options,
+                                  params=params, timings=timings)
+        return self._finish_write(future, async_save, "Edited image saved to")
+
+    @staticmethod
+    def _load_source_image(image) -> Image.Image:
+        """Open a source image given as a path (PIL images are returned as-is)"""
+        if isinstance(image, Image.Image):
+            return image
+        with Image.open(image) as opened:
+            opened.load()
+            return opened.copy()
+
+    @staticmethod
+    def _edit_size(image: Image.Image, width: int = None, height: int = None) -> tuple:
+        """Output size of an edit: the requested or source size, multiples of 8"""
+        width = width or image.width
+        height = height or image.height
+        return max(8, width // 8 * 8), max(8, height // 8 * 8)
+
+    @staticmethod
+    def _edit_steps(num_inference_steps: int, strength: float) -> int:
+        """Denoising steps an img2img/inpaint pass runs at the given strength"""
+        return min(int(num_inference_steps * strength), num_inference_steps)
+
+    def _make_step_callback(self, num_inference_steps: int, num_passes: int,
+                            progress_callback=None, cancel_event=None,
+                            preview_callback=None, preview_interval: int = 5,
+                            hires: bool = False, tiny_vae: bool = False,
+                            guidance_schedule: GuidanceSchedule = None):
+        """Build a StepCallback covering num_passes pipeline runs (None if unused)"""
+        if guidance_schedule is not None and guidance_schedule.is_constant:
+            guidance_schedule = None
+        if (progress_callback is None and cancel_event is None and preview_callback is None
+                and guidance_schedule is None):
+            return None
+
+        # With the refiner the base and refiner split one schedule between them;
+        # hi-res mode adds the full-size refine steps
+        steps_per_pass = num_inference_steps
+        if hires:
+            steps_per_pass += self._hires_steps(num_inference_steps)[1]
+
+        # Drafts preview with the decoder they are finished with
+        preview_decoder = None
+        if preview_callback is not None and (tiny_vae or self.tiny_vae_previews):
+            vae = self._tiny_vae()
+            if vae is not None:
+                pipe = self.pipe
+                preview_decoder = lambda latents: tiny_decode(vae, pipe, latents)[0]
+
+        return StepCallback(
+            total_steps=steps_per_pass * num_passes,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            preview_callback=preview_callback,
+            preview_interval=preview_interval,
+            is_sdxl=self.is_sdxl,
+            preview_decoder=preview_decoder,
+            guidance_schedule=guidance_schedule,
+        )
+
+    def _make_generators(self, seeds: list):
+        """
+        Build per-image random generators for a batch
+
+        Returns None when no seeds are given, so the pipeline draws fresh noise.
+        Each seeded image gets its own generator, which makes batched output
+        identical to generating the same seeds one at a time.
+        """
+        if all(seed is None for seed in seeds):
+            return None
+
+        generators = []
+        for seed in seeds:
+            generator = torch.Generator(device=self.device)
+            if seed is None:
+                generator.seed()
             else:
-                # Standard SD 1.5 generation
-                result = self.pipe(
-                    prompt=enhanced_prompt,
-                    negative_prompt=enhanced_negative,
+                generator.manual_seed(seed)
+            generators.append(generator)
+        return generators
+
+    def _run_pipeline(
+        self,
+        prompts: list,
+        negative_prompts: list,
+        seeds: list,
+        num_inference_steps: int,
+        guidance_scale: float,
+        width: int,
+        height: int,
+        clip_skip: int = None,
+        step_callback: StepCallback = None,
+        preset: str = None,
+        tiled: bool = None,
+        hires: bool = False,
+        output_type: str = "pil"
+    ) -> list:
+        """
+        Run one batched denoising pass (base + optional refiner)
+
+        With the refiner, the base model stops at REFINER_HANDOFF of the noise
+        schedule and returns latents; the refiner continues from exactly that
+        timestep on the same latents (no decode/re-encode, no added noise).
+        Tiled and hi-res generation run the base model only. Every pass tells
+        the step callback which part of the noise schedule it covers, so a
+        guidance schedule carries on across base, refiner and hi-res passes.
+        Generators sharing the registry pipelines run their passes one at a
+        time (see ModelRegistry.usage_lock()).
+
+        Args:
+            prompts: Enhanced prompts, one per output image
+            negative_prompts: Enhanced negative prompts, one per output image
+            seeds: Seeds (or None) one per output image
+            clip_skip: Number of CLIP layers to skip when encoding prompts
+            step_callback: Optional per-step progress/preview/cancel hook
+            preset: Speed preset whose scheduler is used for the base pass
+            tiled: Tiled generation (None = only above the model's native size)
+            hires: Two-stage hi-res mode (takes precedence over tiling)
+            output_type: "pil", or "latent" to skip the VAE decode
+
+        Returns:
+            List of PIL images in the same order as the prompts (a latent batch
+            with output_type="latent")
+        """
+        generator = self._make_generators(seeds)
+        pipe = self._pipeline_for_preset(preset)
+        tile_size = None if hires else self._tile_size(width, height, tiled)
+
+        callback_kwargs = {}
+        if step_callback is not None:
+            step_callback.check_cancelled()
+            callback_kwargs = {
+                'callback_on_step_end': step_callback,
+                'callback_on_step_end_tensor_inputs': step_callback.tensor_inputs,
+            }
+
+        with self._pipe_lock, torch.inference_mode(), self._autocast():
+            # Encode through the shared embedding cache
+            embeddings = self._encode_prompts(
+                self.pipe, self._embedding_key(), prompts, negative_prompts, clip_skip
+            )
+
+            with profile_stage("denoise"), self._token_merging(pipe, self.refiner):
+                if hires:
+                    if self.refiner is not None:
+                        print("Refiner is skipped in hi-res mode")
+                    return self._run_hires(
+                        pipe, preset, embeddings, num_inference_steps, guidance_scale,
+                        width, height, generator, step_callback, callback_kwargs, output_type
+                    )
+
+                if tile_size is not None:
+                    if self.refiner is not None:
+                        print("Refiner is skipped for tiled generation")
+                    tiled_pipe = TiledDiffusion(pipe, tile_size, is_sdxl=self.is_sdxl)
+                    return tiled_pipe(
+                        **embeddings,
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=self._pass_guidance(step_callback, guidance_scale),
+                        width=width,
+                        height=height,
+                        generator=generator,
+                        output_type=output_type,
+                        guidance_at=step_callback.guidance_at if step_callback is not None else None,
+                        **callback_kwargs,
+                    )
+
+                if self.refiner is None:
+                    result = pipe(
+                        **embeddings,
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=self._pass_guidance(step_callback, guidance_scale),
+                        width=width,
+                        height=height,
+                        generator=generator,
+                        output_type=output_type,
+                        **callback_kwargs,
+                    )
+                    return result.images if output_type == "latent" else list(result.images)
+
+                latents = pipe(
+                    **embeddings,
                     num_inference_steps=num_inference_steps,
-                    guidance_scale=guidance_scale,
+                    denoising_end=REFINER_HANDOFF,
+                    guidance_scale=self._pass_guidance(step_callback, guidance_scale, 0.0, REFINER_HANDOFF),
                     width=width,
                     height=height,
                     generator=generator,
+                    output_type="latent",
+                    **callback_kwargs,
+                ).images
+
+                if step_callback is not None:
+                    step_callback.advance(pipe.num_timesteps)
+
+                print("Applying refiner for enhanced quality...")
+                images = self._refine_latents(
+                    latents, prompts, negative_prompts, num_inference_steps,
+                    self._pass_guidance(step_callback, guidance_scale, REFINER_HANDOFF, 1.0),
+                    generator, clip_skip, callback_kwargs, output_type
+                )
+
+        return images
+
+    @staticmethod
+    def _pass_guidance(step_callback: StepCallback, guidance_scale: float,
+                       start: float = 0.0, end: float = 1.0) -> float:
+        """
+        Start a pipeline pass covering [start, end] of the noise schedule
+
+        Returns:
+            Guidance scale for the pass's pipeline call (its first step's scale
+            under the guidance schedule; 1.0 runs the pass without guidance)
+        """
+        if step_callback is None:
+            return guidance_scale
+        return step_callback.begin_pass(guidance_scale, start, end)
+
+    def _run_hires(self, pipe, preset: str, embeddings: dict, num_inference_steps: int,
+                   guidance_scale: float, width: int, height: int, generator=None,
+                   step_callback: StepCallback = None, callback_kwargs: dict = None,
+                   output_type: str = "pil") -> list:
+        """
+        Two-stage hi-res generation
+
+        Composition is settled by denoising at HIRES_BASE_SCALE of the size;
+        the latents are then upscaled and partially re-noised, and an img2img
+        pass built from the same components adds full-resolution detail.
+
+        Returns:
+            List of PIL images at width x height (latents with output_type="latent")
+        """
+        base_width, base_height = self._hires_base_size(width, height)
+        img2img_steps, refine_steps = self._hires_steps(num_inference_steps)
+        print(f"Hi-res mode: {base_width}x{base_height} for {num_inference_steps} steps, "
+              f"then {width}x{height} for {refine_steps} steps")
+
+        latents = pipe(
+            **embeddings,
+            num_inference_steps=num_inference_steps,
+            guidance_scale=self._pass_guidance(step_callback, guidance_scale),
+            width=base_width,
+            height=base_height,
+            generator=generator,
+            output_type="latent",
+            **(callback_kwargs or {}),
+        ).images
+
+        if step_callback is not None:
+            step_callback.advance(num_inference_steps)
+
+        scale = pipe.vae_scale_factor
+        latents = torch.nn.functional.interpolate(
+            latents, size=(height // scale, width // scale), mode="bicubic", align_corners=False
+        )
+
+        result = self._img2img_pipeline(preset)(
+            **embeddings,
+            image=latents,
+            strength=HIRES_STRENGTH,
+            num_inference_steps=img2img_steps,
+            guidance_scale=self._pass_guidance(step_callback, guidance_scale, 1.0 - HIRES_STRENGTH, 1.0),
+            generator=generator,
+            output_type=output_type,
+            **(callback_kwargs or {}),
+        )
+        return result.images if output_type == "latent" else list(result.images)
+
+    @staticmethod
+    def _hires_base_size(width: int, height: int) -> tuple:
+        """First-stage size for hi-res mode (multiples of 64 px)"""
+        def scaled(size):
+            return max(64, int(round(size * HIRES_BASE_SCALE / 64)) * 64)
+        return scaled(width), scaled(height)
+
+    @staticmethod
+    def _hires_steps(num_inference_steps: int) -> tuple:
+        """
+        Step counts of the hi-res refine pass
+
+        Returns:
+            Tuple (img2img num_inference_steps, steps that actually run at
+            HIRES_STRENGTH)
+        """
+        refine_steps = max(1, round(num_inference_steps * HIRES_REFINE_FRACTION))
+        img2img_steps = math.ceil(refine_steps / HIRES_STRENGTH)
+        return img2img_steps, int(img2img_steps * HIRES_STRENGTH)
+
+    def _run_edit(self, image: Image.Image, mask_image: Image.Image, prompts: list,
+                  negative_prompts: list, seeds: list, num_inference_steps: int,
+                  guidance_scale: float, width: int, height: int, strength: float,
+                  clip_skip: int = None, step_callback: StepCallback = None,
+                  preset: str = None) -> list:
+        """
+        Run one batched img2img (no mask) or inpainting pass on a source image
+
+        The source is passed to the pipeline as cached latents, so the VAE
+        encoder does not run again for a source it has seen. The refiner is
+        not used for edits.
+
+        Args:
+            image: Source image
+            mask_image: Inpainting mask (L mode, white = regenerate) or None
+            prompts: Enhanced prompts, one per output image
+            negative_prompts: Enhanced negative prompts, one per output image
+            seeds: Seeds (or None) one per output image
+            strength: Fraction of the schedule that is re-run
+
+        Returns:
+            List of PIL images in the same order as the prompts
+        """
+        generator = self._make_generators(seeds)
+
+        callback_kwargs = {}
+        if step_callback is not None:
+            step_callback.check_cancelled()
+            callback_kwargs = {
+                'callback_on_step_end': step_callback,
+                'callback_on_step_end_tensor_inputs': step_callback.tensor_inputs,
+            }
+
+        latent_cache = get_latent_cache()
+        with self._pipe_lock, torch.inference_mode(), self._autocast(), self._token_merging(self.pipe):
+            embeddings = self._encode_prompts(
+                self.pipe, self._embedding_key(), prompts, negative_prompts, clip_skip
+            )
+            with profile_stage("vae_encode"):
+                latents = latent_cache.encode(self.pipe, self._embedding_key(), image, width, height)
+
+            if mask_image is None:
+                result = self._img2img_pipeline(preset)(
+                    **embeddings,
+                    image=latents,
+                    strength=strength,
+                    num_inference_steps=num_inference_steps,
+                    guidance_scale=guidance_scale,
+                    generator=generator,
+                    **callback_kwargs,
+                )
+                return list(result.images)
+
+            pipe = self._inpaint_pipeline(preset)
+            if pipe.unet.config.in_channels == 9:
+                # Dedicated inpainting UNets also see the unmasked content
+                masked_latents = latent_cache.encode(
+                    self.pipe, self._embedding_key(),
+                    self._masked_source(image, mask_image), width, height
                 )
-                image = result.images[0]
+            else:
+                # Only the shape matters: regular UNets blend in the source latents instead
+                masked_latents = latents
+
+            result = pipe(
+                **embeddings,
+                image=latents,
+                mask_image=mask_image,
+                masked_image_latents=masked_latents,
+                width=width,
+                height=height,
+                strength=strength,
+                num_inference_steps=num_inference_steps,
+                guidance_scale=guidance_scale,
+                generator=generator,
+                **callback_kwargs,
+            )
+        return list(result.images)
+
+    @staticmethod
+    def _masked_source(image: Image.Image, mask_image: Image.Image) -> Image.Image:
+        """Source image with the masked area set to mid-gray, like the pipelines do"""
+        mask = mask_image.resize(image.size).point(lambda value: 255 if value >= 128 else 0)
+        gray = Image.new("RGB", image.size, (128, 128, 128))
+        return Image.composite(gray, image.convert("RGB"), mask)
+
+    def _img2img_pipeline(self, preset: str = None):
+        """
+        Img2img pipeline assembled from the loaded base components
+
+        No weights are loaded or copied; like the preset pipelines it is kept
+        per generator and uses the preset's scheduler.
+        """
+        if preset not in self._img2img_pipes:
+            from diffusers import StableDiffusionImg2ImgPipeline, StableDiffusionXLImg2ImgPipeline
+            components = self._pipeline_for_preset(preset).components
+            if self.is_sdxl:
+                pipe = StableDiffusionXLImg2ImgPipeline(**components)
+            else:
+                pipe = StableDiffusionImg2ImgPipeline(**components, requires_safety_checker=False)
+            self._img2img_pipes[preset] = pipe
+        return self._img2img_pipes[preset]
+
+    def _inpaint_pipeline(self, preset: str = None):
+        """
+        Inpainting pipeline assembled from the loaded base components
+
+        Works with regular checkpoints (the masked area is re-noised and the
+        rest is blended back every step) as well as dedicated 9-channel
+        inpainting UNets. No weights are loaded or copied.
+        """
+        if preset not in self._inpaint_pipes:
+            from diffusers import StableDiffusionInpaintPipeline, StableDiffusionXLInpaintPipeline
+            components = self._pipeline_for_preset(preset).components
+            if self.is_sdxl:
+                pipe = StableDiffusionXLInpaintPipeline(**components)
+            else:
+                pipe = StableDiffusionInpaintPipeline(**components, requires_safety_checker=False)
+            self._inpaint_pipes[preset] = pipe
+        return self._inpaint_pipes[preset]
+
+    def _refine_latents(self, latents, prompts: list, negative_prompts: list,
+                        num_inference_steps: int, guidance_scale: float,
+                        generator=None, clip_skip: int = None,
+                        callback_kwargs: dict = None, output_type: str = "pil") -> list:
+        """
+        Finish partially denoised base latents with the SDXL refiner
+
+        Args:
+            latents: Base model latents stopped at REFINER_HANDOFF
+            prompts: Enhanced prompts, one per latent
+            negative_prompts: Enhanced negative prompts, one per latent
+            num_inference_steps: Step count of the whole schedule (the refiner
+                runs the part after REFINER_HANDOFF)
+            guidance_scale: Guidance scale of the refiner's first step
+            generator: Random generator(s) used for the base pass
+            output_type: "pil", or "latent" to skip the VAE decode
+
+        Returns:
+            List of PIL images (latents with output_type="latent")
+        """
+        with profile_stage("refiner"):
+            refiner_embeddings = self._encode_prompts(
+                self.refiner, self._embedding_key(self.refiner_model),
+                prompts, negative_prompts, clip_skip
+            )
+            result = self.refiner(
+                **refiner_embeddings,
+                image=latents,
+                num_inference_steps=num_inference_steps,
+                denoising_start=REFINER_HANDOFF,
+                guidance_scale=guidance_scale,
+                generator=generator,
+                output_type=output_type,
+                **(callback_kwargs or {}),
+            )
+            return result.images if output_type == "latent" else list(result.images)
+
+    @staticmethod
+    def _preset_spec(preset: str = None) -> dict:
+        """Look up a speed preset (None when no preset is used)"""
+        if preset is None:
+            return None
+        if preset not in SPEED_PRESETS:
+            raise ValueError(
+                f"Unknown speed preset '{preset}' (available: {', '.join(SPEED_PRESETS)})"
+            )
+        return SPEED_PRESETS[preset]
 
-        # Remove background if requested
-        if transparent_background:
-            print("Removing background for transparency...")
-            image = self._remove_background(image)
+    def _preset_steps(self, preset: str, num_inference_steps: int) -> int:
+        """Step count to use: the preset's, or the requested one without a preset"""
+        spec = self._preset_spec(preset)
+        if spec is None:
+            return num_inference_steps
+        return spec["steps"]
 
-        # Save image
+    def _pipeline_for_preset(self, preset: str = None):
+        """
+        Base pipeline running with the preset's scheduler
+
+        The registry pipeline is shared between generators, so its scheduler is
+        never swapped in place. Instead a shallow copy holding the preset
+        scheduler is kept per generator; all model weights stay shared.
+        """
+        spec = self._preset_spec(preset)
+        if spec is None or spec["scheduler"] is None:
+            return self.pipe
+
+        if preset not in self._preset_pipes:
+            import diffusers
+            scheduler_cls = getattr(diffusers, spec["scheduler"])
+            scheduler = scheduler_cls.from_config(
+                self.pipe.scheduler.config, **spec["scheduler_options"]
+            )
+            pipe = copy.copy(self.pipe)
+            pipe.scheduler = scheduler
+            self._preset_pipes[preset] = pipe
+
+        return self._preset_pipes[preset]
+
+    def _embedding_key(self, model_name: str = None) -> tuple:
+        """Key identifying a set of text encoders in the prompt embedding cache"""
+        key = (model_name or self.model_name, str(self.torch_dtype), self.device)
+        return key + ("int8",) if self._int8_active() else key
+
+    def _encode_prompts(self, pipe, model_key: tuple, prompts: list,
+                        negative_prompts: list, clip_skip: int = None) -> dict:
+        """
+        Encode a batch of prompts using the prompt embedding cache
+
+        Returns:
+            Keyword arguments with prompt/negative (and pooled for SDXL) embeddings
+        """
+        cache = get_prompt_cache()
+
+        def encode_all(texts):
+            encoded = [cache.encode(pipe, model_key, text, self.device, clip_skip) for text in texts]
+            embeds = torch.cat([e[0] for e in encoded])
+            pooled = None if encoded[0][1] is None else torch.cat([e[1] for e in encoded])
+            return embeds, pooled
+
+        with profile_stage("encode"):
+            prompt_embeds, pooled = encode_all(prompts)
+            negative_embeds, negative_pooled = encode_all(negative_prompts)
+
+        embeddings = {
+            'prompt_embeds': prompt_embeds,
+            'negative_prompt_embeds': negative_embeds,
+        }
+        if pooled is not None:
+            embeddings['pooled_prompt_embeds'] = pooled
+            embeddings['negative_pooled_prompt_embeds'] = negative_pooled
+        return embeddings
+
+    def _auto_batch_size(self, width: int, height: int) -> int:
+        """
+        Pick a micro-batch size that fits in currently available memory
+
+        Uses a per-megapixel activation estimate (denoising with CFG) scaled
+        by the pipeline dtype, against free VRAM on GPU or available RAM on CPU.
+        """
+        megapixels = (width * height) / (1024 * 1024)
+        per_image = ACTIVATION_BYTES_PER_MEGAPIXEL["sdxl" if self.is_sdxl else "sd"]
+        per_image *= megapixels * (torch.finfo(self.torch_dtype).bits / 16)
+
+        free = available_device_memory_bytes(self.device) * BATCH_MEMORY_HEADROOM
+        if free <= 0 or per_image <= 0:
+            return 1
+
+        return max(1, min(MAX_MICRO_BATCH, int(free // per_image)))
+
+    def _new_output_path(self, output_dir: Path = None, extension: str = ".png") -> tuple:
+        """
+        Build a unique output path for a new image
+
+        Returns:
+            Tuple of (asset_id, path); the asset ID is part of the filename
+        """
         if output_dir is None:
             output_dir = Path("./output/images")
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"sdxl_image_{timestamp}.png" if self.is_sdxl else f"sd_image_{timestamp}.png"
-        output_path = output_dir / filename
+        asset_id = new_asset_id()
+        prefix = "sdxl_image" if self.is_sdxl else "sd_image"
+        return asset_id, output_dir / f"{prefix}_{asset_id}{extension}"
 
-        image.save(output_path)
-        print(f"High-quality image saved to: {output_path}")
+    def _save_image(self, image: Image.Image, output_dir: Path = None,
+                    save_options: SaveOptions = None, params: dict = None,
+                    timings: dict = None, draft_key: str = None):
+        """
+        Queue a generated image for encoding and writing on the background writer
 
+        Args:
+            image: Generated image
+            output_dir: Directory to save into
+            save_options: Format/encoder settings (default: the generator's)
+            params: Generation parameters recorded in the output store
+            timings: Stage durations recorded in the output store
+            draft_key: Key of the kept latents if the image is a tiny-VAE draft
+
+        Returns:
+            Future resolving to the output path once the file is written
+        """
+        options = save_options or self.save_options
+        asset_id, output_path = self._new_output_path(output_dir, options.extension)
+
+        def write():
+            start = time.perf_counter()
+            write_image(image, output_path, options)
+            if draft_key is not None:
+                get_draft_latents().link(output_path, draft_key)
+            self._record_output(asset_id, output_path, params, dict(
+                timings or {}, write_s=time.perf_counter() - start
+            ))
+            return output_path
+
+        return get_image_writer().submit_call(write)
+
+    def _copy_cached(self, cached_path: Path, output_dir: Path = None,
+                     save_options: SaveOptions = None, params: dict = None):
+        """
+        Copy a result-cache hit (stored as PNG) to the output directory
+
+        Returns:
+            Future resolving to the output path once the file is written
+        """
+        options = save_options or self.save_options
+        asset_id, output_path = self._new_output_path(output_dir, options.extension)
+
+        def copy_or_convert():
+            start = time.perf_counter()
+            if options.format == "png":
+                shutil.copyfile(cached_path, output_path)
+            else:
+                with Image.open(cached_path) as image:
+                    image.load()
+                    write_image(image, output_path, options)
+            self._record_output(asset_id, output_path, dict(params or {}, cached=True), {
+                'write_s': time.perf_counter() - start
+            })
+            return output_path
+
+        return get_image_writer().submit_call(copy_or_convert)
+
+    def _record_output(self, asset_id: str, output_path: Path, params: dict, timings: dict):
+        """Add a written image to the output store (if one is configured)"""
+        if self.output_store is None:
+            return
+        try:
+            self.output_store.record(
+                "image", output_path, params=params, timings=timings, asset_id=asset_id
+            )
+        except Exception as e:
+            print(f"Could not record image in output store: {e}")
+
+    def _finish_write(self, future, async_save: bool, message: str):
+        """Return the write future, or wait for the file and return its path"""
+        if async_save:
+            return future
+        output_path = Path(future.result())
+        print(f"{message}: {output_path}")
         return output_path
 
+    def _scheduler_name(self, preset: str = None) -> str:
+        """Name of the scheduler used for generation (known without loading the model)"""
+        spec = self._preset_spec(preset)
+        if spec is not None and spec["scheduler"] is not None:
+            options = ",".join(f"{k}={v}" for k, v in sorted(spec["scheduler_options"].items()))
+            return f"{spec['scheduler']}({options})"
+        if self.is_sdxl:
+            return "EulerAncestralDiscreteScheduler"
+        return "DPMSolverMultistepScheduler"
+
+    def _request_params(self, prompt: str, negative_prompt: str, seed: int,
+                        num_inference_steps: int, guidance_scale: float,
+                        width: int, height: int, transparent_background: bool,
+                        clip_skip: int = None, preset: str = None,
+                        tiled: bool = None, hires: bool = False,
+                        tiny_vae: bool = False,
+                        guidance_schedule: GuidanceSchedule = None) -> dict:
+        """
+        Every parameter that determines a generation's output
+
+        Hashed into the result-cache key for seeded requests and recorded in
+        the output store alongside each image.
+        """
+        params = dict(
+            model=self.model_name,
+            dtype=str(self.torch_dtype),
+            device=self.device,
+            scheduler=self._scheduler_name(preset),
+            prompt=prompt,
+            negative_prompt=negative_prompt,
+            steps=num_inference_steps,
+            guidance_scale=guidance_scale,
+            width=width,
+            height=height,
+            seed=seed,
+            refiner=(self.refiner_model, REFINER_HANDOFF) if self.use_refiner else None,
+            transparent_background=transparent_background,
+            clip_skip=clip_skip,
+        )
+        if self._int8_active():
+            params['quantization'] = "int8"
+        if self._cpu_profile_active() and self.cpu_profile.bf16:
+            # bf16 autocast changes the output, so it must not share fp32 entries
+            params['autocast'] = str(torch.bfloat16)
+        # Only tiled and hi-res requests carry their settings, so other keys are unchanged
+        if hires:
+            params['hires'] = [HIRES_BASE_SCALE, HIRES_STRENGTH, HIRES_REFINE_FRACTION]
+        else:
+            tile_size = self._tile_size(width, height, tiled)
+            if tile_size is not None:
+                params['tile_size'] = tile_size
+        if tiny_vae:
+            params['vae'] = self.tiny_vae_model
+        if guidance_schedule is not None and not guidance_schedule.is_constant:
+            params['guidance_schedule'] = guidance_schedule.key()
+        if self.token_merging > 0:
+            params['token_merging'] = self.token_merging
+        return params
+
+    def _tile_size(self, width: int, height: int, tiled: bool = None):
+        """Tile edge length for tiled generation, or None to denoise in one pass"""
+        if tiled is None:
+            tiled = max(width, height) > self.tile_size
+        return self.tile_size if tiled else None
+
     def _enhance_prompt(self, prompt: str, transparent_bg: bool = False) -> str:
         """Enhance prompt for better quality"""
         # Quality enhancers
@@ -282,19 +1818,19 @@ class ImageGenerator:
 
     def _remove_background(self, image: Image.Image) -> Image.Image:
         """Remove background from image for transparency"""
-        try:
-            from rembg import remove
-            print("Removing background using rembg...")
-            output = remove(image)
-            print("Background removed successfully")
-            return output
-        except ImportError:
-            print("Warning: rembg not installed. Install with: pip install rembg")
-            print("Returning original image without background removal")
-            return image
-        except Exception as e:
-            print(f"Error removing background: {e}")
-            return image
+        return self._remove_backgrounds([image])[0][0]
+
+    def _remove_backgrounds(self, images: list) -> tuple:
+        """
+        Remove the backgrounds of several images
+
+        Prompts for transparent output ask for a clean white background, so the
+        analytic matte usually suffices; rembg handles the rest in one batch.
+
+        Returns:
+            Tuple (images, methods) with the path taken per image
+        """
+        return remove_backgrounds(images)
 
     def generate_batch(
         self,
@@ -304,10 +1840,31 @@ class ImageGenerator:
         guidance_scale: float = 7.5,
         width: int = 512,
         height: int = 512,
-        output_dir: Path = None
+        output_dir: Path = None,
+        num_images_per_prompt: int = 1,
+        seeds: list = None,
+        transparent_background: bool = False,
+        max_batch_size: int = None,
+        clip_skip: int = None,
+        progress_callback=None,
+        cancel_event=None,
+        preview_callback=None,
+        preview_interval: int = 5,
+        preset: str = None,
+        save_options: SaveOptions = None,
+        async_save: bool = False,
+        tiled: bool = None,
+        hires: bool = False,
+        tiny_vae: bool = None,
+        guidance_schedule: GuidanceSchedule = None
     ) -> list:
         """
-        Generate multiple images from a list of prompts
+        Generate multiple images from a list of prompts with batched denoising
+
+        All images are sent through the pipeline in micro-batches, so the UNet
+        sees several images per step instead of one. Seeded images identical to
+        a request already running (a generate() or another batch) wait for its
+        result instead of being denoised again.
 
         Args:
             prompts: List of text descriptions
@@ -317,38 +1874,432 @@ class ImageGenerator:
             width: Image width
             height: Image height
             output_dir: Directory to save generated images
+            num_images_per_prompt: Number of images to generate for each prompt
+            seeds: Optional seeds, one per output image (prompt-major order);
+                seeded images match what generate() returns for the same seed
+            transparent_background: Whether to remove background and make transparent
+            max_batch_size: Max images per pipeline call (default: sized from free memory)
+            clip_skip: Number of CLIP layers to skip when encoding prompts
+            progress_callback: Called as progress_callback(step, total_steps) across all micro-batches
+            cancel_event: threading.Event; set it to stop the run (raises GenerationCancelled)
+            preview_callback: Called with a cheap latent preview of the first image in each micro-batch
+            preview_interval: Steps between previews
+            preset: Speed preset name from SPEED_PRESETS; sets the scheduler and
+                overrides num_inference_steps
+            save_options: Output format/encoder settings for this request
+            async_save: Return Futures for the paths instead of waiting for the writes
+            tiled: Tiled generation (None = only above the model's native size)
+            hires: Two-stage hi-res mode (low-resolution denoise + short full-size refine)
+            tiny_vae: Decode with the tiny VAE and keep the latents for redecode()
+                (None = the preset decides); unseeded drafts get random seeds
+            guidance_schedule: Optional GuidanceSchedule (see generate())
 
         Returns:
-            List of paths to generated images
+            List of paths to generated images (Futures resolving to them with async_save)
         """
-        image_paths = []
+        num_inference_steps = self._preset_steps(preset, num_inference_steps)
+        if hires:
+            tiled = False
+        negative = self._enhance_negative_prompt(negative_prompt)
+        items = [
+            self._enhance_prompt(prompt, transparent_background)
+            for prompt in prompts
+            for _ in range(num_images_per_prompt)
+        ]
 
-        for prompt in prompts:
-            image_path = self.generate(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                num_inference_steps=num_inference_steps,
-                guidance_scale=guidance_scale,
-                width=width,
-                height=height,
-                output_dir=output_dir
+        if seeds is None:
+            seeds = [None] * len(items)
+        if len(seeds) != len(items):
+            raise ValueError(
+                f"Expected {len(items)} seeds (one per image), got {len(seeds)}"
             )
-            image_paths.append(image_path)
+        tiny_vae = self._use_tiny_vae(preset, tiny_vae)
+        if tiny_vae:
+            seeds = [random.randrange(2 ** 32) if seed is None else seed for seed in seeds]
 
-        return image_paths
+        # Images are encoded and written in the background while the next
+        # micro-batch denoises; these are the pending writes
+        writes = [None] * len(items)
+        cache_keys = [None] * len(items)
+        params = [
+            self._request_params(
+                item, negative, seed, num_inference_steps, guidance_scale,
+                width, height, transparent_background, clip_skip, preset, tiled, hires,
+                tiny_vae, guidance_schedule
+            )
+            for item, seed in zip(items, seeds)
+        ]
+        draft_keys = [None] * len(items)
+        pending = []
 
-    def unload_model(self):
-        """Unload model from memory"""
-        if self.pipe is not None:
-            del self.pipe
-            self.pipe = None
+        # Serve seeded repeats from the result cache (drafts need their latents)
+        for i, seed in enumerate(seeds):
+            if self.result_cache is not None and seed is not None and not tiny_vae:
+                cache_keys[i] = ResultCache.make_key(**params[i])
+                cached_path = self.result_cache.get(cache_keys[i])
+                if cached_path is not None:
+                    writes[i] = self._copy_cached(cached_path, output_dir,
+                                                  save_options=save_options, params=params[i])
+                    continue
+            pending.append(i)
 
-        if self.refiner is not None:
-            del self.refiner
-            self.refiner = None
+        def check_cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("Generation cancelled")
 
-        # Clear CUDA cache if using GPU
-        if self.device == "cuda":
-            torch.cuda.empty_cache()
+        def denoise(indices: list, claims: dict):
+            """Denoise and save items in micro-batches, publishing claimed results"""
+            self.load_model()
+
+            # Tiled images only ever hold one tile's activations
+            tile_size = self._tile_size(width, height, tiled)
+            if tile_size is not None:
+                batch_size = max_batch_size or self._auto_batch_size(
+                    min(width, tile_size), min(height, tile_size)
+                )
+            else:
+                batch_size = max_batch_size or self._auto_batch_size(width, height)
+            print(f"Generating {len(indices)} images in micro-batches of {batch_size}")
+
+            num_batches = (len(indices) + batch_size - 1) // batch_size
+            step_callback = self._make_step_callback(
+                num_inference_steps, num_batches, progress_callback, cancel_event,
+                preview_callback, preview_interval, hires, tiny_vae, guidance_schedule
+            )
+
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                batch_start = time.perf_counter()
+                result = self._run_pipeline(
+                    prompts=[items[i] for i in batch],
+                    negative_prompts=[negative] * len(batch),
+                    seeds=[seeds[i] for i in batch],
+                    num_inference_steps=num_inference_steps,
+                    guidance_scale=guidance_scale,
+                    width=width,
+                    height=height,
+                    clip_skip=clip_skip,
+                    step_callback=step_callback,
+                    preset=preset,
+                    tiled=tiled,
+                    hires=hires,
+                    output_type="latent" if tiny_vae else "pil",
+                )
+                if tiny_vae:
+                    drafts = self._decode_drafts(result, [params[i] for i in batch])
+                    images = [image for image, _ in drafts]
+                    for i, (_, key) in zip(batch, drafts):
+                        draft_keys[i] = key
+                else:
+                    images = result
+                # Denoising is shared by the micro-batch; attribute an equal share to each image
+                generate_s = (time.perf_counter() - batch_start) / len(batch)
+                timings = {'generate_s': generate_s, 'micro_batch': len(batch)}
+                methods = [None] * len(batch)
+
+                if transparent_background:
+                    background_start = time.perf_counter()
+                    images, methods = self._remove_backgrounds(images)
+                    timings['background_s'] = (time.perf_counter() - background_start) / len(batch)
+
+                for i, image, method in zip(batch, images, methods):
+                    if method is not None:
+                        timings = dict(timings, background_method=method)
+                    if i in claims:
+                        flights.publish(*claims.pop(i), (image, timings))
+                    if cache_keys[i] is not None:
+                        get_image_writer().submit_call(self.result_cache.put, cache_keys[i], image)
+                    writes[i] = self._save_image(image, output_dir, save_options=save_options,
+                                                 params=params[i], timings=timings,
+                                                 draft_key=draft_keys[i])
 
-        print("Model unloaded from memory")
+        # Seeded images go through the single-flight group like generate():
+        # images identical to a request running elsewhere wait for its result,
+        # the others are claimed so identical requests arriving later wait here
+        flights = get_single_flight()
+        while pending:
+            claims, joined, own = {}, [], []
+            for i in pending:
+                if seeds[i] is None:
+                    own.append(i)
+                    continue
+                key = ResultCache.make_key(**params[i])
+                call, leader = flights.join(key)
+                if leader:
+                    claims[i] = (key, call)
+                    own.append(i)
+                else:
+                    joined.append((i, call))
+
+            try:
+                if own:
+                    denoise(own, claims)
+            except BaseException as e:
+                for key, call in claims.values():
+                    flights.publish(key, call, error=e)
+                raise
+
+            # Identical requests whose caller was cancelled are generated in the next round
+            pending = []
+            for i, call in joined:
+                wait_start = time.perf_counter()
+                try:
+                    image, timings = flights.wait(call, check_cancelled)
+                except GenerationCancelled:
+                    check_cancelled()
+                    print("Identical request was cancelled, generating it here")
+                    pending.append(i)
+                    continue
+                print("Identical request already running, shared its result")
+                timings = dict(timings, shared=True, wait_s=time.perf_counter() - wait_start)
+                writes[i] = self._save_image(
+                    image, output_dir, save_options=save_options, params=params[i], timings=timings,
+                    draft_key=ResultCache.make_key(**params[i]) if tiny_vae else None
+                )
+
+        return self._finish_writes(writes, async_save)
+
+    def sweep(
+        self,
+        prompt: str,
+        axes: dict,
+        negative_prompt: str = "",
+        num_inference_steps: int = 30,
+        guidance_scale: float = 7.5,
+        width: int = 1024,
+        height: int = 1024,
+        seed: int = None,
+        output_dir: Path = None,
+        clip_skip: int = None,
+        preset: str = None,
+        max_batch_size: int = None,
+        progress_callback=None,
+        cancel_event=None,
+        save_options: SaveOptions = None,
+        save_images: bool = True,
+        tiled: bool = None,
+        hires: bool = False,
+        guidance_schedule: GuidanceSchedule = None
+    ) -> SweepResult:
+        """
+        Generate a grid of variants of one request (e.g. seed x guidance x steps)
+
+        Every prompt and negative prompt in the sweep is encoded once up front.
+        Cells that only differ in prompt, negative prompt or seed share
+        micro-batched pipeline calls, and groups with the same preset run
+        back to back. Seeded cells are served from the result cache.
+
+        Args:
+            prompt: Text description of the desired image
+            axes: Parameter name -> list of values (names from sweep.SWEEP_AXES:
+                prompt, negative_prompt, seed, guidance_scale, num_inference_steps,
+                preset, clip_skip, width, height); the last axis becomes the
+                contact sheet columns
+            negative_prompt: Things to avoid in the image
+            num_inference_steps: Steps of cells that do not sweep them
+            guidance_scale: Guidance scale of cells that do not sweep it
+            width: Image width of cells that do not sweep it
+            height: Image height of cells that do not sweep it
+            seed: Seed of cells that do not sweep it; without a seed axis or
+                seed one random seed is shared by all cells, so they compare
+                like for like
+            output_dir: Directory to save the images and the contact sheet
+            clip_skip: Number of CLIP layers to skip when encoding prompts
+            preset: Speed preset (overrides num_inference_steps like in generate())
+            max_batch_size: Max images per pipeline call (default: sized from free memory)
+            progress_callback: Called as progress_callback(step, total_steps) across the sweep
+            cancel_event: threading.Event; set it to stop the sweep (raises GenerationCancelled)
+            save_options: Output format/encoder settings for the cell images
+            save_images: Save the cell images and the contact sheet
+            tiled: Tiled generation (None = only above the model's native size)
+            hires: Two-stage hi-res mode for every cell
+            guidance_schedule: Optional GuidanceSchedule for every cell (see generate())
+
+        Returns:
+            SweepResult with the cells (images, paths, timings), the contact sheet
+            and whole-sweep timings
+        """
+        sweep_start = time.perf_counter()
+        if hires:
+            tiled = False
+        if seed is None and "seed" not in axes:
+            seed = random.randrange(2 ** 32)
+
+        cells = plan_sweep(dict(
+            prompt=prompt, negative_prompt=negative_prompt, seed=seed,
+            guidance_scale=guidance_scale, num_inference_steps=num_inference_steps,
+            preset=preset, clip_skip=clip_skip, width=width, height=height,
+        ), axes)
+
+        texts = {}
+        for cell in cells:
+            params = cell.params
+            params['num_inference_steps'] = self._preset_steps(params['preset'], params['num_inference_steps'])
+            params['enhanced_prompt'] = self._enhance_prompt(params['prompt'])
+            params['enhanced_negative'] = self._enhance_negative_prompt(params['negative_prompt'])
+            cell.request = self._request_params(
+                params['enhanced_prompt'], params['enhanced_negative'], params['seed'],
+                params['num_inference_steps'], params['guidance_scale'],
+                params['width'], params['height'], False, params['clip_skip'],
+                params['preset'], tiled, hires, guidance_schedule=guidance_schedule
+            )
+            texts.setdefault(params['clip_skip'], set()).update(
+                (params['enhanced_prompt'], params['enhanced_negative'])
+            )
+
+        writes = {}
+        cache_keys = {}
+        pending = set()
+        for cell in cells:
+            if self.result_cache is not None and cell.params['seed'] is not None:
+                cache_keys[cell.index] = ResultCache.make_key(**cell.request)
+                cached_path = self.result_cache.get(cache_keys[cell.index])
+                if cached_path is not None:
+                    with Image.open(cached_path) as image:
+                        cell.image = image.convert("RGB")
+                    cell.timings = {'cached': True}
+                    if save_images:
+                        writes[cell.index] = self._copy_cached(
+                            cached_path, output_dir, save_options=save_options, params=cell.request
+                        )
+                    continue
+            pending.add(cell.index)
+
+        timings = {'encode_s': 0.0, 'generate_s': 0.0, 'pipeline_calls': 0}
+        batches = []
+        if pending:
+            self.load_model()
+
+            # Every distinct text is encoded once; the pipeline calls hit the cache
+            encode_start = time.perf_counter()
+            with torch.inference_mode(), self._autocast():
+                cache = get_prompt_cache()
+                for cell_clip_skip, cell_texts in texts.items():
+                    for text in sorted(cell_texts):
+                        cache.encode(self.pipe, self._embedding_key(), text, self.device, cell_clip_skip)
+            timings['encode_s'] = time.perf_counter() - encode_start
+
+            for group in group_cells([cell for cell in cells if cell.index in pending]):
+                params = group[0].params
+                tile_size = self._tile_size(params['width'], params['height'], tiled)
+                batch_size = max_batch_size or self._auto_batch_size(
+                    min(params['width'], tile_size or params['width']),
+                    min(params['height'], tile_size or params['height'])
+                )
+                for start in range(0, len(group), batch_size):
+                    batches.append(group[start:start + batch_size])
+
+        print(f"Sweep of {len(cells)} images: {len(cells) - len(pending)} cached, "
+              f"{len(batches)} pipeline calls")
+
+        def steps_per_call(params):
+            steps = params['num_inference_steps']
+            return steps + (self._hires_steps(steps)[1] if hires else 0)
+
+        if guidance_schedule is not None and guidance_schedule.is_constant:
+            guidance_schedule = None
+        step_callback = None
+        if progress_callback is not None or cancel_event is not None or guidance_schedule is not None:
+            step_callback = StepCallback(
+                total_steps=sum(steps_per_call(batch[0].params) for batch in batches),
+                progress_callback=progress_callback,
+                cancel_event=cancel_event,
+                is_sdxl=self.is_sdxl,
+                guidance_schedule=guidance_schedule,
+            )
+
+        completed = 0
+        cache_writes = []
+        for batch in batches:
+            params = batch[0].params
+            batch_start = time.perf_counter()
+            images = self._run_pipeline(
+                prompts=[cell.params['enhanced_prompt'] for cell in batch],
+                negative_prompts=[cell.params['enhanced_negative'] for cell in batch],
+                seeds=[cell.params['seed'] for cell in batch],
+                num_inference_steps=params['num_inference_steps'],
+                guidance_scale=params['guidance_scale'],
+                width=params['width'],
+                height=params['height'],
+                clip_skip=params['clip_skip'],
+                step_callback=step_callback,
+                preset=params['preset'],
+                tiled=tiled,
+                hires=hires,
+            )
+            elapsed = time.perf_counter() - batch_start
+            timings['generate_s'] += elapsed
+            timings['pipeline_calls'] += 1
+            completed += steps_per_call(params)
+            if step_callback is not None:
+                step_callback.offset = completed
+
+            for cell, image in zip(batch, images):
+                cell.image = image
+                cell.timings = {'generate_s': elapsed / len(batch), 'micro_batch': len(batch)}
+                if cell.index in cache_keys:
+                    cache_writes.append(get_image_writer().submit_call(
+                        self.result_cache.put, cache_keys[cell.index], image
+                    ))
+                if save_images:
+                    writes[cell.index] = self._save_image(
+                        image, output_dir, save_options=save_options,
+                        params=cell.request, timings=cell.timings
+                    )
+
+        sheet_start = time.perf_counter()
+        contact_sheet = make_contact_sheet(cells, axes)
+        contact_sheet_path = None
+        if save_images:
+            contact_sheet_path = self._save_contact_sheet(contact_sheet, axes, output_dir)
+            for cell in cells:
+                cell.path = Path(writes[cell.index].result())
+        for future in cache_writes:
+            future.result()
+        timings['contact_sheet_s'] = time.perf_counter() - sheet_start
+        timings['total_s'] = time.perf_counter() - sweep_start
+
+        result = SweepResult(axes, cells, contact_sheet, contact_sheet_path, timings)
+        print(result.report())
+        if contact_sheet_path is not None:
+            print(f"Contact sheet saved to: {contact_sheet_path}")
+        return result
+
+    def _save_contact_sheet(self, contact_sheet: Image.Image, axes: dict,
+                            output_dir: Path = None) -> Path:
+        """Write a sweep contact sheet (PNG) and record it in the output store"""
+        if output_dir is None:
+            output_dir = Path("./output/images")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        asset_id = new_asset_id()
+        output_path = output_dir / f"sweep_{asset_id}.png"
+        write_image(contact_sheet, output_path)
+        self._record_output(asset_id, output_path, {
+            'model': self.model_name,
+            'sweep': {name: list(values) for name, values in axes.items()},
+        }, {})
+        return output_path
+
+    def _finish_writes(self, writes: list, async_save: bool) -> list:
+        """Return the write futures, or wait for every file and return the paths"""
+        if async_save:
+            return writes
+        return [self._finish_write(future, False, "Image saved to") for future in writes]
+
+    def unload_model(self):
+        """
+        Drop this generator's references to the loaded models
+
+        The pipelines stay resident in the shared registry for other
+        generators (and the next load) until its LRU budget evicts them.
+        """
+        if self.pipe is None:
+            return
+
+        self.pipe = None
+        self.refiner = None
+        self._preset_pipes = {}
+        self._img2img_pipes = {}
+        self._inpaint_pipes = {}
+        print("Model released (kept resident in the shared registry until evicted)")
@@ -0,0 +1,153 @@
+"""
+Image Writer - Background encoding and writing of generated images
+
+Encoding a 1024x1024 PNG takes a noticeable fraction of a second. The
+writer does the encode and the disk write on a small thread pool so the
+next batch item can start denoising right away, and hands back a Future
+that resolves to the path once the file is fully written.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+
+# Output format -> file extension
+IMAGE_FORMATS = {
+    "png": ".png",
+    "webp": ".webp",
+    "jpeg": ".jpg",
+}
+
+
+class SaveOptions:
+    """Format and encoder settings for saving an image"""
+
+    def __init__(self, format: str = "png", png_compress_level: int = 6,
+                 webp_lossless: bool = True, quality: int = 95):
+        """
+        Initialize save options
+
+        Args:
+            format: "png", "webp" or "jpeg" ("jpg" is accepted too)
+            png_compress_level: zlib level 0-9 (1 = fastest, 9 = smallest)
+            webp_lossless: Lossless WebP (otherwise lossy at the given quality)
+            quality: JPEG / lossy WebP quality 1-100
+        """
+        format = format.lower()
+        if format == "jpg":
+            format = "jpeg"
+        if format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unsupported image format '{format}' (available: {', '.join(IMAGE_FORMATS)})"
+            )
+        self.format = format
+        self.png_compress_level = int(png_compress_level)
+        self.webp_lossless = webp_lossless
+        self.quality = int(quality)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SaveOptions":
+        """Create options from 'output.image_format' and 'output.image_options' in config.yaml"""
+        output_config = (config or {}).get('output', {})
+        image_options = output_config.get('image_options', {}) or {}
+        return cls(
+            format=output_config.get('image_format', "png"),
+            png_compress_level=image_options.get('png_compress_level', 6),
+            webp_lossless=image_options.get('webp_lossless', True),
+            quality=image_options.get('quality', 95),
+        )
+
+    @property
+    def extension(self) -> str:
+        """File extension including the dot"""
+        return IMAGE_FORMATS[self.format]
+
+    def save_kwargs(self) -> dict:
+        """Keyword arguments for PIL's Image.save()"""
+        if self.format == "png":
+            return {"format": "PNG", "compress_level": self.png_compress_level}
+        if self.format == "webp":
+            if self.webp_lossless:
+                # For lossless WebP "quality" is compression effort; max effort is
+                # an order of magnitude slower for a few percent smaller files
+                return {"format": "WEBP", "lossless": True, "quality": 50, "method": 1}
+            return {"format": "WEBP", "quality": self.quality, "method": 4}
+        return {"format": "JPEG", "quality": self.quality, "optimize": False}
+
+
+def write_image(image: Image.Image, path: Path, options: SaveOptions = None) -> Path:
+    """
+    Encode and write an image, replacing the target atomically
+
+    Args:
+        image: PIL image
+        path: Destination path
+        options: Save options (default: PNG at compress level 6)
+
+    Returns:
+        The written path
+    """
+    options = options or SaveOptions()
+    path = Path(path)
+
+    if options.format == "jpeg" and image.mode in ("RGBA", "LA", "P"):
+        # JPEG has no alpha channel: flatten onto white
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        image.save(f, **options.save_kwargs())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+class ImageWriter:
+    """Thread pool that encodes and writes images off the generation thread"""
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize the writer
+
+        Args:
+            max_workers: Parallel encode/write threads (PIL releases the GIL while encoding)
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-writer")
+
+    def submit(self, image: Image.Image, path: Path, options: SaveOptions = None) -> Future:
+        """
+        Queue an image for writing
+
+        Returns:
+            Future resolving to the path once the file is written
+        """
+        return self._executor.submit(write_image, image, path, options)
+
+    def submit_call(self, fn, *args, **kwargs) -> Future:
+        """Run another slow I/O call (e.g. a result-cache store) on the writer threads"""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, optionally waiting for pending writes"""
+        self._executor.shutdown(wait=wait)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_image_writer() -> ImageWriter:
+    """Get the process-wide image writer"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ImageWriter()
+        return _writer
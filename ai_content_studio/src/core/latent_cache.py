@@ -0,0 +1,145 @@
+"""
+Latent Cache - LRU cache of VAE-encoded input images
+
+Img2img and inpainting start from the VAE latents of a source image. Edits
+are usually iterated on the same source (new prompt, strength or mask), so
+the encoded latents are cached per (VAE, image content, size) and the VAE
+encoder only runs once per source image.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import torch
+from PIL import Image
+
+
+def image_digest(image: Image.Image) -> str:
+    """Content hash of a PIL image (pixels, mode and size)"""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def encode_image_latents(pipe, image: Image.Image, width: int, height: int) -> torch.Tensor:
+    """
+    Encode an image to scaled VAE latents, ready to pass as a pipeline's image
+
+    The latent distribution's mode is used instead of a sample, so the
+    result does not depend on the generator and can be cached.
+
+    Args:
+        pipe: Loaded diffusers pipeline (provides vae and image_processor)
+        image: Source image
+        width: Width to resize the image to (multiple of 8)
+        height: Height to resize the image to (multiple of 8)
+
+    Returns:
+        Latents of shape (1, latent_channels, height / scale, width / scale)
+    """
+    vae = pipe.vae
+    pixels = pipe.image_processor.preprocess(image.convert("RGB"), height=height, width=width)
+
+    # Same as the pipelines: the SDXL VAE overflows in float16
+    dtype = vae.dtype
+    upcast = vae.config.force_upcast and dtype == torch.float16
+    if upcast:
+        vae.to(dtype=torch.float32)
+    try:
+        pixels = pixels.to(device=vae.device, dtype=vae.dtype)
+        latents = vae.encode(pixels).latent_dist.mode()
+    finally:
+        if upcast:
+            vae.to(dtype=dtype)
+
+    latents = latents.to(dtype)
+    latents_mean = getattr(vae.config, "latents_mean", None)
+    latents_std = getattr(vae.config, "latents_std", None)
+    if latents_mean is not None and latents_std is not None:
+        channels = latents.shape[1]
+        latents_mean = torch.tensor(latents_mean).view(1, channels, 1, 1).to(latents)
+        latents_std = torch.tensor(latents_std).view(1, channels, 1, 1).to(latents)
+        return (latents - latents_mean) * vae.config.scaling_factor / latents_std
+    return latents * vae.config.scaling_factor
+
+
+class LatentCache:
+    """In-memory LRU cache of encoded source-image latents"""
+
+    def __init__(self, max_entries: int = 16):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of encoded images kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, pipe, model_key: Hashable, image: Image.Image,
+               width: int, height: int, digest: Optional[str] = None) -> torch.Tensor:
+        """
+        Get the latents of an image, encoding it on a cache miss
+
+        Args:
+            pipe: Loaded diffusers pipeline whose VAE encodes the image
+            model_key: Identifies the VAE (model, dtype, device)
+            image: Source image
+            width: Target width in pixels
+            height: Target height in pixels
+            digest: Precomputed image_digest(image), if available
+
+        Returns:
+            Scaled latents (shared tensor; do not modify in place)
+        """
+        key = (model_key, digest or image_digest(image), width, height)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        with torch.inference_mode():
+            latents = encode_image_latents(pipe, image, width, height)
+
+        with self._lock:
+            self._entries[key] = latents
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return latents
+
+    def clear(self, model_key: Hashable = None):
+        """Drop cached latents for one model (or all models)"""
+        with self._lock:
+            if model_key is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == model_key]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_latent_cache() -> LatentCache:
+    """Get the process-wide source-image latent cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LatentCache()
+        return _cache
@@ -0,0 +1,53 @@
+"""
+Latent Preview - Cheap latent-to-RGB projection for live previews
+
+Instead of a full VAE decode, the 4 latent channels are mapped to RGB with
+a fixed linear projection. The result is blurry and 1/8 resolution, but
+costs almost nothing and is good enough to judge composition mid-run.
+"""
+
+import torch
+from PIL import Image
+
+
+# Linear latent -> RGB factors (rows: latent channels, columns: R, G, B)
+SD_LATENT_RGB_FACTORS = [
+    [0.3512, 0.2297, 0.3227],
+    [0.3250, 0.4974, 0.2350],
+    [-0.2829, 0.1762, 0.2721],
+    [-0.2120, -0.2616, -0.7177],
+]
+SD_LATENT_RGB_BIAS = [0.0, 0.0, 0.0]
+
+SDXL_LATENT_RGB_FACTORS = [
+    [0.3920, 0.4054, 0.4549],
+    [-0.2634, -0.0196, 0.0653],
+    [0.0568, 0.1687, -0.0755],
+    [-0.3112, -0.2359, -0.2076],
+]
+SDXL_LATENT_RGB_BIAS = [0.1084, -0.0175, -0.0011]
+
+
+def latents_to_rgb(latents: torch.Tensor, is_sdxl: bool = True, index: int = 0) -> Image.Image:
+    """
+    Project latents to a small RGB preview image
+
+    Args:
+        latents: Latent batch of shape (batch, 4, height/8, width/8)
+        is_sdxl: Use the SDXL projection (otherwise SD 1.x/2.x)
+        index: Which image in the batch to preview
+
+    Returns:
+        PIL image at latent resolution
+    """
+    if is_sdxl:
+        factors, bias = SDXL_LATENT_RGB_FACTORS, SDXL_LATENT_RGB_BIAS
+    else:
+        factors, bias = SD_LATENT_RGB_FACTORS, SD_LATENT_RGB_BIAS
+
+    latent = latents[index].detach().float().cpu()
+    weight = torch.tensor(factors, dtype=torch.float32)
+    rgb = torch.einsum("chw,cr->hwr", latent, weight) + torch.tensor(bias)
+
+    rgb = ((rgb + 1.0) / 2.0).clamp(0, 1).mul(255).round().to(torch.uint8)
+    return Image.fromarray(rgb.numpy())
@@ -0,0 +1,193 @@
+"""
+Memory Utilities - Size estimation and RAM/VRAM availability helpers
+"""
+
+import os
+import sys
+
+
+def _get_torch():
+    """Return the torch module if it can be imported, otherwise None"""
+    if "torch" in sys.modules:
+        return sys.modules["torch"]
+    try:
+        import torch
+        return torch
+    except Exception:
+        return None
+
+
+def memory_pool(device: str) -> str:
+    """Map a device string to the memory pool it consumes ('vram' or 'ram')"""
+    device = str(device or "cpu")
+    if device.startswith("cuda") or device.startswith("mps"):
+        return "vram"
+    return "ram"
+
+
+def estimate_size_bytes(obj) -> int:
+    """
+    Estimate the memory held by the torch modules reachable from an object
+
+    Handles diffusers pipelines (via .components), nn.Modules, and plain
+    containers (dict/list/tuple) of those. Other objects are inspected one
+    level deep for nn.Module attributes only, so nested generators that are
+    registered separately are not counted twice.
+
+    Args:
+        obj: Pipeline, module, container or generator object
+
+    Returns:
+        Estimated size in bytes (0 if torch is not available)
+    """
+    torch = _get_torch()
+    if torch is None:
+        return 0
+
+    seen = set()
+
+    def module_bytes(module) -> int:
+        total = 0
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            total += tensor.numel() * tensor.element_size()
+
+        # Dynamic int8 linear layers keep their weights in packed params,
+        # which are neither parameters nor buffers
+        for child in module.modules():
+            packed = getattr(child, "_packed_params", None)
+            if packed is None or not hasattr(packed, "_weight_bias") or id(packed) in seen:
+                continue
+            seen.add(id(packed))
+            for tensor in packed._weight_bias():
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+        return total
+
+    def visit(value, depth: int) -> int:
+        if value is None or depth > 3:
+            return 0
+        if isinstance(value, torch.nn.Module):
+            return module_bytes(value)
+        if isinstance(value, dict):
+            return sum(visit(v, depth + 1) for v in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(visit(v, depth + 1) for v in value)
+        components = getattr(value, "components", None)
+        if isinstance(components, dict):
+            return visit(components, depth + 1)
+        if depth == 0 and hasattr(value, "__dict__"):
+            return sum(
+                module_bytes(v) for v in vars(value).values()
+                if isinstance(v, torch.nn.Module)
+            )
+        return 0
+
+    return visit(obj, 0)
+
+
+def _read_meminfo() -> dict:
+    """Read /proc/meminfo on Linux (values in bytes)"""
+    info = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                info[name.strip()] = int(value.strip().split()[0]) * 1024
+    except Exception:
+        pass
+    return info
+
+
+def total_ram_bytes() -> int:
+    """Get total system RAM in bytes (0 if unknown)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+
+    meminfo = _read_meminfo()
+    if "MemTotal" in meminfo:
+        return meminfo["MemTotal"]
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def available_ram_bytes() -> int:
+    """Get currently available system RAM in bytes (0 if unknown)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    meminfo = _read_meminfo()
+    if "MemAvailable" in meminfo:
+        return meminfo["MemAvailable"]
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def process_rss_bytes() -> int:
+    """Resident memory of the current process in bytes (0 if unknown)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def total_device_memory_bytes(device: str) -> int:
+    """Get total memory of an accelerator device in bytes (0 if unknown)"""
+    torch = _get_torch()
+    if torch is None or not str(device).startswith("cuda"):
+        return 0
+    try:
+        return torch.cuda.get_device_properties(torch.device(device)).total_memory
+    except Exception:
+        return 0
+
+
+def available_device_memory_bytes(device: str) -> int:
+    """Get free memory of an accelerator device in bytes, or available RAM for CPU"""
+    if memory_pool(device) == "ram":
+        return available_ram_bytes()
+
+    torch = _get_torch()
+    if torch is None or not str(device).startswith("cuda"):
+        # MPS shares system memory
+        return available_ram_bytes()
+    try:
+        free, _ = torch.cuda.mem_get_info(torch.device(device))
+        return free
+    except Exception:
+        return 0
+
+
+def empty_device_cache():
+    """Release cached allocator blocks on accelerators (no-op without torch)"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+    try:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if hasattr(torch, "mps") and torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+    except Exception:
+        pass
@@ -10,23 +10,34 @@ import torch
 import numpy as np
 from PIL import Image
 from pathlib import Path
-import datetime
+import time
 import trimesh
 from typing import Optional, Union, Literal
 import warnings
 
+from .output_store import new_asset_id
+from .background_removal import get_rembg_pool, remove_backgrounds
+from .model_manifest import get_model_manifest
+
 
 class Model3DGenerator:
     """Generate 3D models from text or images using multiple methods"""
 
-    def __init__(self, cache_dir: Path = None):
+    def __init__(self, cache_dir: Path = None, result_cache=None, hardware_config: dict = None,
+                 output_store=None):
         """
         Initialize the 3D model generator
 
         Args:
             cache_dir: Directory to cache models
+            result_cache: Optional ResultCache for seeded intermediate 2D images
+            hardware_config: 'hardware' section of config.yaml (device selection, offloading)
+            output_store: Optional OutputStore that records images and models
         """
         self.cache_dir = cache_dir
+        self.result_cache = result_cache
+        self.hardware_config = hardware_config
+        self.output_store = output_store
         self.device = self._get_device()
         self.image_generator = None
         self.triposr_model = None
@@ -40,13 +51,9 @@ class Model3DGenerator:
         print(f"Available methods: {', '.join(self.available_methods)}")
 
     def _get_device(self):
-        """Get the appropriate device (CUDA/CPU)"""
-        if torch.cuda.is_available():
-            return "cuda"
-        elif torch.backends.mps.is_available():
-            return "mps"
-        else:
-            return "cpu"
+        """Get the appropriate device (CUDA/MPS/CPU) honoring the hardware config"""
+        from .offload import OffloadPolicy
+        return OffloadPolicy.from_config(self.hardware_config).resolve_device()
 
     def _detect_available_methods(self) -> list:
         """Detect which 3D generation methods are available"""
@@ -71,7 +78,10 @@ class Model3DGenerator:
         if self.image_generator is None:
             from .image_generator import ImageGenerator
             self.image_generator = ImageGenerator(
-                cache_dir=self.cache_dir
+                cache_dir=self.cache_dir,
+                result_cache=self.result_cache,
+                hardware_config=self.hardware_config,
+                output_store=self.output_store
             )
         return self.image_generator
 
@@ -113,12 +123,27 @@ class Model3DGenerator:
 
                 print("Loading TripoSR with official implementation...")
 
-                # Load model
-                self.triposr_model = TSR.from_pretrained(
-                    "stabilityai/TripoSR",
-                    config_name="config.yaml",
-                    weight_name="model.ckpt",
-                )
+                # Load model (from the local snapshot when the manifest has one)
+                manifest = get_model_manifest()
+                local_path = manifest.resolve("stabilityai/TripoSR", self.cache_dir)
+                self.triposr_model = None
+                if local_path is not None:
+                    try:
+                        self.triposr_model = TSR.from_pretrained(
+                            str(local_path),
+                            config_name="config.yaml",
+                            weight_name="model.ckpt",
+                        )
+                    except OSError as e:
+                        print(f"Local TripoSR snapshot is incomplete ({e}); loading from the hub")
+                        manifest.refresh("stabilityai/TripoSR")
+                if self.triposr_model is None:
+                    self.triposr_model = TSR.from_pretrained(
+                        "stabilityai/TripoSR",
+                        config_name="config.yaml",
+                        weight_name="model.ckpt",
+                    )
+                    manifest.record_download("stabilityai/TripoSR", self.cache_dir)
 
                 # Move to device
                 self.triposr_model.renderer.set_chunk_size(8192)
@@ -132,10 +157,9 @@ class Model3DGenerator:
                 import torch.hub
 
                 # Load via torch hub or direct HuggingFace
-                self.triposr_model = torch.hub.load(
+                self.triposr_model = self._hub_load(
                     "stabilityai/TripoSR",
                     "TripoSR",
-                    trust_repo=True,
                     verbose=True
                 )
 
@@ -160,6 +184,23 @@ class Model3DGenerator:
             if "triposr" in self.available_methods:
                 self.available_methods.remove("triposr")
 
+    def _hub_load(self, repo: str, model: str, **kwargs):
+        """
+        torch.hub.load from the local checkout when the manifest has one
+
+        A GitHub load resolves the default branch online even when the
+        repository is cached; a local load only reads hubconf.py from disk.
+        """
+        manifest = get_model_manifest()
+        local_repo = manifest.resolve_hub_repo(repo)
+        if local_repo is not None:
+            print(f"Loading {repo}:{model} from local checkout: {local_repo}")
+            return torch.hub.load(str(local_repo), model, source="local", **kwargs)
+
+        result = torch.hub.load(repo, model, trust_repo=True, **kwargs)
+        manifest.record_hub_download(repo)
+        return result
+
     def _load_midas(self):
         """Load MiDaS model for depth-based 3D generation"""
         if self.midas_model is not None:
@@ -170,17 +211,16 @@ class Model3DGenerator:
             print("This will download ~400MB on first use...")
 
             # Load MiDaS from torch hub
-            self.midas_model = torch.hub.load(
+            self.midas_model = self._hub_load(
                 "intel-isl/MiDaS",
                 "DPT_Large",
-                trust_repo=True,
                 verbose=True
             )
             self.midas_model.to(self.device)
             self.midas_model.eval()
 
             # Load transforms
-            midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms", trust_repo=True)
+            midas_transforms = self._hub_load("intel-isl/MiDaS", "transforms")
             self.midas_transform = midas_transforms.dpt_transform
 
             print("SUCCESS: MiDaS model loaded successfully")
@@ -202,7 +242,8 @@ class Model3DGenerator:
         output_dir: Path = None,
         method: str = "auto",
         extrusion_depth: float = 0.5,
-        progress_callback=None
+        progress_callback=None,
+        seed: int = None
     ) -> Path:
         """
         Generate a 3D model directly from text prompt
@@ -219,6 +260,7 @@ class Model3DGenerator:
             method: Which 3D method to use (auto/triposr/midas/extrusion)
             extrusion_depth: Depth for extrusion-based methods (0.1 to 2.0)
             progress_callback: Optional callback for progress updates
+            seed: Seed for the intermediate 2D image (enables the result cache)
 
         Returns:
             Path to the generated 3D model
@@ -229,7 +271,6 @@ class Model3DGenerator:
         # Step 1: Generate 2D image
         print(f"Step 1/2: Generating 2D image from prompt: {prompt}")
         image_gen = self._get_image_generator()
-        image_gen.load_model()
 
         # Generate image optimized for 3D conversion
         temp_output_dir = Path("./output/temp_3d")
@@ -255,6 +296,7 @@ class Model3DGenerator:
             guidance_scale=7.5,  # Optimal for SDXL
             width=1024,  # SDXL optimal resolution
             height=1024,  # SDXL optimal resolution
+            seed=seed,
             output_dir=temp_output_dir,
             transparent_background=True  # Always remove background for 3D
         )
@@ -303,12 +345,18 @@ class Model3DGenerator:
         """
         print(f"Generating 3D model from image: {image_path}")
 
+        start = time.perf_counter()
+        timings = {}
+
         # Load image
-        image = Image.open(image_path).convert("RGB")
+        image = Image.open(image_path)
 
-        # Optional: Remove background for better 3D conversion
+        # Optional: Remove background for better 3D conversion (images that are
+        # already cut out, like text-to-3D renders, are kept as they are)
         if remove_background:
-            image = self._remove_background(image)
+            image, timings['background_method'] = self._remove_background(image)
+        else:
+            image = image.convert("RGB")
 
         # Determine method
         if method == "auto":
@@ -338,35 +386,66 @@ class Model3DGenerator:
         if method == "extrusion" or 'mesh' not in locals():
             # Fallback to simple extrusion
             print("Using simple extrusion method")
+            method = "extrusion"
             image_rgba = image.convert("RGBA")
             mesh = self._create_mesh_from_image_simple(image_rgba, extrusion_depth)
 
+        timings['mesh_s'] = time.perf_counter() - start
+
         # Setup output path
         if output_dir is None:
             output_dir = Path("./output/models_3d")
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"model_3d_{timestamp}.{output_format}"
+        asset_id = new_asset_id()
+        filename = f"model_3d_{asset_id}.{output_format}"
         output_path = output_dir / filename
 
         # Export mesh
+        start = time.perf_counter()
         self._export_mesh(mesh, output_path, output_format)
+        timings['export_s'] = time.perf_counter() - start
+
+        self._record_output(asset_id, output_path, image_path, {
+            'method': method,
+            'output_format': output_format,
+            'extrusion_depth': extrusion_depth,
+            'remove_background': remove_background,
+            'source_image': str(image_path),
+        }, timings)
 
         print(f"SUCCESS: 3D model saved to: {output_path}")
         return output_path
 
-    def _remove_background(self, image: Image.Image) -> Image.Image:
-        """Remove background from image"""
+    def _record_output(self, asset_id: str, output_path: Path, image_path,
+                       params: dict, timings: dict):
+        """Add a 3D model to the output store, linked to its source image if indexed"""
+        if self.output_store is None:
+            return
         try:
-            from rembg import remove
-            print("Removing background...")
-            image_rgba = remove(image)
-            print("SUCCESS: Background removed")
-            return image_rgba
+            parent = self.output_store.find_by_path(image_path)
+            self.output_store.record(
+                "model_3d", output_path, params=params, timings=timings,
+                parent_id=parent['id'] if parent else None, asset_id=asset_id
+            )
         except Exception as e:
-            print(f"Could not remove background: {e}")
-            return image
+            print(f"Could not record 3D model in output store: {e}")
+
+    def _remove_background(self, image: Image.Image) -> tuple:
+        """
+        Remove background from image
+
+        Returns:
+            Tuple (image, method): "existing", "matte", "rembg" or "none"
+        """
+        print("Removing background...")
+        (image,), (method,) = remove_backgrounds([image])
+        if method == "none":
+            print("Could not remove background, using the original image")
+            image = image.convert("RGB")
+        else:
+            print(f"SUCCESS: Background removed ({method})")
+        return image, method
 
     def _generate_with_triposr(self, image: Image.Image) -> trimesh.Trimesh:
         """
@@ -398,7 +477,7 @@ class Model3DGenerator:
             from tsr.utils import remove_background, resize_foreground
 
             # Preprocess image
-            image = remove_background(image, rembg_session=None)
+            image = remove_background(image, rembg_session=get_rembg_pool().session())
             image = resize_foreground(image, 0.85)
 
             # Run TripoSR
@@ -0,0 +1,285 @@
+"""
+Model Manifest - Offline-first resolution of model IDs to local snapshots
+
+from_pretrained("org/name") and torch.hub.load("owner/repo", ...) contact
+the hub to resolve repository metadata before they look at the local cache,
+which adds seconds to every startup and fails on air-gapped machines. The
+manifest maps model IDs to snapshot directories already on disk (the
+models--org--name/snapshots/<revision> layout of the Hugging Face cache, or
+a torch.hub repository checkout), so loaders can read straight from disk.
+
+Entries are discovered by scanning the model directories and recorded in
+models/manifest.json. The hub is only contacted for models without a local
+snapshot, or after refresh() was requested for a model.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+BASE_DIR = Path(__file__).parent.parent.parent
+DEFAULT_MANIFEST_PATH = BASE_DIR / "models" / "manifest.json"
+
+HUGGINGFACE = "huggingface"
+TORCH_HUB = "torch_hub"
+
+
+def hf_cache_folder(model_id: str) -> str:
+    """Folder name of a model in the Hugging Face cache layout"""
+    return "models--" + model_id.replace("/", "--")
+
+
+def find_snapshot(model_id: str, search_dirs: list) -> Optional[Path]:
+    """
+    Find a downloaded snapshot of a Hugging Face model
+
+    Prefers the revision refs/main points to, otherwise the newest snapshot.
+
+    Args:
+        model_id: Repository ID such as "runwayml/stable-diffusion-v1-5"
+        search_dirs: Cache directories to look in, in order
+
+    Returns:
+        Snapshot directory, or None if no complete snapshot is on disk
+    """
+    folder = hf_cache_folder(model_id)
+    for directory in search_dirs:
+        if directory is None:
+            continue
+        repo = Path(directory) / folder
+        snapshots_dir = repo / "snapshots"
+        if not snapshots_dir.is_dir():
+            continue
+
+        ref = repo / "refs" / "main"
+        if ref.is_file():
+            snapshot = snapshots_dir / ref.read_text().strip()
+            if snapshot.is_dir() and any(snapshot.iterdir()):
+                return snapshot
+
+        snapshots = [path for path in snapshots_dir.iterdir() if path.is_dir() and any(path.iterdir())]
+        if snapshots:
+            return max(snapshots, key=lambda path: path.stat().st_mtime)
+    return None
+
+
+def find_hub_repo(repo: str, hub_dir: Path) -> Optional[Path]:
+    """
+    Find a torch.hub checkout of a GitHub repository
+
+    Args:
+        repo: "owner/name" or "owner/name:branch"
+        hub_dir: torch.hub cache directory (torch.hub.get_dir())
+
+    Returns:
+        Repository directory containing hubconf.py, or None
+    """
+    name, _, branch = repo.partition(":")
+    owner_name = name.replace("/", "_")
+    branches = [branch.replace("/", "_")] if branch else ["main", "master"]
+    for candidate in branches:
+        checkout = Path(hub_dir) / f"{owner_name}_{candidate}"
+        if (checkout / "hubconf.py").is_file():
+            return checkout
+    return None
+
+
+class ModelManifest:
+    """Persistent map of model IDs to local snapshot directories"""
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST_PATH, search_dirs: list = None,
+                 hub_dir: Path = None):
+        """
+        Initialize the manifest
+
+        Args:
+            path: JSON file the entries are stored in (None = in memory only)
+            search_dirs: Hugging Face cache directories scanned for snapshots
+                (default: every folder under models/ plus the user cache)
+            hub_dir: torch.hub cache directory (default: torch.hub.get_dir())
+        """
+        self._lock = threading.RLock()
+        self._refresh = set()
+        self.configure(path, search_dirs, hub_dir)
+
+    def configure(self, path: Path = DEFAULT_MANIFEST_PATH, search_dirs: list = None,
+                  hub_dir: Path = None):
+        """Change the manifest file and search locations (reloads the entries)"""
+        with self._lock:
+            self.path = Path(path) if path is not None else None
+            self.search_dirs = search_dirs
+            self.hub_dir = hub_dir
+            self._entries = self._read()
+
+    def configure_from_config(self, config: dict, base_dir: Path = None):
+        """Apply the 'models.manifest' path from config.yaml"""
+        path = Path((config or {}).get('models', {}).get('manifest', DEFAULT_MANIFEST_PATH))
+        if base_dir is not None and not path.is_absolute():
+            path = Path(base_dir) / path
+        self.configure(path)
+
+    def resolve(self, model_id: str, cache_dir: Path = None) -> Optional[Path]:
+        """
+        Local snapshot directory of a Hugging Face model
+
+        Args:
+            model_id: Repository ID or a local model directory
+            cache_dir: Loader cache directory, searched before the defaults
+
+        Returns:
+            Directory to load from with local_files_only, or None if the hub
+            has to be used (no snapshot on disk, or a refresh was requested)
+        """
+        if Path(model_id).is_dir():
+            return Path(model_id)
+
+        with self._lock:
+            if model_id in self._refresh:
+                return None
+
+            path = self._lookup(model_id, HUGGINGFACE)
+            if path is None:
+                path = find_snapshot(model_id, [cache_dir] + self._search_dirs())
+                if path is not None:
+                    self.record(model_id, path)
+            return path
+
+    def resolve_hub_repo(self, repo: str) -> Optional[Path]:
+        """
+        Local torch.hub checkout of a GitHub repository
+
+        Returns:
+            Directory to pass to torch.hub.load(..., source="local"), or None
+        """
+        with self._lock:
+            if repo in self._refresh:
+                return None
+
+            path = self._lookup(repo, TORCH_HUB)
+            if path is None:
+                path = find_hub_repo(repo, self._hub_dir())
+                if path is not None:
+                    self.record(repo, path, TORCH_HUB)
+            return path
+
+    def record(self, model_id: str, path: Path, source: str = HUGGINGFACE):
+        """Add or replace an entry and save the manifest"""
+        with self._lock:
+            self._refresh.discard(model_id)
+            self._entries[model_id] = {'path': str(Path(path).resolve()), 'source': source}
+            self._write()
+
+    def record_download(self, model_id: str, cache_dir: Path = None) -> Optional[Path]:
+        """
+        Record the snapshot a hub load just left on disk
+
+        Returns:
+            The recorded snapshot directory, or None if it cannot be found
+        """
+        path = find_snapshot(model_id, [cache_dir] + self._search_dirs())
+        if path is not None:
+            self.record(model_id, path)
+        return path
+
+    def record_hub_download(self, repo: str) -> Optional[Path]:
+        """Record the torch.hub checkout a hub load just left on disk"""
+        path = find_hub_repo(repo, self._hub_dir())
+        if path is not None:
+            self.record(repo, path, TORCH_HUB)
+        return path
+
+    def refresh(self, model_id: str = None):
+        """
+        Make the next load of a model (None = every recorded model) go to the hub
+
+        The entry is recorded again once that load has downloaded the files.
+        """
+        with self._lock:
+            model_ids = list(self._entries) if model_id is None else [model_id]
+            for key in model_ids:
+                self._entries.pop(key, None)
+                self._refresh.add(key)
+            self._write()
+
+    def entries(self) -> dict:
+        """Copy of all entries: model ID -> {'path', 'source'}"""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items()}
+
+    def __contains__(self, model_id: str) -> bool:
+        with self._lock:
+            return model_id in self._entries
+
+    def _lookup(self, model_id: str, source: str) -> Optional[Path]:
+        """Recorded path of a model, dropping entries whose files were deleted"""
+        entry = self._entries.get(model_id)
+        if entry is None or entry.get('source', HUGGINGFACE) != source:
+            return None
+        path = Path(entry['path'])
+        if not path.is_dir():
+            print(f"Manifest entry for {model_id} is gone from disk: {path}")
+            del self._entries[model_id]
+            self._write()
+            return None
+        return path
+
+    def _search_dirs(self) -> list:
+        """Hugging Face cache directories to scan"""
+        if self.search_dirs is not None:
+            return list(self.search_dirs)
+
+        models_dir = BASE_DIR / "models"
+        dirs = [path for path in sorted(models_dir.iterdir()) if path.is_dir()] if models_dir.is_dir() else []
+        try:
+            from huggingface_hub.constants import HF_HUB_CACHE
+            dirs.append(Path(HF_HUB_CACHE))
+        except ImportError:
+            pass
+        return dirs
+
+    def _hub_dir(self) -> Path:
+        """torch.hub cache directory"""
+        if self.hub_dir is not None:
+            return Path(self.hub_dir)
+        import torch.hub
+        return Path(torch.hub.get_dir())
+
+    def _read(self) -> dict:
+        """Load the entries from disk"""
+        if self.path is None or not self.path.is_file():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('models', {})
+        except Exception as e:
+            print(f"Could not read model manifest {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        """Save the entries atomically"""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({'models': self._entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Could not write model manifest {self.path}: {e}")
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_model_manifest() -> ModelManifest:
+    """Get the process-wide model manifest"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = ModelManifest()
+        return _manifest
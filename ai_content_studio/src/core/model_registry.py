@@ -0,0 +1,301 @@
+"""
+Model Registry - Process-wide cache of loaded pipelines and generators
+
+Loaded models stay resident between jobs so repeated generations skip the
+full from_pretrained + .to(device) cost. When the configured RAM or VRAM
+budget is exceeded, the least-recently-used entries are evicted.
+"""
+
+import gc
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .memory_utils import (
+    memory_pool,
+    estimate_size_bytes,
+    total_ram_bytes,
+    total_device_memory_bytes,
+    empty_device_cache,
+)
+
+
+GB = 1024 ** 3
+
+# Fractions of physical memory used when a budget is set to "auto"
+AUTO_RAM_FRACTION = 0.75
+AUTO_VRAM_FRACTION = 0.9
+
+
+class _RegistryEntry:
+    """A single resident model with its bookkeeping"""
+
+    def __init__(self, value: Any, device: str, size_bytes: Optional[int]):
+        self.value = value
+        self.device = str(device)
+        self.pool = memory_pool(device)
+        self.fixed_size = size_bytes
+        self.hits = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Current size (re-estimated so lazily loaded sub-models are counted)"""
+        if self.fixed_size is not None:
+            return self.fixed_size
+        return estimate_size_bytes(self.value)
+
+
+class ModelRegistry:
+    """Keep loaded models resident between jobs with LRU eviction under a memory budget"""
+
+    def __init__(self, ram_budget_gb="auto", vram_budget_gb="auto"):
+        """
+        Initialize the registry
+
+        Args:
+            ram_budget_gb: Max GB of system RAM for resident models ("auto" or None for no limit)
+            vram_budget_gb: Max GB of GPU memory for resident models ("auto" or None for no limit)
+        """
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading = {}
+        self._usage_locks = {}
+        self.ram_budget_gb = ram_budget_gb
+        self.vram_budget_gb = vram_budget_gb
+
+    def configure(self, ram_budget_gb="auto", vram_budget_gb="auto"):
+        """Update the memory budgets and evict entries that no longer fit"""
+        with self._lock:
+            self.ram_budget_gb = ram_budget_gb
+            self.vram_budget_gb = vram_budget_gb
+        self._enforce_budget()
+
+    def configure_from_config(self, config: dict):
+        """Apply budgets from the 'models.registry' section of config.yaml"""
+        registry_config = (config or {}).get('models', {}).get('registry', {}) or {}
+        self.configure(
+            ram_budget_gb=registry_config.get('ram_budget_gb', "auto"),
+            vram_budget_gb=registry_config.get('vram_budget_gb', "auto"),
+        )
+
+    def budget_bytes(self, pool: str, device: str = "cuda") -> Optional[int]:
+        """Get the budget in bytes for a memory pool (None means unlimited)"""
+        budget = self.ram_budget_gb if pool == "ram" else self.vram_budget_gb
+
+        if budget is None:
+            return None
+
+        if budget == "auto":
+            if pool == "ram":
+                total = total_ram_bytes()
+                return int(total * AUTO_RAM_FRACTION) if total else None
+            total = total_device_memory_bytes(device)
+            return int(total * AUTO_VRAM_FRACTION) if total else None
+
+        return int(float(budget) * GB)
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        device: str = None,
+        size_bytes: int = None
+    ) -> Any:
+        """
+        Return the resident model for a key, loading it if necessary
+
+        Concurrent callers asking for the same key wait on a single load
+        instead of starting their own.
+
+        Args:
+            key: Hashable cache key (e.g. model name, dtype, device, refiner flag)
+            loader: Zero-argument callable that builds the model
+            device: Device the model lives on (defaults to the value's .device or 'cpu')
+            size_bytes: Fixed size override; estimated from torch modules when omitted
+
+        Returns:
+            The loaded model object
+        """
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry.value
+
+            try:
+                value = loader()
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+            if device is None:
+                device = getattr(value, "device", "cpu")
+
+            with self._lock:
+                self._entries[key] = _RegistryEntry(value, device, size_bytes)
+            self._enforce_budget(protect=key)
+
+            return value
+
+    def usage_lock(self, key: Hashable) -> threading.RLock:
+        """
+        Lock serializing the use of a shared model
+
+        Pipelines hold per-call state (scheduler step index, guidance scale,
+        offload hooks), so generators sharing one must not run it at the same
+        time. The lock outlives evictions, so every value ever loaded for the
+        key is guarded by the same lock.
+        """
+        with self._lock:
+            return self._usage_locks.setdefault(key, threading.RLock())
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the resident model for a key without loading (None if absent)"""
+        with self._lock:
+            entry = self._touch(key)
+            return entry.value if entry is not None else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def is_loading(self, key: Hashable) -> bool:
+        """Check whether a load for this key is currently in progress"""
+        with self._lock:
+            return key in self._loading
+
+    def release(self, key: Hashable) -> bool:
+        """
+        Evict a model from the registry
+
+        Returns:
+            True if an entry was removed
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        if entry is None:
+            return False
+
+        self._dispose(key, entry)
+        return True
+
+    def clear(self):
+        """Evict every resident model"""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+
+        for key, entry in entries:
+            self._dispose(key, entry)
+
+    def stats(self) -> list:
+        """Get a list of resident entries, least recently used first"""
+        with self._lock:
+            return [
+                {
+                    'key': key,
+                    'device': entry.device,
+                    'pool': entry.pool,
+                    'size_gb': entry.size_bytes / GB,
+                    'hits': entry.hits,
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def _touch(self, key: Hashable) -> Optional[_RegistryEntry]:
+        """Mark an entry as most recently used (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.hits += 1
+        return entry
+
+    def _enforce_budget(self, protect: Hashable = None):
+        """Evict least-recently-used entries until every pool fits its budget"""
+        evicted = []
+
+        with self._lock:
+            for pool in ("ram", "vram"):
+                pool_entries = [
+                    (key, entry) for key, entry in self._entries.items()
+                    if entry.pool == pool
+                ]
+                if not pool_entries:
+                    continue
+
+                budget = self.budget_bytes(pool, pool_entries[-1][1].device)
+                if budget is None:
+                    continue
+
+                sizes = {key: entry.size_bytes for key, entry in pool_entries}
+                used = sum(sizes.values())
+
+                for key, entry in pool_entries:
+                    if used <= budget:
+                        break
+                    if key == protect:
+                        continue
+                    self._entries.pop(key, None)
+                    used -= sizes[key]
+                    evicted.append((key, entry))
+
+                if used > budget:
+                    print(
+                        f"Warning: resident models use {used / GB:.1f} GB of "
+                        f"{pool.upper()}, over the {budget / GB:.1f} GB budget"
+                    )
+
+        for key, entry in evicted:
+            print(f"Evicting least-recently-used model: {key}")
+            self._dispose(key, entry)
+
+    def _acquire_idle(self, key: Hashable) -> bool:
+        """Take the usage lock of a key only if no job (on any thread) holds it"""
+        lock = self.usage_lock(key)
+        # RLock.acquire() succeeds re-entrantly, so check for the current thread first
+        if lock._is_owned():
+            return False
+        return lock.acquire(blocking=False)
+
+    def _dispose(self, key: Hashable, entry: _RegistryEntry):
+        """Drop the registry's reference and free cached device memory"""
+        value = entry.value
+        entry.value = None
+
+        unload = getattr(value, "unload_model", None)
+        if callable(unload) and not isinstance(value, (tuple, list, dict)):
+            if self._acquire_idle(key):
+                try:
+                    unload()
+                except Exception as e:
+                    print(f"Error unloading {key}: {e}")
+                finally:
+                    self._usage_locks[key].release()
+            else:
+                # A job is still running it; the model is freed with the
+                # job's last reference instead
+                print(f"{key} is in use, skipping unload")
+
+        del value
+        gc.collect()
+        empty_device_cache()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Get the process-wide model registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
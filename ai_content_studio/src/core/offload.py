@@ -0,0 +1,192 @@
+"""
+Offload Policy - Device selection and memory-budgeted execution modes
+
+Reads the 'hardware' section of config.yaml to pick the compute device and
+decide where pipeline weights live during generation:
+
+- resident: the whole pipeline stays on the device (fastest)
+- model_cpu_offload: sub-models (text encoders, UNet, VAE) are moved to the
+  device one at a time and back to RAM when done
+- sequential_offload: weights are streamed to the device layer by layer
+  (lowest device memory, slowest)
+
+In "auto" mode the fastest mode whose peak device memory fits the budget wins.
+"""
+
+from typing import Optional
+
+from .memory_utils import total_device_memory_bytes
+from .model_registry import GB, get_registry
+
+
+OFFLOAD_MODES = ("resident", "model_cpu_offload", "sequential_offload")
+
+# Approximate fp16 weight sizes in GB: (whole pipeline, largest sub-model = UNet)
+PIPELINE_WEIGHTS_GB = {
+    "sdxl": (6.9, 5.1),
+    "sdxl_refiner": (6.1, 4.5),
+    "sd": (2.1, 1.7),
+}
+
+# Peak device memory of sequential offload: one layer plus activations
+SEQUENTIAL_OFFLOAD_PEAK_GB = 1.5
+
+# Working memory for denoising a ~1 megapixel image (on top of the weights)
+ACTIVATION_HEADROOM_GB = 2.5
+
+
+class OffloadPolicy:
+    """Chooses the compute device and execution mode from hardware settings"""
+
+    def __init__(self, device: str = "auto", use_gpu: bool = True,
+                 offload_mode: str = "auto", memory_budget_gb="auto"):
+        """
+        Initialize the policy
+
+        Args:
+            device: "auto", "cuda", "mps" or "cpu"
+            use_gpu: False forces CPU inference
+            offload_mode: "auto" or one of OFFLOAD_MODES
+            memory_budget_gb: Device memory the pipeline may use in GB
+                ("auto" = the model registry's VRAM budget)
+        """
+        if offload_mode != "auto" and offload_mode not in OFFLOAD_MODES:
+            raise ValueError(
+                f"Unknown offload mode '{offload_mode}' "
+                f"(available: auto, {', '.join(OFFLOAD_MODES)})"
+            )
+        self.device = str(device or "auto").lower()
+        self.use_gpu = use_gpu
+        self.offload_mode = offload_mode
+        self.memory_budget_gb = memory_budget_gb
+
+    @classmethod
+    def from_config(cls, hardware_config: dict) -> "OffloadPolicy":
+        """Create a policy from the 'hardware' section of config.yaml"""
+        hardware_config = hardware_config or {}
+        return cls(
+            device=hardware_config.get('device', "auto"),
+            use_gpu=hardware_config.get('use_gpu', True),
+            offload_mode=hardware_config.get('offload_mode', "auto"),
+            memory_budget_gb=hardware_config.get('memory_budget_gb', "auto"),
+        )
+
+    def resolve_device(self) -> str:
+        """Get the compute device, falling back to the CPU if the requested one is missing"""
+        import torch
+
+        cuda = torch.cuda.is_available()
+        mps = torch.backends.mps.is_available()
+
+        if not self.use_gpu or self.device == "cpu":
+            return "cpu"
+        if self.device == "cuda":
+            if cuda:
+                return "cuda"
+            print("CUDA requested in config but not available, using CPU")
+            return "cpu"
+        if self.device == "mps":
+            if mps:
+                return "mps"
+            print("MPS requested in config but not available, using CPU")
+            return "cpu"
+
+        if cuda:
+            return "cuda"
+        elif mps:
+            return "mps"
+        return "cpu"
+
+    def budget_bytes(self, device: str) -> Optional[int]:
+        """Device memory available to one pipeline (None means unlimited)"""
+        if self.memory_budget_gb is None:
+            return None
+        if self.memory_budget_gb == "auto":
+            budget = get_registry().budget_bytes("vram", device)
+            if budget is None:
+                total = total_device_memory_bytes(device)
+                return total or None
+            return budget
+        return int(float(self.memory_budget_gb) * GB)
+
+    def choose_mode(self, device: str, model_type: str, dtype_bits: int = 16,
+                    use_refiner: bool = False) -> str:
+        """
+        Pick the execution mode for a pipeline
+
+        Args:
+            device: Compute device from resolve_device()
+            model_type: "sdxl" or "sd"
+            dtype_bits: Bits per weight (16 for fp16, 32 for fp32)
+            use_refiner: Whether the SDXL refiner is loaded too
+
+        Returns:
+            One of OFFLOAD_MODES
+        """
+        # On the CPU the weights already live in RAM; there is nothing to offload to
+        if device == "cpu":
+            return "resident"
+
+        if self.offload_mode != "auto":
+            return self.offload_mode
+
+        budget = self.budget_bytes(device)
+        if budget is None:
+            return "resident"
+
+        peaks = estimate_peak_bytes(model_type, dtype_bits, use_refiner)
+        for mode in OFFLOAD_MODES:
+            if peaks[mode] <= budget:
+                return mode
+        return "sequential_offload"
+
+    def apply(self, pipe, mode: str, device: str):
+        """
+        Place a pipeline on the device according to the execution mode
+
+        Args:
+            pipe: Diffusers pipeline still on the CPU
+            mode: One of OFFLOAD_MODES
+            device: Compute device
+
+        Returns:
+            The mode actually in use (resident if offloading is unavailable)
+        """
+        if mode == "model_cpu_offload":
+            try:
+                pipe.enable_model_cpu_offload(device=device)
+                return mode
+            except Exception as e:
+                print(f"Could not enable model CPU offload ({e}), keeping the model resident")
+        elif mode == "sequential_offload":
+            try:
+                pipe.enable_sequential_cpu_offload(device=device)
+                return mode
+            except Exception as e:
+                print(f"Could not enable sequential CPU offload ({e}), keeping the model resident")
+
+        pipe.to(device)
+        return "resident"
+
+
+def estimate_peak_bytes(model_type: str, dtype_bits: int = 16, use_refiner: bool = False) -> dict:
+    """
+    Estimate peak device memory for each execution mode
+
+    Returns:
+        Dict mapping each mode in OFFLOAD_MODES to bytes
+    """
+    scale = dtype_bits / 16
+    total_gb, largest_gb = PIPELINE_WEIGHTS_GB[model_type]
+    if use_refiner and model_type == "sdxl":
+        # The refiner shares text_encoder_2 and the VAE with the base pipeline,
+        # so only its UNet adds to the resident weights
+        _, refiner_unet = PIPELINE_WEIGHTS_GB["sdxl_refiner"]
+        total_gb += refiner_unet
+        largest_gb = max(largest_gb, refiner_unet)
+
+    return {
+        "resident": int((total_gb * scale + ACTIVATION_HEADROOM_GB) * GB),
+        "model_cpu_offload": int((largest_gb * scale + ACTIVATION_HEADROOM_GB) * GB),
+        "sequential_offload": int(SEQUENTIAL_OFFLOAD_PEAK_GB * GB),
+    }
@@ -0,0 +1,218 @@
+"""
+Output Store - Unique asset naming and a SQLite index of generated files
+
+Every generated file (image, 3D model, audio) gets a unique, time-sortable
+asset ID that is also part of its filename, so outputs written in the same
+second never collide. The store records each asset with its type, the
+parameters that produced it, file size, timings and the parent asset it was
+derived from (e.g. the 2D image behind a 3D model), so outputs can be listed
+by querying the index instead of walking the output directories.
+"""
+
+import contextlib
+import datetime
+import json
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size_bytes INTEGER,
+    created_at TEXT NOT NULL,
+    params TEXT,
+    timings TEXT,
+    parent_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assets_type_created ON assets(type, created_at);
+CREATE INDEX IF NOT EXISTS idx_assets_parent ON assets(parent_id);
+CREATE INDEX IF NOT EXISTS idx_assets_path ON assets(path);
+"""
+
+
+def new_asset_id() -> str:
+    """
+    Create a unique asset ID
+
+    Returns:
+        ID like "20250101_120000_1a2b3c4d": a sortable timestamp plus random hex
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{timestamp}_{uuid.uuid4().hex[:8]}"
+
+
+class OutputStore:
+    """SQLite index of generated assets"""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the store
+
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict, base_dir: Path = None) -> "OutputStore":
+        """Create the store at '<output.base_dir>/index.sqlite' from config.yaml"""
+        output_dir = Path((config or {}).get('output', {}).get('base_dir', "./output"))
+        if base_dir is not None and not output_dir.is_absolute():
+            output_dir = Path(base_dir) / output_dir
+        return cls(output_dir / "index.sqlite")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Open a short-lived connection (usable from any thread), commit and close it"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(
+        self,
+        asset_type: str,
+        path: Path,
+        params: dict = None,
+        parent_id: str = None,
+        timings: dict = None,
+        asset_id: str = None
+    ) -> str:
+        """
+        Add a generated file to the index
+
+        Args:
+            asset_type: "image", "model_3d" or "audio"
+            path: Path of the written file
+            params: Generation parameters (stored as JSON)
+            parent_id: ID of the asset this one was derived from
+            timings: Stage durations in seconds (stored as JSON)
+            asset_id: ID used in the filename (a new one is created if omitted)
+
+        Returns:
+            The asset ID
+        """
+        path = Path(path).resolve()
+        asset_id = asset_id or new_asset_id()
+        size_bytes = path.stat().st_size if path.exists() else None
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO assets "
+                "(id, type, path, size_bytes, created_at, params, timings, parent_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    asset_id, asset_type, str(path), size_bytes,
+                    datetime.datetime.now().isoformat(timespec="milliseconds"),
+                    json.dumps(params or {}, default=str),
+                    json.dumps(timings or {}),
+                    parent_id,
+                )
+            )
+        return asset_id
+
+    def get(self, asset_id: str) -> Optional[dict]:
+        """Look up an asset by ID"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM assets WHERE id = ?", (asset_id,)).fetchone()
+        return self._to_dict(row)
+
+    def find_by_path(self, path: Path) -> Optional[dict]:
+        """Look up the asset stored at a path"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM assets WHERE path = ? ORDER BY created_at DESC LIMIT 1",
+                (str(Path(path).resolve()),)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def query(self, asset_type: str = None, parent_id: str = None,
+              limit: int = None, existing_only: bool = True) -> list:
+        """
+        List assets, newest first
+
+        Args:
+            asset_type: Only assets of this type
+            parent_id: Only assets derived from this asset
+            limit: Maximum number of results
+            existing_only: Skip entries whose file has been deleted
+
+        Returns:
+            List of asset dicts (params/timings decoded, path as Path)
+        """
+        sql = "SELECT * FROM assets"
+        conditions, args = [], []
+        if asset_type is not None:
+            conditions.append("type = ?")
+            args.append(asset_type)
+        if parent_id is not None:
+            conditions.append("parent_id = ?")
+            args.append(parent_id)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, id DESC"
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+
+        assets = []
+        for row in rows:
+            asset = self._to_dict(row)
+            if existing_only and not asset['path'].exists():
+                continue
+            assets.append(asset)
+            if limit is not None and len(assets) >= limit:
+                break
+        return assets
+
+    def latest(self, asset_type: str = None) -> Optional[dict]:
+        """Most recent existing asset (of a type)"""
+        assets = self.query(asset_type=asset_type, limit=1)
+        return assets[0] if assets else None
+
+    def counts(self) -> dict:
+        """Number of indexed assets per type"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT type, COUNT(*) FROM assets GROUP BY type").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def prune_missing(self) -> int:
+        """
+        Drop index entries whose files were deleted
+
+        Returns:
+            Number of removed entries
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, path FROM assets").fetchall()
+        missing = [(row['id'],) for row in rows if not Path(row['path']).exists()]
+
+        if missing:
+            with self._lock, self._connect() as conn:
+                conn.executemany("DELETE FROM assets WHERE id = ?", missing)
+        return len(missing)
+
+    @staticmethod
+    def _to_dict(row) -> Optional[dict]:
+        if row is None:
+            return None
+        asset = dict(row)
+        asset['path'] = Path(asset['path'])
+        asset['params'] = json.loads(asset['params'] or "{}")
+        asset['timings'] = json.loads(asset['timings'] or "{}")
+        return asset
@@ -0,0 +1,298 @@
+"""
+Profiling - Per-stage wall time, CPU time and peak memory of a request
+
+A GenerationProfile is activated on the thread handling a request; code
+along the way marks its stages (model load, prompt encoding, denoising,
+VAE decode, refiner, background removal, save) with profile_stage(). Every
+stage records wall time, process CPU time, peak resident memory and peak
+accelerator memory. Nested stages are subtracted from their parent, so
+the stage times add up to the request's total.
+
+Without an active profile, profile_stage() and the module hooks do
+nothing, so the markers can stay in the hot path.
+"""
+
+import contextlib
+import datetime
+import json
+import threading
+import time
+from pathlib import Path
+
+from .memory_utils import process_rss_bytes, _get_torch
+
+
+# Seconds between resident-memory samples while a profile is active
+SAMPLE_INTERVAL = 0.02
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class StageStats:
+    """Accumulated measurements of one named stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_bytes = 0
+        self.peak_device_bytes = None
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'wall_s': round(self.wall_s, 4),
+            'cpu_s': round(self.cpu_s, 4),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_device_bytes': self.peak_device_bytes,
+        }
+
+
+class _OpenStage:
+    """A stage that has begun but not ended"""
+
+    def __init__(self, stats: StageStats):
+        self.stats = stats
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.peak_rss = process_rss_bytes()
+
+
+class GenerationProfile:
+    """Per-stage timing and peak memory of one request"""
+
+    def __init__(self, label: str = "", device: str = "cpu",
+                 sample_interval: float = SAMPLE_INTERVAL):
+        """
+        Initialize an empty profile
+
+        Args:
+            label: Name of the profiled call (e.g. "generate")
+            device: Device the request runs on; peak device memory is only
+                tracked on CUDA
+            sample_interval: Seconds between resident-memory samples
+        """
+        self.label = label
+        self.device = str(device)
+        self.sample_interval = sample_interval
+        self.stages = {}
+        self.params = {}
+        self.started_at = None
+        self.total_s = 0.0
+        self.total_cpu_s = 0.0
+        self.peak_rss_bytes = 0
+        self._stack = []
+        self._lock = threading.Lock()
+        self._sampling = threading.Event()
+        self._sampler = None
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Make this the calling thread's profile for the duration of the block
+
+        Resident memory is sampled on a background thread meanwhile. Time
+        spent in the block is added to total_s.
+        """
+        previous = getattr(_local, "profile", None)
+        _local.profile = self
+        if self.started_at is None:
+            self.started_at = datetime.datetime.now().isoformat(timespec="milliseconds")
+
+        self._sampling.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profile-rss", daemon=True)
+        self._sampler.start()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield self
+        finally:
+            # Stages left open by an exception end here
+            while self._stack:
+                self.end(self._stack[-1].stats.name)
+            self.total_s += time.perf_counter() - start_wall
+            self.total_cpu_s += time.process_time() - start_cpu
+            self._sampling.set()
+            self._sampler.join()
+            self.peak_rss_bytes = max(self.peak_rss_bytes, process_rss_bytes())
+            _local.profile = previous
+
+    def _sample(self):
+        """Track the peak RSS of every open stage"""
+        while not self._sampling.wait(self.sample_interval):
+            rss = process_rss_bytes()
+            with self._lock:
+                self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+                for stage in self._stack:
+                    stage.peak_rss = max(stage.peak_rss, rss)
+
+    def _device_peak(self):
+        """Peak allocated CUDA memory since the last reset (None off CUDA)"""
+        torch = _get_torch()
+        if torch is None or not self.device.startswith("cuda") or not torch.cuda.is_available():
+            return None
+        return torch.cuda.max_memory_allocated(torch.device(self.device))
+
+    def _reset_device_peak(self):
+        torch = _get_torch()
+        if torch is not None and self.device.startswith("cuda") and torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats(torch.device(self.device))
+
+    def begin(self, name: str):
+        """Start a stage (nested inside the currently open one, if any)"""
+        if self._stack:
+            # The reset below would lose the parent's peak so far
+            parent = self._stack[-1].stats
+            parent.peak_device_bytes = _max_or_none(parent.peak_device_bytes, self._device_peak())
+        self._reset_device_peak()
+
+        stats = self.stages.setdefault(name, StageStats(name))
+        with self._lock:
+            self._stack.append(_OpenStage(stats))
+
+    def end(self, name: str):
+        """End the innermost open stage with this name (and any opened inside it)"""
+        if not any(stage.stats.name == name for stage in self._stack):
+            return
+        while True:
+            with self._lock:
+                stage = self._stack.pop()
+            wall = time.perf_counter() - stage.start_wall
+            cpu = time.process_time() - stage.start_cpu
+            stats = stage.stats
+            stats.calls += 1
+            stats.wall_s += wall - stage.child_wall
+            stats.cpu_s += cpu - stage.child_cpu
+            stats.peak_rss_bytes = max(stats.peak_rss_bytes, stage.peak_rss, process_rss_bytes())
+            stats.peak_device_bytes = _max_or_none(stats.peak_device_bytes, self._device_peak())
+
+            if self._stack:
+                parent = self._stack[-1]
+                parent.child_wall += wall
+                parent.child_cpu += cpu
+                parent.stats.peak_device_bytes = _max_or_none(
+                    parent.stats.peak_device_bytes, stats.peak_device_bytes
+                )
+            if stats.name == name:
+                return
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Measure the block as a stage"""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def stage_seconds(self) -> dict:
+        """Stage name -> wall seconds (exclusive of nested stages)"""
+        return {name: stats.wall_s for name, stats in self.stages.items()}
+
+    def other_s(self) -> float:
+        """Wall time of the profiled block that is not inside any stage"""
+        return max(0.0, self.total_s - sum(self.stage_seconds().values()))
+
+    def to_dict(self) -> dict:
+        """JSON-serializable summary"""
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'device': self.device,
+            'total_s': round(self.total_s, 4),
+            'total_cpu_s': round(self.total_cpu_s, 4),
+            'other_s': round(self.other_s(), 4),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'stages': [stats.to_dict() for stats in self.stages.values()],
+            'params': self.params,
+        }
+
+    def write_jsonl(self, path: Path):
+        """Append the summary as one JSON line"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(self.to_dict(), default=str)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def format_table(self) -> str:
+        """Per-stage breakdown as a text table"""
+        mb = 1024 ** 2
+        rows = []
+        for stats in self.stages.values():
+            share = stats.wall_s / self.total_s * 100 if self.total_s else 0.0
+            rows.append([
+                stats.name, str(stats.calls), f"{stats.wall_s:.3f}", f"{share:.1f}%",
+                f"{stats.cpu_s:.3f}", f"{stats.peak_rss_bytes / mb:.0f}",
+                "-" if stats.peak_device_bytes is None else f"{stats.peak_device_bytes / mb:.0f}",
+            ])
+        rows.append(["(other)", "", f"{self.other_s():.3f}",
+                     f"{self.other_s() / self.total_s * 100 if self.total_s else 0.0:.1f}%",
+                     "", "", ""])
+        rows.append(["total", "", f"{self.total_s:.3f}", "100.0%", f"{self.total_cpu_s:.3f}",
+                     f"{self.peak_rss_bytes / mb:.0f}", ""])
+
+        headers = ["stage", "calls", "wall (s)", "share", "cpu (s)", "peak RSS (MB)", "peak device (MB)"]
+        widths = [max(len(str(row[i])) for row in rows + [headers]) for i in range(len(headers))]
+        lines = [" | ".join(h.ljust(w) for h, w in zip(headers, widths))]
+        lines.append("-+-".join("-" * w for w in widths))
+        for row in rows:
+            lines.append(" | ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+        return "\n".join(lines)
+
+
+def _max_or_none(a, b):
+    """max() that treats None as missing"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def current_profile():
+    """The profile active on the calling thread, or None"""
+    return getattr(_local, "profile", None)
+
+
+@contextlib.contextmanager
+def profile_stage(name: str):
+    """Measure the block as a stage of the active profile (no-op without one)"""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    with profile.stage(name):
+        yield
+
+
+def _stage_pre_hook(module, args):
+    profile = current_profile()
+    if profile is not None:
+        profile.begin(module._profile_stage)
+
+
+def _stage_post_hook(module, args, output):
+    profile = current_profile()
+    if profile is not None:
+        profile.end(module._profile_stage)
+
+
+def instrument_module(module, name: str):
+    """
+    Record every forward pass of a module as a stage of the active profile
+
+    Used for work that happens inside diffusers pipeline calls, such as the
+    VAE decode. The hooks stay installed (once per module) and do nothing
+    while no profile is active.
+    """
+    if getattr(module, "_profile_stage", None) is not None:
+        return
+    module._profile_stage = name
+    module.register_forward_pre_hook(_stage_pre_hook)
+    module.register_forward_hook(_stage_post_hook)
@@ -0,0 +1,109 @@
+"""
+Prompt Embedding Cache - LRU cache of text-encoder outputs
+
+The enhanced prompts share long fixed suffixes and the default negative
+prompt is almost always the same string, so encoded embeddings are cached
+per (model, text, clip skip) instead of re-running the text encoders.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class PromptEmbeddingCache:
+    """LRU cache of (prompt_embeds, pooled_prompt_embeds) pairs"""
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of encoded texts kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Tokenizers and text encoders are shared between threads (e.g. the
+        # background warm-up) and are not safe to call concurrently
+        self._encode_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, pipe, model_key: Hashable, text: str, device: str,
+               clip_skip: Optional[int] = None) -> tuple:
+        """
+        Get the embeddings for a text, encoding it on a cache miss
+
+        Args:
+            pipe: Loaded diffusers pipeline providing encode_prompt()
+            model_key: Identifies the text encoders (model, dtype, device)
+            text: Text to encode
+            device: Device to encode on
+            clip_skip: Number of CLIP layers to skip (None for the default)
+
+        Returns:
+            Tuple (prompt_embeds, pooled_prompt_embeds); pooled is None for SD 1.x/2.x
+        """
+        key = (model_key, text, clip_skip)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        with self._encode_lock:
+            # Another thread may have encoded the same text while we waited
+            with self._lock:
+                cached = self._entries.get(key)
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+
+            encoded = pipe.encode_prompt(
+                prompt=text,
+                device=device,
+                num_images_per_prompt=1,
+                do_classifier_free_guidance=False,
+                clip_skip=clip_skip,
+            )
+
+        # SDXL returns (embeds, neg, pooled, neg_pooled); SD returns (embeds, neg)
+        embeddings = (encoded[0], encoded[2] if len(encoded) == 4 else None)
+
+        with self._lock:
+            self._entries[key] = embeddings
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return embeddings
+
+    def clear(self, model_key: Hashable = None):
+        """Drop cached embeddings for one model (or all models)"""
+        with self._lock:
+            if model_key is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == model_key]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptEmbeddingCache:
+    """Get the process-wide prompt embedding cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptEmbeddingCache()
+        return _cache
@@ -0,0 +1,137 @@
+"""
+Result Cache - Content-addressed on-disk cache of deterministic generations
+
+With a fixed seed, an image request is fully determined by its parameters,
+so the finished image is stored under a hash of those parameters and
+returned directly when the same request comes in again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class ResultCache:
+    """On-disk LRU cache of generated images keyed by request hash"""
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 2048):
+        """
+        Initialize the result cache
+
+        Args:
+            cache_dir: Directory holding the cached images
+            max_size_mb: Size cap; least-recently-used entries are deleted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: dict, base_dir: Path = None) -> Optional["ResultCache"]:
+        """
+        Create a cache from 'generation.image.result_cache' in config.yaml
+
+        Returns:
+            ResultCache instance, or None when the cache is disabled
+        """
+        cache_config = (config or {}).get('generation', {}).get('image', {}).get('result_cache', {}) or {}
+        if not cache_config.get('enabled', False):
+            return None
+
+        cache_dir = Path(cache_config.get('dir', "./output/.cache/results"))
+        if base_dir is not None and not cache_dir.is_absolute():
+            cache_dir = Path(base_dir) / cache_dir
+
+        return cls(cache_dir, max_size_mb=cache_config.get('max_size_mb', 2048))
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """Hash request parameters into a stable cache key"""
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Look up a cached image
+
+        Returns:
+            Path to the cached image, or None on a miss
+        """
+        path = self._path_for(key)
+        if not path.exists():
+            return None
+
+        # Refresh the access time used for LRU eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        print(f"Result cache hit: {key[:12]}")
+        return path
+
+    def put(self, key: str, image) -> Path:
+        """
+        Store a generated image under a key
+
+        Args:
+            key: Cache key from make_key()
+            image: PIL image to store
+
+        Returns:
+            Path to the cached image
+        """
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial image
+        tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp")
+        image.save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+
+        self._evict()
+        return path
+
+    def size_bytes(self) -> int:
+        """Total size of all cached images"""
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*/*.png"))
+
+    def _evict(self):
+        """Delete least-recently-used images until the cache fits its size cap"""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*/*.png"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_size_bytes:
+                return
+
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Delete every cached image"""
+        with self._lock:
+            for path in self.cache_dir.glob("*/*.png"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,132 @@
+"""
+Single Flight - Deduplicate concurrent identical computations
+
+Several callers (GUI tabs, batch scripts, the 3D text pipeline) can submit
+the same seeded request at the same moment. The result cache only helps
+once the first one has finished, so each of them would run the full
+denoise. A single-flight group runs a computation once per key: callers
+arriving while it is in flight wait for it and receive the same result
+(or the same exception) instead of starting their own.
+"""
+
+import threading
+from typing import Callable, Hashable
+
+
+class _Call:
+    """An in-flight computation and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time and share its result"""
+
+    def __init__(self, poll_interval: float = 0.1):
+        """
+        Initialize the group
+
+        Args:
+            poll_interval: Seconds between wait_callback calls while waiting
+        """
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, wait_callback: Callable = None) -> tuple:
+        """
+        Run fn, or wait for the identical computation already running
+
+        Args:
+            key: Identifies the computation (e.g. a request hash)
+            fn: Called without arguments by the first caller for the key
+            wait_callback: Called every poll_interval while waiting on another
+                caller's computation; raise from it to stop waiting (e.g. on
+                cancellation)
+
+        Returns:
+            Tuple (result, shared); shared is True if another caller ran fn
+        """
+        call, leader = self.join(key)
+        if not leader:
+            return self.wait(call, wait_callback), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.publish(key, call, error=e)
+            raise
+        self.publish(key, call, result)
+        return result, False
+
+    def join(self, key: Hashable) -> tuple:
+        """
+        Start the computation for a key, or join the one already running
+
+        The lower-level form of do() for callers that compute several keys at
+        once (a batched denoise): a leader must publish() its call, also when
+        it fails, and a follower wait()s for it.
+
+        Returns:
+            Tuple (call, leader)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+        return call, leader
+
+    def publish(self, key: Hashable, call: _Call, result=None, error: BaseException = None):
+        """Finish a call started with join() and wake its followers"""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def wait(self, call: _Call, wait_callback: Callable = None):
+        """
+        Wait for a joined call and return its result
+
+        Raises:
+            The leader's exception if its computation failed
+        """
+        while not call.done.wait(self.poll_interval):
+            if wait_callback is not None:
+                wait_callback()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self, key: Hashable = None) -> int:
+        """Number of running computations (0 or 1 for a given key)"""
+        with self._lock:
+            if key is None:
+                return len(self._calls)
+            return int(key in self._calls)
+
+
+_group = None
+_group_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group for image requests"""
+    global _group
+    with _group_lock:
+        if _group is None:
+            _group = SingleFlight()
+        return _group
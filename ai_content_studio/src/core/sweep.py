@@ -0,0 +1,237 @@
+"""
+Parameter Sweep - Plan XY grids of generation settings to share work
+
+A sweep is the cartesian product of a few parameter axes (e.g. seed x
+guidance scale x steps) applied to one base request. Running the cells one
+by one repeats work that does not depend on the varied parameter, so the
+planner groups cells that can share a pipeline call: cells that only differ
+in prompt, negative prompt or seed have the same latent shape, schedule and
+guidance, and are denoised together in micro-batches. Groups using the same
+speed preset run back to back so its scheduler is set up once.
+
+The results are laid out on a labelled contact sheet: the last axis runs
+along the columns, the other axes along the rows.
+"""
+
+import itertools
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Parameters a sweep can vary, as ImageGenerator.generate() keyword arguments
+SWEEP_AXES = (
+    "prompt", "negative_prompt", "seed", "guidance_scale",
+    "num_inference_steps", "preset", "clip_skip", "width", "height",
+)
+
+# Axes that may differ between images of one pipeline call
+BATCHABLE_AXES = ("prompt", "negative_prompt", "seed")
+
+# Contact sheet layout
+LABEL_HEIGHT = 16
+CELL_PADDING = 4
+SHEET_BACKGROUND = (255, 255, 255)
+LABEL_COLOR = (0, 0, 0)
+
+
+class SweepCell:
+    """One combination of axis values in a sweep"""
+
+    def __init__(self, index: int, values: dict, params: dict):
+        """
+        Args:
+            index: Position in grid order (last axis fastest)
+            values: Axis name -> value of this cell
+            params: Complete generation parameters of this cell
+        """
+        self.index = index
+        self.values = values
+        self.params = params
+        self.request = None  # Result-cache / output-store parameters
+        self.image = None
+        self.path = None
+        self.timings = {}
+
+    def label(self, axes: list = None) -> str:
+        """Short 'axis=value' label (for the given axes, default all)"""
+        names = self.values if axes is None else axes
+        return ", ".join(f"{_short_name(name)}={self.values[name]}" for name in names)
+
+    def group_key(self) -> tuple:
+        """Parameters that must be equal for cells to share a pipeline call"""
+        return tuple(
+            (name, self.params[name]) for name in SWEEP_AXES if name not in BATCHABLE_AXES
+        )
+
+
+def _short_name(axis: str) -> str:
+    """Label name of an axis"""
+    return {
+        "guidance_scale": "cfg",
+        "num_inference_steps": "steps",
+        "negative_prompt": "negative",
+    }.get(axis, axis)
+
+
+def plan_sweep(base: dict, axes: dict) -> list:
+    """
+    Expand axes into the cells of a sweep
+
+    Args:
+        base: Parameters shared by every cell (SWEEP_AXES keys)
+        axes: Axis name -> list of values; the order of the dict is the
+            order of the grid
+
+    Returns:
+        List of SweepCell in grid order
+    """
+    unknown = [name for name in axes if name not in SWEEP_AXES]
+    if unknown:
+        raise ValueError(
+            f"Unknown sweep axes: {', '.join(unknown)} (available: {', '.join(SWEEP_AXES)})"
+        )
+    empty = [name for name, values in axes.items() if not values]
+    if empty:
+        raise ValueError(f"Sweep axes without values: {', '.join(empty)}")
+
+    names = list(axes)
+    cells = []
+    for index, combination in enumerate(itertools.product(*(axes[name] for name in names))):
+        values = dict(zip(names, combination))
+        cells.append(SweepCell(index, values, dict(base, **values)))
+    return cells
+
+
+def group_cells(cells: list) -> list:
+    """
+    Group cells that can be denoised in one pipeline call
+
+    Groups keep the order in which they first appear in the grid, except
+    that groups using the same speed preset are run back to back.
+
+    Returns:
+        List of lists of SweepCell
+    """
+    groups = {}
+    for cell in cells:
+        groups.setdefault(cell.group_key(), []).append(cell)
+
+    presets = []
+    for cell in cells:
+        if cell.params.get("preset") not in presets:
+            presets.append(cell.params.get("preset"))
+
+    ordered = list(groups.values())
+    ordered.sort(key=lambda group: presets.index(group[0].params.get("preset")))
+    return ordered
+
+
+def make_contact_sheet(cells: list, axes: dict, cell_size: int = None) -> Image.Image:
+    """
+    Lay out the cell images on a labelled grid
+
+    Args:
+        cells: Cells in grid order, each with an image
+        axes: The sweep axes (the last one becomes the columns)
+        cell_size: Edge length of each thumbnail (default: largest image edge)
+
+    Returns:
+        RGB contact sheet
+    """
+    names = list(axes)
+    column_axis = names[-1]
+    row_axes = names[:-1]
+    num_columns = len(axes[column_axis])
+    num_rows = len(cells) // num_columns
+
+    if cell_size is None:
+        cell_size = max(max(cell.image.size) for cell in cells)
+    font = ImageFont.load_default()
+
+    # Row labels get their own column when there are row axes
+    row_labels = [cells[row * num_columns].label(row_axes) for row in range(num_rows)]
+    draw_probe = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    label_width = 0
+    if row_axes:
+        label_width = max(draw_probe.textlength(label, font=font) for label in row_labels)
+        label_width = int(label_width) + 2 * CELL_PADDING
+
+    pitch = cell_size + CELL_PADDING
+    sheet = Image.new("RGB", (
+        label_width + num_columns * pitch + CELL_PADDING,
+        LABEL_HEIGHT + num_rows * (pitch + LABEL_HEIGHT) + CELL_PADDING,
+    ), SHEET_BACKGROUND)
+    draw = ImageDraw.Draw(sheet)
+
+    for column, value in enumerate(axes[column_axis]):
+        x = label_width + CELL_PADDING + column * pitch
+        draw.text((x, 2), f"{_short_name(column_axis)}={value}", fill=LABEL_COLOR, font=font)
+
+    for row in range(num_rows):
+        y = LABEL_HEIGHT + row * (pitch + LABEL_HEIGHT)
+        if row_axes:
+            draw.text((CELL_PADDING, y + cell_size // 2), row_labels[row], fill=LABEL_COLOR, font=font)
+
+        for column in range(num_columns):
+            cell = cells[row * num_columns + column]
+            x = label_width + CELL_PADDING + column * pitch
+            thumbnail = cell.image.convert("RGB")
+            thumbnail.thumbnail((cell_size, cell_size))
+            sheet.paste(thumbnail, (
+                x + (cell_size - thumbnail.width) // 2,
+                y + CELL_PADDING + (cell_size - thumbnail.height) // 2,
+            ))
+            seconds = cell.timings.get('generate_s')
+            if seconds is not None:
+                draw.text((x, y + CELL_PADDING + cell_size + 2), f"{seconds:.2f}s",
+                          fill=LABEL_COLOR, font=font)
+
+    return sheet
+
+
+class SweepResult:
+    """Images, contact sheet and timings of a finished sweep"""
+
+    def __init__(self, axes: dict, cells: list, contact_sheet: Image.Image = None,
+                 contact_sheet_path=None, timings: dict = None):
+        """
+        Args:
+            axes: The sweep axes
+            cells: SweepCell list in grid order (images, paths and timings filled in)
+            contact_sheet: Labelled grid of all images
+            contact_sheet_path: Where the contact sheet was saved (None if not saved)
+            timings: Whole-sweep durations and counts (encode_s, generate_s,
+                total_s, pipeline_calls, ...)
+        """
+        self.axes = axes
+        self.cells = cells
+        self.contact_sheet = contact_sheet
+        self.contact_sheet_path = contact_sheet_path
+        self.timings = timings or {}
+
+    @property
+    def images(self) -> list:
+        """Cell images in grid order"""
+        return [cell.image for cell in self.cells]
+
+    @property
+    def paths(self) -> list:
+        """Saved cell image paths in grid order"""
+        return [cell.path for cell in self.cells]
+
+    def report(self) -> str:
+        """Per-cell timing table"""
+        lines = []
+        for cell in self.cells:
+            timings = cell.timings
+            if timings.get('cached'):
+                timing = "cached"
+            else:
+                timing = f"{timings.get('generate_s', 0.0):6.2f}s (batch of {timings.get('micro_batch', 1)})"
+            lines.append(f"{cell.label():<50} {timing}")
+        lines.append(
+            f"{len(self.cells)} images in {self.timings.get('pipeline_calls', 0)} pipeline calls, "
+            f"encode {self.timings.get('encode_s', 0.0):.2f}s, "
+            f"total {self.timings.get('total_s', 0.0):.2f}s"
+        )
+        return "\n".join(lines)
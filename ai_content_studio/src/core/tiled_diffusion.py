@@ -0,0 +1,293 @@
+"""
+Tiled Diffusion - Generation above the model's native resolution with bounded memory
+
+Denoising a 2048-4096 px image in one UNet pass needs activation memory
+that grows with the square of the output size. Tiled generation follows
+MultiDiffusion: every step the UNet runs on overlapping latent tiles of the
+model's native size, the per-tile noise predictions are blended with
+feathered weights, and a single scheduler step updates the whole latent.
+The VAE decodes in tiles as well, so peak memory depends on the tile size,
+not the output size.
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Optional
+
+import torch
+
+
+# Fallback native output size per model family, used before the model's
+# config is on disk (see native_size() and snapshot_native_size())
+NATIVE_SIZE = {
+    "sdxl": 1024,
+    "sd": 512,
+}
+
+# Overlap between neighbouring tiles as a fraction of the tile size
+TILE_OVERLAP_FRACTION = 0.25
+
+
+def native_size(pipe) -> int:
+    """Native output size in pixels of a loaded pipeline (UNet sample size x VAE scale)"""
+    return pipe.unet.config.sample_size * pipe.vae_scale_factor
+
+
+def snapshot_native_size(model_dir: Path) -> Optional[int]:
+    """
+    Native output size in pixels from the configs of a model directory
+
+    Reads the same values as native_size() without loading any weights.
+
+    Returns:
+        Size in pixels, or None if the UNet or VAE config is missing
+    """
+    try:
+        with open(Path(model_dir) / "unet" / "config.json", encoding="utf-8") as f:
+            sample_size = json.load(f)["sample_size"]
+        with open(Path(model_dir) / "vae" / "config.json", encoding="utf-8") as f:
+            vae_blocks = len(json.load(f)["block_out_channels"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if isinstance(sample_size, (list, tuple)):
+        sample_size = max(sample_size)
+    return int(sample_size) * 2 ** (vae_blocks - 1)
+
+
+def tile_positions(length: int, tile: int, stride: int) -> list:
+    """
+    Start offsets of tiles covering [0, length) with the given stride
+
+    The last tile is aligned to the end, so every tile has the full size.
+    """
+    if length <= tile:
+        return [0]
+    positions = list(range(0, length - tile, stride))
+    positions.append(length - tile)
+    return positions
+
+
+def blend_weights(height: int, width: int, overlap: int, device=None,
+                  dtype=torch.float32) -> torch.Tensor:
+    """
+    Feathered blending weights for one tile
+
+    Weights ramp linearly up from each edge over the overlap and are 1 in
+    the middle, so overlapping predictions cross-fade without seams.
+
+    Returns:
+        Tensor of shape (1, 1, height, width) with values in (0, 1]
+    """
+    def ramp(size):
+        position = torch.arange(size, device=device, dtype=dtype)
+        distance = torch.minimum(position + 1, size - position)
+        return torch.clamp(distance / (overlap + 1), max=1.0)
+
+    return (ramp(height)[:, None] * ramp(width)[None, :])[None, None]
+
+
+class TiledDiffusion:
+    """MultiDiffusion sampler and tiled VAE decode around a loaded pipeline"""
+
+    def __init__(self, pipe, tile_size: int, overlap: Optional[int] = None, is_sdxl: bool = True):
+        """
+        Initialize the sampler
+
+        Args:
+            pipe: Loaded StableDiffusionPipeline or StableDiffusionXLPipeline
+            tile_size: Tile edge length in pixels (usually the native size)
+            overlap: Tile overlap in pixels (default: TILE_OVERLAP_FRACTION of the tile)
+            is_sdxl: Whether the UNet expects SDXL micro-conditioning
+        """
+        self.pipe = pipe
+        self.is_sdxl = is_sdxl
+        self.scale = pipe.vae_scale_factor
+        self.tile = max(1, tile_size // self.scale)
+        if overlap is None:
+            overlap = int(tile_size * TILE_OVERLAP_FRACTION)
+        self.overlap = min(max(0, overlap // self.scale), self.tile - 1)
+
+    def tiles(self, latent_height: int, latent_width: int) -> list:
+        """
+        Tile windows covering a latent
+
+        Returns:
+            List of (top, left, height, width) in latent pixels
+        """
+        tile_h = min(self.tile, latent_height)
+        tile_w = min(self.tile, latent_width)
+        stride = self.tile - self.overlap
+        return [
+            (top, left, tile_h, tile_w)
+            for top in tile_positions(latent_height, tile_h, stride)
+            for left in tile_positions(latent_width, tile_w, stride)
+        ]
+
+    def __call__(
+        self,
+        prompt_embeds: torch.Tensor,
+        negative_prompt_embeds: torch.Tensor,
+        pooled_prompt_embeds: torch.Tensor = None,
+        negative_pooled_prompt_embeds: torch.Tensor = None,
+        num_inference_steps: int = 50,
+        guidance_scale: float = 7.5,
+        width: int = 2048,
+        height: int = 2048,
+        generator=None,
+        callback_on_step_end=None,
+        callback_on_step_end_tensor_inputs: list = None,
+        output_type: str = "pil",
+        guidance_at=None,
+    ) -> list:
+        """
+        Generate images tile by tile
+
+        Takes the same embedding and callback arguments as the pipeline call.
+        guidance_at, if given, is called as guidance_at(step, num_steps) and
+        returns the guidance scale of each step (steps at 1.0 or less skip
+        the unconditional pass).
+
+        Returns:
+            List of PIL images (the latent batch with output_type="latent")
+        """
+        latents = self.denoise(
+            prompt_embeds, negative_prompt_embeds, pooled_prompt_embeds,
+            negative_pooled_prompt_embeds, num_inference_steps, guidance_scale,
+            width, height, generator, callback_on_step_end, guidance_at
+        )
+        if output_type == "latent":
+            return latents
+        return self.decode(latents)
+
+    def denoise(self, prompt_embeds, negative_prompt_embeds, pooled_prompt_embeds,
+                negative_pooled_prompt_embeds, num_inference_steps: int,
+                guidance_scale: float, width: int, height: int, generator=None,
+                callback_on_step_end=None, guidance_at=None) -> torch.Tensor:
+        """Run the blended tile denoising loop and return the final latents"""
+        from diffusers.utils.torch_utils import randn_tensor
+
+        pipe = self.pipe
+        unet = pipe.unet
+        device = pipe._execution_device
+        batch_size = prompt_embeds.shape[0]
+
+        # Private scheduler: the pipeline's instance is shared between generators
+        scheduler = copy.deepcopy(pipe.scheduler)
+        scheduler.set_timesteps(num_inference_steps, device=device)
+
+        latent_h, latent_w = height // self.scale, width // self.scale
+        latents = randn_tensor(
+            (batch_size, unet.config.in_channels, latent_h, latent_w),
+            generator=generator, device=device, dtype=prompt_embeds.dtype
+        ) * scheduler.init_noise_sigma
+
+        # Conditional-only inputs, plus the doubled batch while guidance is on
+        cond_inputs = (prompt_embeds, pooled_prompt_embeds)
+        cfg_inputs = cond_inputs
+        if guidance_scale > 1.0:
+            cfg_inputs = (
+                torch.cat([negative_prompt_embeds, prompt_embeds]),
+                torch.cat([negative_pooled_prompt_embeds, pooled_prompt_embeds]) if self.is_sdxl else None,
+            )
+
+        tiles = self.tiles(latent_h, latent_w)
+        print(f"Tiled generation: {len(tiles)} tiles of "
+              f"{tiles[0][2] * self.scale}x{tiles[0][3] * self.scale} for {width}x{height}")
+
+        extra_step_kwargs = pipe.prepare_extra_step_kwargs(generator, 0.0)
+        weight_sum = torch.zeros((1, 1, latent_h, latent_w), device=device, dtype=torch.float32)
+        for top, left, h, w in tiles:
+            weight_sum[:, :, top:top + h, left:left + w] += blend_weights(
+                h, w, self.overlap, device=device
+            )
+
+        for i, t in enumerate(scheduler.timesteps):
+            scale = guidance_scale if guidance_at is None else guidance_at(i, num_inference_steps)
+            do_cfg = scale > 1.0
+            embeds, text_embeds = cfg_inputs if do_cfg else cond_inputs
+            model_input = torch.cat([latents] * 2) if do_cfg else latents
+            model_input = scheduler.scale_model_input(model_input, t)
+            noise_pred = torch.zeros_like(latents, dtype=torch.float32)
+
+            for top, left, h, w in tiles:
+                added_cond_kwargs = None
+                if self.is_sdxl:
+                    added_cond_kwargs = {
+                        'text_embeds': text_embeds,
+                        'time_ids': self._time_ids(
+                            width, height, top, left, h, w, embeds.shape[0], embeds.dtype, device
+                        ),
+                    }
+
+                tile_pred = unet(
+                    model_input[:, :, top:top + h, left:left + w],
+                    t,
+                    encoder_hidden_states=embeds,
+                    added_cond_kwargs=added_cond_kwargs,
+                    return_dict=False,
+                )[0]
+                if do_cfg:
+                    uncond, text = tile_pred.chunk(2)
+                    tile_pred = uncond + scale * (text - uncond)
+
+                weights = blend_weights(h, w, self.overlap, device=device)
+                noise_pred[:, :, top:top + h, left:left + w] += tile_pred.float() * weights
+
+            noise_pred = (noise_pred / weight_sum).to(latents.dtype)
+            latents = scheduler.step(noise_pred, t, latents, **extra_step_kwargs, return_dict=False)[0]
+
+            if callback_on_step_end is not None:
+                outputs = callback_on_step_end(pipe, i, t, {'latents': latents})
+                latents = outputs.pop('latents', latents)
+
+        return latents
+
+    def _time_ids(self, width: int, height: int, top: int, left: int, h: int, w: int,
+                  batch_size: int, dtype, device) -> torch.Tensor:
+        """
+        SDXL micro-conditioning for one tile
+
+        The tile is described as a crop of the full-size image: original size
+        is the output size and the crop offset is the tile position, so every
+        tile is conditioned as part of one large picture.
+        """
+        time_ids = [height, width, top * self.scale, left * self.scale, h * self.scale, w * self.scale]
+        return torch.tensor([time_ids], dtype=dtype, device=device).repeat(batch_size, 1)
+
+    def decode(self, latents: torch.Tensor) -> list:
+        """
+        Decode latents with the VAE one tile at a time
+
+        Returns:
+            List of PIL images
+        """
+        vae = self.pipe.vae
+
+        # decode() runs the offload hook through a decorator; tiled_decode() does not
+        hook = getattr(vae, "_hf_hook", None)
+        if hook is not None and hasattr(hook, "pre_forward"):
+            hook.pre_forward(vae)
+
+        # The SDXL VAE overflows in fp16, so decode in fp32 like the pipeline does
+        needs_upcast = vae.dtype == torch.float16 and getattr(vae.config, "force_upcast", False)
+        if needs_upcast:
+            vae.to(torch.float32)
+
+        try:
+            latents = latents.to(vae.dtype)
+            latents_mean = getattr(vae.config, "latents_mean", None)
+            latents_std = getattr(vae.config, "latents_std", None)
+            if latents_mean is not None and latents_std is not None:
+                mean = torch.tensor(latents_mean).view(1, -1, 1, 1).to(latents)
+                std = torch.tensor(latents_std).view(1, -1, 1, 1).to(latents)
+                latents = latents * std / vae.config.scaling_factor + mean
+            else:
+                latents = latents / vae.config.scaling_factor
+
+            image = vae.tiled_decode(latents, return_dict=False)[0]
+        finally:
+            if needs_upcast:
+                vae.to(torch.float16)
+
+        return self.pipe.image_processor.postprocess(image, output_type="pil")
@@ -0,0 +1,163 @@
+"""
+Tiny VAE - Fast approximate decode for drafts and live previews
+
+The full SDXL VAE decoder is one of the slowest and most memory-hungry
+steps of a CPU generation at 1024x1024. TAESD / TAESDXL are distilled
+autoencoders that decode the same latents in a fraction of the time and
+memory, with slightly softer detail. Drafts are decoded with them, and
+their latents are kept in memory so a chosen draft can later be decoded
+with the full VAE without denoising again.
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable, Optional
+
+import torch
+
+
+# Distilled decoders matching each model family's latent space
+TINY_VAE_MODELS = {
+    "sdxl": "madebyollin/taesdxl",
+    "sd": "madebyollin/taesd",
+}
+
+
+def full_decode(pipe, latents: torch.Tensor) -> list:
+    """
+    Decode latents with the pipeline's VAE, exactly as the pipeline call does
+
+    Args:
+        pipe: Loaded diffusers pipeline (provides vae and image_processor)
+        latents: Scaled latents as returned with output_type="latent"
+
+    Returns:
+        List of PIL images
+    """
+    vae = pipe.vae
+    device = getattr(pipe, "_execution_device", vae.device)
+
+    # The SDXL VAE overflows in float16, so it decodes in float32 like the pipelines do
+    dtype = vae.dtype
+    upcast = dtype == torch.float16 and getattr(vae.config, "force_upcast", False)
+    if upcast:
+        vae.to(dtype=torch.float32)
+    try:
+        latents = latents.to(device=device, dtype=vae.dtype)
+        latents_mean = getattr(vae.config, "latents_mean", None)
+        latents_std = getattr(vae.config, "latents_std", None)
+        if latents_mean is not None and latents_std is not None:
+            channels = latents.shape[1]
+            latents_mean = torch.tensor(latents_mean).view(1, channels, 1, 1).to(latents)
+            latents_std = torch.tensor(latents_std).view(1, channels, 1, 1).to(latents)
+            latents = latents * latents_std / vae.config.scaling_factor + latents_mean
+        else:
+            latents = latents / vae.config.scaling_factor
+        image = vae.decode(latents, return_dict=False)[0]
+    finally:
+        if upcast:
+            vae.to(dtype=dtype)
+
+    watermark = getattr(pipe, "watermark", None)
+    if watermark is not None:
+        image = watermark.apply_watermark(image)
+    return pipe.image_processor.postprocess(image, output_type="pil")
+
+
+def tiny_decode(vae, pipe, latents: torch.Tensor) -> list:
+    """
+    Decode latents with a tiny autoencoder
+
+    TAESD decodes the scaled latents the UNet works with directly (its
+    scaling factor is 1.0), so no mean/std handling or upcast is needed.
+
+    Args:
+        vae: Loaded AutoencoderTiny
+        pipe: Pipeline whose image_processor post-processes the output
+        latents: Scaled latents as returned with output_type="latent"
+
+    Returns:
+        List of PIL images
+    """
+    latents = latents.to(device=vae.device, dtype=vae.dtype)
+    image = vae.decode(latents / vae.config.scaling_factor, return_dict=False)[0]
+    return pipe.image_processor.postprocess(image.float(), output_type="pil")
+
+
+class DraftLatentStore:
+    """In-memory LRU of the latents behind tiny-VAE drafts"""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Initialize the store
+
+        Args:
+            max_entries: Maximum number of drafts kept (a 1024x1024 SDXL draft
+                holds 256 KB of float32 latents)
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, latents: torch.Tensor, params: dict):
+        """
+        Keep one draft's latents
+
+        Args:
+            key: Request hash of the draft (shared by identical requests)
+            latents: Latents of a single image, shape (1, C, H, W)
+            params: Request parameters of the draft
+        """
+        latents = latents.detach().to("cpu", torch.float32).clone()
+        with self._lock:
+            self._entries[key] = (latents, dict(params))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                for path in [p for p, k in self._paths.items() if k == evicted]:
+                    del self._paths[path]
+
+    def link(self, path: Path, key: Hashable):
+        """Record that the draft with this key was saved to path"""
+        with self._lock:
+            if key in self._entries:
+                self._paths[str(Path(path).resolve())] = key
+
+    def get(self, path: Path) -> Optional[tuple]:
+        """
+        Look up the draft saved at path
+
+        Returns:
+            Tuple (latents, params), or None if the draft is not kept
+        """
+        with self._lock:
+            key = self._paths.get(str(Path(path).resolve()))
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def clear(self):
+        """Drop every kept draft"""
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_draft_latents() -> DraftLatentStore:
+    """Get the process-wide draft latent store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DraftLatentStore()
+        return _store
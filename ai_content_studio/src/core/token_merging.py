@@ -0,0 +1,270 @@
+"""
+Token Merging - Fewer self-attention tokens in the UNet's high-resolution blocks
+
+At 1024x1024 the first SDXL attention level holds 64x64 = 4096 latent
+tokens, and self-attention cost grows with the square of that count.
+Neighbouring tokens are often near duplicates, so token merging (ToMe for
+Stable Diffusion) averages the most similar ones before each self-attention
+call and copies the result back to every merged position afterwards: the
+attention runs on (1 - ratio) of the tokens and the rest of the block is
+unchanged.
+
+The patch consists of removable forward hooks on the UNet and its attn1
+modules. No weights are touched, so it can be applied and removed on a
+loaded pipeline at any time.
+"""
+
+import math
+from contextlib import contextmanager
+
+import torch
+
+
+# Merge window: one destination token per stride x stride patch of the latent
+TOKEN_MERGING_STRIDE = 2
+
+# The random destination choice is reseeded from the timestep of every UNet
+# call, so seeded generations stay reproducible
+TOKEN_MERGING_SEED = 0
+
+
+def bipartite_soft_matching(metric: torch.Tensor, width: int, height: int, stride: int,
+                            num_merged: int, generator: torch.Generator = None) -> tuple:
+    """
+    Plan merging num_merged tokens of a (B, N, C) token grid
+
+    One token per stride x stride window is a destination (chosen at random
+    with the generator, the top-left one without); every other token is a
+    source that may be merged into its most similar destination. The
+    num_merged sources with the highest cosine similarity are merged.
+
+    Args:
+        metric: Tokens to compare, shape (B, N, C) with N = width * height
+        width: Token grid width
+        height: Token grid height
+        stride: Merge window edge length
+        num_merged: Number of tokens to remove
+        generator: Random generator for the destination choice
+
+    Returns:
+        Tuple (merge, unmerge) of functions mapping (B, N, C) -> (B, N - r, C)
+        and back
+    """
+    batch, tokens, _ = metric.shape
+    device = metric.device
+    if num_merged <= 0:
+        return (lambda x: x), (lambda x: x)
+
+    with torch.no_grad():
+        windows_y, windows_x = height // stride, width // stride
+        if generator is None:
+            choice = torch.zeros(windows_y, windows_x, 1, dtype=torch.int64)
+        else:
+            choice = torch.randint(stride * stride, (windows_y, windows_x, 1), generator=generator)
+        # -1 marks each window's destination; tokens outside whole windows stay sources
+        marks = torch.zeros(windows_y, windows_x, stride * stride, dtype=torch.int64)
+        marks.scatter_(2, choice, -1)
+        marks = marks.view(windows_y, windows_x, stride, stride).transpose(1, 2)
+        grid = torch.zeros(height, width, dtype=torch.int64)
+        grid[:windows_y * stride, :windows_x * stride] = marks.reshape(windows_y * stride, windows_x * stride)
+
+        # Destinations first, then sources
+        order = grid.reshape(1, -1, 1).argsort(dim=1, stable=True).to(device)
+        num_dst = windows_y * windows_x
+        src_idx = order[:, num_dst:, :]
+        dst_idx = order[:, :num_dst, :]
+        num_src = tokens - num_dst
+        num_merged = min(num_merged, num_src)
+
+        def split(x):
+            channels = x.shape[-1]
+            return (torch.gather(x, 1, src_idx.expand(x.shape[0], num_src, channels)),
+                    torch.gather(x, 1, dst_idx.expand(x.shape[0], num_dst, channels)))
+
+        metric = metric / metric.norm(dim=-1, keepdim=True)
+        src, dst = split(metric)
+        scores = src @ dst.transpose(-1, -2)
+
+        # Merge the sources closest to a destination
+        best_score, best_dst = scores.max(dim=-1)
+        ranked = best_score.argsort(dim=-1, descending=True)[..., None]
+        kept = ranked[:, num_merged:, :]
+        merged = ranked[:, :num_merged, :]
+        merged_dst = torch.gather(best_dst[..., None], 1, merged)
+
+    def merge(x: torch.Tensor) -> torch.Tensor:
+        src, dst = split(x)
+        channels = x.shape[-1]
+        kept_src = torch.gather(src, 1, kept.expand(batch, num_src - num_merged, channels))
+        merged_src = torch.gather(src, 1, merged.expand(batch, num_merged, channels))
+        dst = dst.scatter_reduce(1, merged_dst.expand(batch, num_merged, channels), merged_src,
+                                 reduce="mean")
+        return torch.cat([kept_src, dst], dim=1)
+
+    def unmerge(x: torch.Tensor) -> torch.Tensor:
+        num_kept = kept.shape[1]
+        channels = x.shape[-1]
+        kept_src, dst = x[:, :num_kept, :], x[:, num_kept:, :]
+        merged_src = torch.gather(dst, 1, merged_dst.expand(batch, num_merged, channels))
+
+        out = torch.zeros(batch, tokens, channels, device=x.device, dtype=x.dtype)
+        out.scatter_(1, dst_idx.expand(batch, num_dst, channels), dst)
+        src_positions = src_idx.expand(batch, num_src, 1)
+        out.scatter_(1, torch.gather(src_positions, 1, kept).expand(batch, num_kept, channels), kept_src)
+        out.scatter_(1, torch.gather(src_positions, 1, merged).expand(batch, num_merged, channels), merged_src)
+        return out
+
+    return merge, unmerge
+
+
+def attention_downsample(unet) -> int:
+    """Downsampling factor of the UNet's highest-resolution attention level"""
+    for level, block_type in enumerate(unet.config.down_block_types):
+        if "Attn" in block_type:
+            return 2 ** level
+    return 1
+
+
+class TokenMerging:
+    """Reversible token-merging patch on a loaded UNet"""
+
+    def __init__(self, ratio: float = 0.5, max_downsample: int = None,
+                 stride: int = TOKEN_MERGING_STRIDE, seed: int = TOKEN_MERGING_SEED):
+        """
+        Initialize the patch
+
+        Args:
+            ratio: Fraction of the tokens removed before each patched
+                self-attention (at most 1 - 1/stride^2, i.e. 0.75)
+            max_downsample: Patch attention levels up to this downsampling
+                factor (default: only the highest-resolution attention level)
+            stride: Merge window edge length
+            seed: Seed of the destination choice (None = top-left token of each window)
+        """
+        # Only the non-destination tokens of each window can be merged
+        max_ratio = 1.0 - 1.0 / (stride * stride)
+        if not 0.0 <= ratio <= max_ratio:
+            raise ValueError(f"Token merging ratio must be in [0, {max_ratio:g}], got {ratio}")
+        self.ratio = float(ratio)
+        self.max_downsample = max_downsample
+        self.stride = stride
+        self.seed = seed
+        self.unet = None
+        self._handles = []
+        self._latent_size = None
+        self._generator = None
+        self._unmerge = {}
+
+    @property
+    def active(self) -> bool:
+        """Whether the patch is applied to a UNet"""
+        return self.unet is not None
+
+    def apply(self, unet) -> "TokenMerging":
+        """
+        Hook every self-attention (attn1) of the UNet's transformer blocks
+
+        A patch already on the UNet is removed first.
+
+        Returns:
+            self
+        """
+        previous = getattr(unet, "_token_merging", None)
+        if previous is not None:
+            previous.remove()
+        if self.active:
+            self.remove()
+
+        max_downsample = self.max_downsample or attention_downsample(unet)
+        self._handles.append(unet.register_forward_pre_hook(self._on_unet, with_kwargs=True))
+        for module in unet.modules():
+            attn = getattr(module, "attn1", None)
+            if attn is None or getattr(module, "only_cross_attention", False):
+                continue
+            self._handles.append(attn.register_forward_pre_hook(
+                lambda attn, args, kwargs, limit=max_downsample: self._on_attention(attn, args, kwargs, limit),
+                with_kwargs=True
+            ))
+            self._handles.append(attn.register_forward_hook(self._on_attention_output))
+
+        self.unet = unet
+        unet._token_merging = self
+        return self
+
+    def remove(self):
+        """Remove every hook; the UNet behaves exactly as before"""
+        for handle in self._handles:
+            handle.remove()
+        self._handles.clear()
+        self._unmerge.clear()
+        if self.unet is not None and getattr(self.unet, "_token_merging", None) is self:
+            del self.unet._token_merging
+        self.unet = None
+
+    def _on_unet(self, unet, args, kwargs):
+        """Remember the latent size of the current UNet call and reseed for its timestep"""
+        sample = args[0] if args else kwargs["sample"]
+        self._latent_size = sample.shape[-2:]
+        if self.seed is not None:
+            timestep = args[1] if len(args) > 1 else kwargs["timestep"]
+            timestep = int(torch.as_tensor(timestep).flatten()[0])
+            self._generator = torch.Generator().manual_seed(self.seed + timestep)
+
+    def _on_attention(self, attn, args, kwargs, max_downsample: int):
+        """Merge the input tokens of a self-attention call"""
+        if not args or self._latent_size is None or kwargs.get("attention_mask") is not None:
+            return None
+        hidden_states = args[0]
+        if hidden_states.ndim != 3:
+            return None
+
+        latent_h, latent_w = self._latent_size
+        tokens = hidden_states.shape[1]
+        downsample = int(math.ceil(math.sqrt(latent_h * latent_w // tokens)))
+        if downsample > max_downsample:
+            return None
+        width = int(math.ceil(latent_w / downsample))
+        height = int(math.ceil(latent_h / downsample))
+        if width * height != tokens:
+            return None
+
+        merge, unmerge = bipartite_soft_matching(
+            hidden_states, width, height, self.stride, int(tokens * self.ratio), self._generator
+        )
+        self._unmerge[attn] = unmerge
+        return (merge(hidden_states),) + tuple(args[1:]), kwargs
+
+    def _on_attention_output(self, attn, args, output):
+        """Copy the attention output back to every merged token"""
+        unmerge = self._unmerge.pop(attn, None)
+        return output if unmerge is None else unmerge(output)
+
+    def __repr__(self) -> str:
+        return f"TokenMerging(ratio={self.ratio}, active={self.active})"
+
+
+def is_token_merged(unet) -> bool:
+    """Whether a token-merging patch is applied to the UNet"""
+    return getattr(unet, "_token_merging", None) is not None
+
+
+@contextmanager
+def token_merging(unets, ratio: float, max_downsample: int = None):
+    """
+    Apply token merging to UNets for the duration of a block
+
+    Args:
+        unets: UNets (or Nones, which are skipped) to patch
+        ratio: Fraction of self-attention tokens to merge (0 = no patch)
+        max_downsample: See TokenMerging
+    """
+    patches = []
+    try:
+        if ratio > 0:
+            for unet in unets:
+                if unet is not None:
+                    patches.append(TokenMerging(ratio, max_downsample).apply(unet))
+        yield patches
+    finally:
+        for patch in patches:
+            patch.remove()
@@ -8,24 +8,29 @@ Supports multiple TTS engines:
 
 from gtts import gTTS
 from pathlib import Path
-import datetime
+import time
 from typing import Optional, Literal
 
+from .output_store import new_asset_id
+
 
 class TTSGenerator:
     """Generate speech from text using multiple high-quality TTS engines"""
 
-    def __init__(self, cache_dir: Path = None, engine: str = "edge"):
+    def __init__(self, cache_dir: Path = None, engine: str = "edge", output_store=None):
         """
         Initialize the TTS generator
 
         Args:
             cache_dir: Directory to cache models
             engine: TTS engine to use ('edge', 'gtts', 'pyttsx3')
+            output_store: Optional OutputStore that records generated audio
         """
         self.cache_dir = cache_dir
         self.engine = engine
+        self.output_store = output_store
         self.pyttsx3_engine = None
+        self.pyttsx3_base_rate = None
         self.available_voices = []
 
         print(f"TTS Generator initialized with engine: {engine}")
@@ -43,6 +48,7 @@ class TTSGenerator:
         try:
             import pyttsx3
             self.pyttsx3_engine = pyttsx3.init()
+            self.pyttsx3_base_rate = self.pyttsx3_engine.getProperty('rate')
 
             # Get available voices
             voices = self.pyttsx3_engine.getProperty('voices')
@@ -98,25 +104,50 @@ class TTSGenerator:
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Unique ID shared by the filename and the output store entry
+        asset_id = new_asset_id()
+        start = time.perf_counter()
+
         # Route to appropriate engine
         if self.engine == "edge":
-            return self._generate_edge_tts(text, language, speed, output_format, output_dir, voice)
+            output_path = self._generate_edge_tts(text, language, speed, output_format, output_dir, voice, asset_id)
         elif self.engine == "pyttsx3":
-            return self._generate_pyttsx3(text, speed, output_format, output_dir, voice)
+            output_path = self._generate_pyttsx3(text, speed, output_format, output_dir, voice, asset_id)
         else:  # gtts
-            return self._generate_gtts(text, language, speed, output_format, output_dir)
+            output_path = self._generate_gtts(text, language, speed, output_format, output_dir, asset_id)
+
+        self._record_output(asset_id, output_path, {
+            'engine': self.engine,
+            'text': text,
+            'language': language,
+            'speed': speed,
+            'voice': voice,
+            'output_format': output_format,
+        }, {'generate_s': time.perf_counter() - start})
+
+        return output_path
+
+    def _record_output(self, asset_id: str, output_path: Path, params: dict, timings: dict):
+        """Add generated audio to the output store (if one is configured)"""
+        if self.output_store is None:
+            return
+        try:
+            self.output_store.record(
+                "audio", output_path, params=params, timings=timings, asset_id=asset_id
+            )
+        except Exception as e:
+            print(f"Could not record audio in output store: {e}")
 
     def _generate_edge_tts(
         self, text: str, language: str, speed: float,
-        output_format: str, output_dir: Path, voice: Optional[str]
+        output_format: str, output_dir: Path, voice: Optional[str], asset_id: str
     ) -> Path:
         """Generate speech using Microsoft Edge TTS (high quality)"""
         try:
             import edge_tts
             import asyncio
 
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"tts_edge_{timestamp}.mp3"
+            filename = f"tts_edge_{asset_id}.mp3"
             output_path = output_dir / filename
 
             # Voice mapping for Edge TTS
@@ -161,22 +192,21 @@ class TTSGenerator:
         except ImportError:
             print("Edge-TTS not installed. Install with: pip install edge-tts")
             print("Falling back to gTTS...")
-            return self._generate_gtts(text, language, speed, output_format, output_dir)
+            return self._generate_gtts(text, language, speed, output_format, output_dir, asset_id)
         except Exception as e:
             print(f"Error with Edge-TTS: {e}")
             print("Falling back to gTTS...")
-            return self._generate_gtts(text, language, speed, output_format, output_dir)
+            return self._generate_gtts(text, language, speed, output_format, output_dir, asset_id)
 
     def _generate_pyttsx3(
         self, text: str, speed: float, output_format: str,
-        output_dir: Path, voice: Optional[str]
+        output_dir: Path, voice: Optional[str], asset_id: str
     ) -> Path:
         """Generate speech using pyttsx3 (offline)"""
         if self.pyttsx3_engine is None:
             raise RuntimeError("pyttsx3 engine not available")
 
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"tts_pyttsx3_{timestamp}.{output_format}"
+        filename = f"tts_pyttsx3_{asset_id}.{output_format}"
         output_path = output_dir / filename
 
         # Set voice if specified
@@ -187,9 +217,9 @@ class TTSGenerator:
                     print(f"Using voice: {vname}")
                     break
 
-        # Set speech rate
-        rate = self.pyttsx3_engine.getProperty('rate')
-        self.pyttsx3_engine.setProperty('rate', int(rate * speed))
+        # Set speech rate (relative to the engine default, since the generator
+        # is reused across requests)
+        self.pyttsx3_engine.setProperty('rate', int(self.pyttsx3_base_rate * speed))
 
         # Generate
         self.pyttsx3_engine.save_to_file(text, str(output_path))
@@ -200,11 +230,10 @@ class TTSGenerator:
 
     def _generate_gtts(
         self, text: str, language: str, speed: float,
-        output_format: str, output_dir: Path
+        output_format: str, output_dir: Path, asset_id: str
     ) -> Path:
         """Generate speech using Google TTS (simple, online)"""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"tts_gtts_{timestamp}.mp3"
+        filename = f"tts_gtts_{asset_id}.mp3"
         output_path = output_dir / filename
 
         # Map language codes
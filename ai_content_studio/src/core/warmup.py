@@ -0,0 +1,143 @@
+"""
+Model Warm-up - Load the default image model in the background at startup
+
+The first generation after launch used to pay for the full pipeline load
+plus first-run kernel selection and allocator growth. The warm-up service
+loads the configured default model on a background thread once the window
+is up and runs one small denoising step, so the first click starts warm.
+
+The pipeline lands in the shared model registry, so a generation requested
+while the warm-up is loading waits on that same load instead of starting a
+second one. wait() additionally keeps a generation from sharing the
+pipeline with the dummy step.
+"""
+
+import threading
+import time
+from typing import Callable
+
+
+COLD = "cold"
+WARMING = "warming"
+WARM = "warm"
+
+# The dummy step runs at this fraction of the native size (at least 64 px)
+WARMUP_SIZE_FRACTION = 0.25
+WARMUP_STEPS = 1
+
+
+class WarmupService:
+    """Background load and dummy denoise of one image generator"""
+
+    def __init__(self):
+        self.state = COLD
+        self.model_name = None
+        self.error = None
+        self.duration_s = None
+        self._done = threading.Event()
+        self._done.set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_listener(self, callback: Callable):
+        """
+        Register a state listener
+
+        Args:
+            callback: Called as callback(state, model_name) from the warm-up
+                thread whenever the state changes
+        """
+        self._listeners.append(callback)
+
+    def start(self, generator) -> bool:
+        """
+        Warm up a generator on a background thread
+
+        Args:
+            generator: ImageGenerator configured like the one the first
+                generation will use (same registry key)
+
+        Returns:
+            False if a warm-up is already running
+        """
+        with self._lock:
+            if self.state == WARMING:
+                return False
+            self._done.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(generator,), name="model-warmup", daemon=True
+            )
+            self._set_state(WARMING, generator.model_name)
+        self._thread.start()
+        return True
+
+    def wait(self, model_name: str = None, timeout: float = None) -> bool:
+        """
+        Block while a warm-up is running
+
+        Args:
+            model_name: Only wait if this model is the one warming up (None = any)
+            timeout: Max seconds to wait (None = until done)
+
+        Returns:
+            True if no warm-up of the model is running any more
+        """
+        if model_name is not None and model_name != self.model_name:
+            return True
+        if not self._done.is_set():
+            print(f"Waiting for model warm-up to finish: {self.model_name}")
+        return self._done.wait(timeout)
+
+    @staticmethod
+    def warmup_size(generator) -> int:
+        """Edge length in pixels of the dummy denoise step"""
+        return max(64, int(generator.tile_size * WARMUP_SIZE_FRACTION) // 64 * 64)
+
+    def _run(self, generator):
+        """Load the pipeline and run one small denoise step"""
+        start = time.perf_counter()
+        try:
+            print(f"Warming up {generator.model_name} in the background...")
+            generator.load_model()
+            size = self.warmup_size(generator)
+            generator._run_pipeline(
+                prompts=[""], negative_prompts=[""], seeds=[0],
+                num_inference_steps=WARMUP_STEPS, guidance_scale=7.0,
+                width=size, height=size, tiled=False,
+            )
+            self.duration_s = time.perf_counter() - start
+            print(f"Model warm-up finished in {self.duration_s:.1f}s")
+            self.error = None
+            state = WARM
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+            self.error = str(e)
+            state = COLD
+
+        with self._lock:
+            self._set_state(state, generator.model_name)
+        self._done.set()
+
+    def _set_state(self, state: str, model_name: str):
+        """Update the state and notify listeners"""
+        self.state = state
+        self.model_name = model_name
+        for callback in list(self._listeners):
+            try:
+                callback(state, model_name)
+            except Exception as e:
+                print(f"Error in warm-up listener: {e}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_warmup_service() -> WarmupService:
+    """Get the process-wide warm-up service"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WarmupService()
+        return _service
@@ -4,9 +4,9 @@ Main Window - Primary application interface with tabbed layout
 
 from PyQt6.QtWidgets import (
     QMainWindow, QTabWidget, QWidget, QVBoxLayout,
-    QStatusBar, QMenuBar, QMenu, QMessageBox
+    QStatusBar, QMenuBar, QMenu, QMessageBox, QLabel
 )
-from PyQt6.QtCore import Qt, QSettings
+from PyQt6.QtCore import Qt, QSettings, pyqtSignal
 from PyQt6.QtGui import QAction
 from pathlib import Path
 import yaml
@@ -15,11 +15,17 @@ from gui.tabs.image_generation_tab import ImageGenerationTab
 from gui.tabs.model_3d_generation_tab import Model3DGenerationTab
 from gui.tabs.tts_tab import TTSTab
 from gui.tabs.settings_tab import SettingsTab
+from core.model_registry import get_registry
+from core.model_manifest import get_model_manifest
+from core.warmup import get_warmup_service, COLD, WARMING, WARM
 
 
 class MainWindow(QMainWindow):
     """Main application window with tabbed interface"""
 
+    # Emitted from the warm-up thread; delivered on the GUI thread
+    warmup_state_changed = pyqtSignal(str, str)  # state, model_name
+
     def __init__(self, base_dir: Path):
         super().__init__()
         self.base_dir = base_dir
@@ -27,6 +33,8 @@ class MainWindow(QMainWindow):
 
         # Load configuration
         self.config = self.load_config()
+        get_registry().configure_from_config(self.config)
+        get_model_manifest().configure_from_config(self.config, self.base_dir)
 
         self.init_ui()
         self.restore_geometry()
@@ -94,11 +102,51 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
 
+        # Model warm-up state (cold/warming/warm)
+        self.warmup_label = QLabel()
+        self.status_bar.addPermanentWidget(self.warmup_label)
+        self.warmup_state_changed.connect(self.on_warmup_state_changed)
+        get_warmup_service().add_listener(self.warmup_state_changed.emit)
+        self.on_warmup_state_changed(get_warmup_service().state, "")
+
         # Connect signals
         self.image_tab.status_message.connect(self.status_bar.showMessage)
         self.model_3d_tab.status_message.connect(self.status_bar.showMessage)
         self.tts_tab.status_message.connect(self.status_bar.showMessage)
 
+    def start_warmup(self):
+        """Load the default image model in the background (models.stable_diffusion.warmup)"""
+        sd_config = self.config.get('models', {}).get('stable_diffusion', {})
+        if not sd_config.get('warmup', False):
+            return False
+
+        from core.image_generator import ImageGenerator
+        from core.cpu_profile import CPUInferenceProfile
+
+        # Same settings as the image tab's worker, so the registry key matches
+        hardware_config = self.config.get('hardware', {})
+        generator = ImageGenerator(
+            model_name=sd_config.get('default_model', "stabilityai/stable-diffusion-xl-base-1.0"),
+            cache_dir=self.base_dir / "output" / "models" / "stable_diffusion",
+            use_refiner=self.image_tab.refiner_checkbox.isChecked(),
+            cpu_profile=CPUInferenceProfile.from_config(hardware_config),
+            hardware_config=hardware_config
+        )
+        return get_warmup_service().start(generator)
+
+    def on_warmup_state_changed(self, state, model_name):
+        """Show the model warm-up state in the status bar"""
+        labels = {
+            COLD: "Model: cold",
+            WARMING: "Model: warming up...",
+            WARM: "Model: warm",
+        }
+        self.warmup_label.setText(labels.get(state, f"Model: {state}"))
+        tooltip = model_name or "Loads on first generation"
+        if state == COLD and get_warmup_service().error:
+            tooltip = f"Warm-up failed: {get_warmup_service().error}"
+        self.warmup_label.setToolTip(tooltip)
+
     def create_menu_bar(self):
         """Create application menu bar"""
         menubar = self.menuBar()
@@ -11,6 +11,18 @@ from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QPixmap, QImage
 from pathlib import Path
 import datetime
+import threading
+
+from core.result_cache import ResultCache
+from core.image_writer import SaveOptions
+from core.output_store import OutputStore
+from core.guidance import GuidanceSchedule
+
+
+PREVIEW_INTERVAL = 5  # Steps between live latent previews
+
+# Speed presets (see SPEED_PRESETS in core.image_generator); "Custom" uses the Steps box
+SPEED_PRESET_CHOICES = ["Custom", "Draft", "Balanced", "Final"]
 
 
 class ImageGenerationWorker(QThread):
@@ -18,9 +30,15 @@ class ImageGenerationWorker(QThread):
     finished = pyqtSignal(str)  # image_path
     error = pyqtSignal(str)  # error_message
     progress = pyqtSignal(int)  # progress_value
+    step_progress = pyqtSignal(int, int)  # completed_steps, total_steps
+    preview = pyqtSignal(QImage)  # latent preview
+    cancelled = pyqtSignal()
 
     def __init__(self, prompt, negative_prompt, model_name, steps, guidance_scale,
-                 width, height, num_images, output_dir, transparent_bg, use_refiner):
+                 width, height, num_images, output_dir, transparent_bg, use_refiner,
+                 seed=None, result_cache=None, hardware_config=None, preset=None,
+                 save_options=None, output_store=None, hires=False, profile_log=None,
+                 tiny_vae_config=None, guidance_schedule=None, token_merging=0.0):
         super().__init__()
         self.prompt = prompt
         self.negative_prompt = negative_prompt
@@ -33,41 +51,105 @@ class ImageGenerationWorker(QThread):
         self.output_dir = output_dir
         self.transparent_bg = transparent_bg
         self.use_refiner = use_refiner
+        self.seed = seed
+        self.result_cache = result_cache
+        self.hardware_config = hardware_config or {}
+        self.preset = preset
+        self.save_options = save_options
+        self.output_store = output_store
+        self.hires = hires
+        self.profile_log = profile_log
+        self.tiny_vae_config = tiny_vae_config or {}
+        self.guidance_schedule = guidance_schedule
+        self.token_merging = token_merging
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request the running generation to stop after the current step"""
+        self.cancel_event.set()
+
+    def _on_step(self, step, total_steps):
+        """Map denoising steps onto the 30-100% range of the progress bar"""
+        self.step_progress.emit(step, total_steps)
+        self.progress.emit(30 + int(70 * step / max(total_steps, 1)))
+
+    def _on_preview(self, image):
+        """Convert a PIL preview to a QImage for the GUI thread"""
+        image = image.convert("RGB")
+        data = image.tobytes("raw", "RGB")
+        qimage = QImage(data, image.width, image.height, 3 * image.width, QImage.Format.Format_RGB888)
+        self.preview.emit(qimage.copy())
 
     def run(self):
         """Run high-quality image generation"""
+        # A failed import must still reach the error signal; GenerationCancelled
+        # is only bound for the except clauses below once this succeeded
         try:
-            from core.image_generator import ImageGenerator
+            from core.image_generator import ImageGenerator, GenerationCancelled
+            from core.cpu_profile import CPUInferenceProfile
+            from core.warmup import get_warmup_service
+        except Exception as e:
+            self.error.emit(str(e))
+            return
 
+        try:
             self.progress.emit(10)
 
-            # Initialize generator with quality settings
+            # Don't share the pipeline with the startup warm-up's dummy step
+            get_warmup_service().wait(self.model_name)
+
+            # Initialize generator with quality settings (the pipeline itself
+            # is shared through the model registry and stays loaded between clicks)
             generator = ImageGenerator(
                 model_name=self.model_name,
                 cache_dir=self.output_dir.parent / "models" / "stable_diffusion",
-                use_refiner=self.use_refiner
+                use_refiner=self.use_refiner,
+                result_cache=self.result_cache,
+                cpu_profile=CPUInferenceProfile.from_config(self.hardware_config),
+                hardware_config=self.hardware_config,
+                save_options=self.save_options,
+                output_store=self.output_store,
+                profile_log=self.profile_log,
+                tiny_vae_model=self.tiny_vae_config.get('model'),
+                tiny_vae_previews=self.tiny_vae_config.get('previews', False),
+                token_merging=self.token_merging
             )
 
             self.progress.emit(30)
 
-            # Generate images
-            for i in range(self.num_images):
-                image_path = generator.generate(
-                    prompt=self.prompt,
-                    negative_prompt=self.negative_prompt,
-                    num_inference_steps=self.steps,
-                    guidance_scale=self.guidance_scale,
-                    width=self.width,
-                    height=self.height,
-                    output_dir=self.output_dir,
-                    transparent_background=self.transparent_bg
-                )
-
-                progress_value = 30 + int((70 / self.num_images) * (i + 1))
-                self.progress.emit(progress_value)
+            # A fixed seed makes results reproducible (and cacheable)
+            seeds = None
+            if self.seed is not None:
+                seeds = [self.seed + i for i in range(self.num_images)]
+
+            # Generate all images in one batched request
+            image_paths = generator.generate_batch(
+                prompts=[self.prompt],
+                negative_prompt=self.negative_prompt,
+                num_inference_steps=self.steps,
+                guidance_scale=self.guidance_scale,
+                width=self.width,
+                height=self.height,
+                output_dir=self.output_dir,
+                num_images_per_prompt=self.num_images,
+                seeds=seeds,
+                transparent_background=self.transparent_bg,
+                progress_callback=self._on_step,
+                cancel_event=self.cancel_event,
+                preview_callback=self._on_preview,
+                preview_interval=PREVIEW_INTERVAL,
+                preset=self.preset,
+                hires=self.hires,
+                guidance_schedule=self.guidance_schedule
+            )
+
+            self.progress.emit(100)
 
+            for image_path in image_paths:
                 self.finished.emit(str(image_path))
 
+        except GenerationCancelled:
+            self.cancelled.emit()
         except Exception as e:
             self.error.emit(str(e))
 
@@ -83,6 +165,7 @@ class ImageGenerationTab(QWidget):
         self.config = config
         self.current_image_path = None
         self.worker = None
+        self.output_store = OutputStore.from_config(config, base_dir)
 
         self.init_ui()
 
@@ -153,6 +236,19 @@ class ImageGenerationTab(QWidget):
         params_group = QGroupBox("Generation Parameters")
         params_layout = QVBoxLayout()
 
+        # Speed preset
+        preset_layout = QHBoxLayout()
+        preset_layout.addWidget(QLabel("Speed Preset:"))
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(SPEED_PRESET_CHOICES)
+        self.preset_combo.setToolTip(
+            "Draft: fastest previews, Balanced: good quality in half the time, "
+            "Final: full quality. Presets choose the scheduler and step count."
+        )
+        self.preset_combo.currentTextChanged.connect(self.on_preset_changed)
+        preset_layout.addWidget(self.preset_combo)
+        params_layout.addLayout(preset_layout)
+
         # Steps
         steps_layout = QHBoxLayout()
         steps_layout.addWidget(QLabel("Steps:"))
@@ -180,8 +276,9 @@ class ImageGenerationTab(QWidget):
         width_layout = QHBoxLayout()
         width_layout.addWidget(QLabel("Width:"))
         self.width_spinbox = QSpinBox()
-        self.width_spinbox.setRange(256, 1024)
+        self.width_spinbox.setRange(256, 4096)
         self.width_spinbox.setSingleStep(64)
+        self.width_spinbox.setToolTip("Sizes above the model's native resolution are generated in tiles")
         self.width_spinbox.setValue(
             self.config.get('generation', {}).get('image', {}).get('default_width', 512)
         )
@@ -192,8 +289,9 @@ class ImageGenerationTab(QWidget):
         height_layout = QHBoxLayout()
         height_layout.addWidget(QLabel("Height:"))
         self.height_spinbox = QSpinBox()
-        self.height_spinbox.setRange(256, 1024)
+        self.height_spinbox.setRange(256, 4096)
         self.height_spinbox.setSingleStep(64)
+        self.height_spinbox.setToolTip("Sizes above the model's native resolution are generated in tiles")
         self.height_spinbox.setValue(
             self.config.get('generation', {}).get('image', {}).get('default_height', 512)
         )
@@ -209,6 +307,17 @@ class ImageGenerationTab(QWidget):
         num_images_layout.addWidget(self.num_images_spinbox)
         params_layout.addLayout(num_images_layout)
 
+        # Seed (-1 = random)
+        seed_layout = QHBoxLayout()
+        seed_layout.addWidget(QLabel("Seed:"))
+        self.seed_spinbox = QSpinBox()
+        self.seed_spinbox.setRange(-1, 2147483647)
+        self.seed_spinbox.setValue(-1)
+        self.seed_spinbox.setSpecialValueText("Random")
+        self.seed_spinbox.setToolTip("Fixed seed for reproducible images (Random = new image every time)")
+        seed_layout.addWidget(self.seed_spinbox)
+        params_layout.addLayout(seed_layout)
+
         params_group.setLayout(params_layout)
         layout.addWidget(params_group)
 
@@ -232,6 +341,16 @@ class ImageGenerationTab(QWidget):
         self.refiner_checkbox.setToolTip("Uses SDXL refiner for even higher quality (requires more VRAM)")
         quality_layout.addWidget(self.refiner_checkbox)
 
+        # Two-stage hi-res checkbox
+        self.hires_checkbox = QCheckBox("Two-Stage Hi-Res (Faster at Large Sizes)")
+        self.hires_checkbox.setChecked(
+            self.config.get('generation', {}).get('image', {}).get('hires', False)
+        )
+        self.hires_checkbox.setToolTip(
+            "Denoises at half size, upscales the latents and finishes with a few full-size steps"
+        )
+        quality_layout.addWidget(self.hires_checkbox)
+
         quality_group.setLayout(quality_layout)
         layout.addWidget(quality_group)
 
@@ -257,6 +376,12 @@ class ImageGenerationTab(QWidget):
         """)
         layout.addWidget(self.generate_btn)
 
+        # Cancel button (stops a running generation after the current step)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_generation)
+        self.cancel_btn.setEnabled(False)
+        layout.addWidget(self.cancel_btn)
+
         layout.addStretch()
 
         panel.setLayout(layout)
@@ -331,18 +456,71 @@ class ImageGenerationTab(QWidget):
         num_images = self.num_images_spinbox.value()
         transparent_bg = self.transparent_checkbox.isChecked()
         use_refiner = self.refiner_checkbox.isChecked()
+        hires = self.hires_checkbox.isChecked()
+        seed = self.seed_spinbox.value()
+        seed = None if seed < 0 else seed
+        preset = self.preset_combo.currentText()
+        preset = None if preset == "Custom" else preset.lower()
 
         output_dir = self.base_dir / "output" / "images"
+        image_config = self.config.get('generation', {}).get('image', {})
+        profile_log = image_config.get('profile_log')
+        if profile_log:
+            profile_log = self.base_dir / profile_log
 
         # Create worker thread with quality options
         self.worker = ImageGenerationWorker(
             prompt, negative_prompt, model_name, steps, guidance_scale,
-            width, height, num_images, output_dir, transparent_bg, use_refiner
+            width, height, num_images, output_dir, transparent_bg, use_refiner,
+            seed=seed, result_cache=ResultCache.from_config(self.config, self.base_dir),
+            hardware_config=self.config.get('hardware', {}), preset=preset,
+            save_options=SaveOptions.from_config(self.config),
+            output_store=self.output_store, hires=hires, profile_log=profile_log,
+            tiny_vae_config=image_config.get('tiny_vae'),
+            guidance_schedule=GuidanceSchedule.from_config(self.config),
+            token_merging=image_config.get('token_merging') or 0.0
         )
         self.worker.finished.connect(self.on_generation_finished)
         self.worker.error.connect(self.on_generation_error)
         self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.step_progress.connect(self.on_step_progress)
+        self.worker.preview.connect(self.on_preview)
+        self.worker.cancelled.connect(self.on_generation_cancelled)
         self.worker.start()
+        self.cancel_btn.setEnabled(True)
+
+    def on_preset_changed(self, preset):
+        """The Steps box only applies to the Custom preset"""
+        self.steps_spinbox.setEnabled(preset == "Custom")
+
+    def cancel_generation(self):
+        """Stop the running generation"""
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_message.emit("Cancelling generation...")
+
+    def on_step_progress(self, step, total_steps):
+        """Show the current denoising step"""
+        self.status_message.emit(f"Generating image... step {step}/{total_steps}")
+
+    def on_preview(self, qimage):
+        """Show a low-resolution live preview while denoising"""
+        pixmap = QPixmap.fromImage(qimage)
+        self.preview_label.setPixmap(
+            pixmap.scaled(
+                self.preview_label.size(),
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        )
+
+    def on_generation_cancelled(self):
+        """Handle a cancelled generation"""
+        self.generate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self.status_message.emit("Generation cancelled")
 
     def on_generation_finished(self, image_path):
         """Handle generation completion"""
@@ -362,6 +540,7 @@ class ImageGenerationTab(QWidget):
         self.save_btn.setEnabled(True)
         self.use_for_3d_btn.setEnabled(True)
         self.generate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.progress_bar.setVisible(False)
 
         self.status_message.emit(f"Image generated successfully: {image_path}")
@@ -369,6 +548,7 @@ class ImageGenerationTab(QWidget):
     def on_generation_error(self, error_msg):
         """Handle generation error"""
         self.generate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.progress_bar.setVisible(False)
         self.status_message.emit(f"Error: {error_msg}")
 
@@ -5,13 +5,16 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QComboBox, QGroupBox, QFileDialog, QProgressBar, QTextEdit,
-    QLineEdit, QSlider, QTabWidget
+    QLineEdit, QSlider, QTabWidget, QSpinBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QPixmap
 from pathlib import Path
 import datetime
 
+from core.result_cache import ResultCache
+from core.output_store import OutputStore
+
 
 class Model3DGenerationWorker(QThread):
     """Worker thread for 3D model generation"""
@@ -28,45 +31,59 @@ class Model3DGenerationWorker(QThread):
         """Run 3D model generation"""
         try:
             from core.model_3d_generator import Model3DGenerator
+            from core.model_registry import get_registry
 
             self.progress.emit(5, "Initializing 3D generator...")
 
-            # Initialize generator
-            generator = Model3DGenerator(
-                cache_dir=self.kwargs.get('cache_dir')
-            )
-
-            # Get method
-            method = self.kwargs.get('method', 'auto')
-
-            if self.mode == 'text':
-                # Text-to-3D generation
-                self.progress.emit(10, "Generating 2D image from text...")
-
-                model_path = generator.generate_from_text(
-                    prompt=self.kwargs['prompt'],
-                    negative_prompt=self.kwargs.get('negative_prompt', ''),
-                    output_format=self.kwargs['output_format'],
-                    output_dir=self.kwargs['output_dir'],
-                    method=method,
-                    extrusion_depth=self.kwargs.get('extrusion_depth', 0.5),
-                    progress_callback=lambda p, s: self.progress.emit(p, s)
-                )
-
-            else:  # image mode
-                # Image-to-3D generation
-                self.progress.emit(10, "Loading image...")
-
-                model_path = generator.generate_from_image(
-                    image_path=self.kwargs['image_path'],
-                    output_format=self.kwargs['output_format'],
-                    output_dir=self.kwargs['output_dir'],
-                    method=method,
-                    extrusion_depth=self.kwargs.get('extrusion_depth', 0.5),
-                    remove_background=self.kwargs.get('remove_background', False)
+            # Reuse the resident generator (and its loaded models) if available;
+            # jobs sharing it take turns, and eviction waits for the current one
+            cache_dir = self.kwargs.get('cache_dir')
+            hardware_config = self.kwargs.get('hardware_config') or {}
+            key = ("model_3d", str(cache_dir), repr(sorted(hardware_config.items())))
+            registry = get_registry()
+            with registry.usage_lock(key):
+                generator = registry.get_or_load(
+                    key,
+                    lambda: Model3DGenerator(
+                        cache_dir=cache_dir,
+                        result_cache=self.kwargs.get('result_cache'),
+                        hardware_config=hardware_config,
+                        output_store=self.kwargs.get('output_store')
+                    )
                 )
 
-                self.progress.emit(100, "3D model generated!")
+                # Get method
+                method = self.kwargs.get('method', 'auto')
+
+                if self.mode == 'text':
+                    # Text-to-3D generation
+                    self.progress.emit(10, "Generating 2D image from text...")
+
+                    model_path = generator.generate_from_text(
+                        prompt=self.kwargs['prompt'],
+                        negative_prompt=self.kwargs.get('negative_prompt', ''),
+                        output_format=self.kwargs['output_format'],
+                        output_dir=self.kwargs['output_dir'],
+                        method=method,
+                        extrusion_depth=self.kwargs.get('extrusion_depth', 0.5),
+                        progress_callback=lambda p, s: self.progress.emit(p, s),
+                        seed=self.kwargs.get('seed')
+                    )
+
+                else:  # image mode
+                    # Image-to-3D generation
+                    self.progress.emit(10, "Loading image...")
+
+                    model_path = generator.generate_from_image(
+                        image_path=self.kwargs['image_path'],
+                        output_format=self.kwargs['output_format'],
+                        output_dir=self.kwargs['output_dir'],
+                        method=method,
+                        extrusion_depth=self.kwargs.get('extrusion_depth', 0.5),
+                        remove_background=self.kwargs.get('remove_background', False)
+                    )
+
+                    self.progress.emit(100, "3D model generated!")
 
             self.finished.emit(str(model_path))
 
@@ -87,6 +104,7 @@ class Model3DGenerationTab(QWidget):
         self.current_image_path = None
         self.current_model_path = None
         self.worker = None
+        self.output_store = OutputStore.from_config(config, base_dir)
 
         self.init_ui()
 
@@ -199,6 +217,18 @@ class Model3DGenerationTab(QWidget):
         neg_prompt_group.setLayout(neg_layout)
         layout.addWidget(neg_prompt_group)
 
+        # Seed (a fixed seed makes the 2D image reproducible and cacheable)
+        seed_layout = QHBoxLayout()
+        seed_layout.addWidget(QLabel("Seed:"))
+        self.text_seed_spinbox = QSpinBox()
+        self.text_seed_spinbox.setRange(-1, 2147483647)
+        self.text_seed_spinbox.setValue(-1)
+        self.text_seed_spinbox.setSpecialValueText("Random")
+        self.text_seed_spinbox.setToolTip("Fixed seed for a reproducible 2D image (Random = new image every time)")
+        seed_layout.addWidget(self.text_seed_spinbox)
+        seed_layout.addStretch()
+        layout.addLayout(seed_layout)
+
         layout.addStretch()
         widget.setLayout(layout)
         return widget
@@ -432,6 +462,8 @@ class Model3DGenerationTab(QWidget):
 
         # Get parameters
         negative_prompt = self.text_negative_input.text().strip()
+        seed = self.text_seed_spinbox.value()
+        seed = None if seed < 0 else seed
         output_format = self.format_combo.currentText().lower()
         extrusion_depth = self.depth_slider.value() / 100.0
         output_dir = self.base_dir / "output" / "models_3d"
@@ -449,7 +481,11 @@ class Model3DGenerationTab(QWidget):
             output_dir=output_dir,
             cache_dir=cache_dir,
             extrusion_depth=extrusion_depth,
-            method=method
+            method=method,
+            seed=seed,
+            result_cache=ResultCache.from_config(self.config, self.base_dir),
+            hardware_config=self.config.get('hardware', {}),
+            output_store=self.output_store
         )
         self.worker.finished.connect(self.on_generation_finished)
         self.worker.error.connect(self.on_generation_error)
@@ -500,7 +536,9 @@ class Model3DGenerationTab(QWidget):
             cache_dir=cache_dir,
             extrusion_depth=extrusion_depth,
             remove_background=False,
-            method=method
+            method=method,
+            hardware_config=self.config.get('hardware', {}),
+            output_store=self.output_store
         )
         self.worker.finished.connect(self.on_generation_finished)
         self.worker.error.connect(self.on_generation_error)
@@ -10,6 +10,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from pathlib import Path
 
+from core.output_store import OutputStore
+
 try:
     import torch
     TORCH_AVAILABLE = True
@@ -53,14 +55,17 @@ class ModelDownloadWorker(QThread):
         """Download Stable Diffusion models"""
         self.progress.emit("Downloading Stable Diffusion models...")
 
-        from core.image_generator import ImageGenerator
+        from diffusers import DiffusionPipeline
+        from core.model_manifest import get_model_manifest
 
+        # Only fetch the files; loading would go through the model registry
+        # and could evict the pipeline the image tab is using
+        model_id = "stabilityai/stable-diffusion-2-1"
         cache_dir = self.base_dir / "models" / "stable_diffusion"
-        generator = ImageGenerator(
-            model_name="stabilityai/stable-diffusion-2-1",
-            cache_dir=cache_dir
-        )
-        generator.load_model()
+        manifest = get_model_manifest()
+        if manifest.resolve(model_id, cache_dir) is None:
+            DiffusionPipeline.download(model_id, cache_dir=cache_dir)
+            manifest.record_download(model_id, cache_dir)
 
         self.progress.emit("Stable Diffusion models downloaded successfully")
 
@@ -234,9 +239,40 @@ class SettingsTab(QWidget):
         open_btn.clicked.connect(self.open_output_folder)
         layout.addWidget(open_btn)
 
+        # Generated assets, listed from the output index (no directory scan)
+        self.output_index_text = QTextEdit()
+        self.output_index_text.setReadOnly(True)
+        self.output_index_text.setMaximumHeight(120)
+        layout.addWidget(self.output_index_text)
+
+        refresh_btn = QPushButton("Refresh Output Index")
+        refresh_btn.clicked.connect(self.refresh_output_index)
+        layout.addWidget(refresh_btn)
+
+        self.refresh_output_index()
+
         group.setLayout(layout)
         return group
 
+    def refresh_output_index(self):
+        """Show asset counts and the most recent outputs from the output index"""
+        try:
+            store = OutputStore.from_config(self.config, self.base_dir)
+            store.prune_missing()
+            counts = store.counts()
+            lines = [
+                f"Images: {counts.get('image', 0)}, "
+                f"3D Models: {counts.get('model_3d', 0)}, "
+                f"Audio: {counts.get('audio', 0)}",
+                "",
+                "Recent outputs:",
+            ]
+            for asset in store.query(limit=5):
+                lines.append(f"  [{asset['type']}] {asset['path'].name}")
+            self.output_index_text.setText("\n".join(lines))
+        except Exception as e:
+            self.output_index_text.setText(f"Could not read output index: {e}")
+
     def create_system_info_group(self):
         """Create system information group"""
         group = QGroupBox("System Information")
@@ -270,6 +306,24 @@ class SettingsTab(QWidget):
             info_lines.append("Using CPU for inference")
             self.device_combo.setCurrentText("CPU")
 
+        # Execution mode the default image model will use under the memory budget
+        if TORCH_AVAILABLE:
+            try:
+                from core.offload import OffloadPolicy
+                policy = OffloadPolicy.from_config(self.config.get('hardware', {}))
+                device = policy.resolve_device()
+                sd_config = self.config.get('models', {}).get('stable_diffusion', {})
+                model_name = sd_config.get('default_model', "")
+                mode = policy.choose_mode(
+                    device,
+                    "sdxl" if "xl" in model_name.lower() else "sd",
+                    16 if device == "cuda" else 32,
+                    use_refiner=sd_config.get('use_refiner', False)
+                )
+                info_lines.append(f"Execution Mode: {mode} on {device}")
+            except Exception as e:
+                info_lines.append(f"Execution Mode: Error detecting - {e}")
+
         self.gpu_info_label.setText("\n".join(info_lines))
 
         # System info
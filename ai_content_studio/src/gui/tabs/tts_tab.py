@@ -12,6 +12,8 @@ from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from pathlib import Path
 import datetime
 
+from core.output_store import OutputStore
+
 
 class TTSWorker(QThread):
     """Worker thread for high-quality TTS generation"""
@@ -20,7 +22,7 @@ class TTSWorker(QThread):
     progress = pyqtSignal(int)  # progress_value
 
     def __init__(self, text, language, speed, output_format, output_dir,
-                 engine, voice, reference_audio=None):
+                 engine, voice, reference_audio=None, output_store=None):
         super().__init__()
         self.text = text
         self.language = language
@@ -30,32 +32,42 @@ class TTSWorker(QThread):
         self.engine = engine
         self.voice = voice
         self.reference_audio = reference_audio
+        self.output_store = output_store
 
     def run(self):
         """Run high-quality TTS generation"""
         try:
             from core.tts_generator import TTSGenerator
+            from core.model_registry import get_registry
 
             self.progress.emit(10)
 
-            # Initialize generator with selected engine
-            generator = TTSGenerator(
-                cache_dir=self.output_dir.parent / "models" / "tts",
-                engine=self.engine
-            )
-
-            self.progress.emit(30)
-
-            # Generate speech with voice selection
-            audio_path = generator.generate(
-                text=self.text,
-                language=self.language,
-                speed=self.speed,
-                output_format=self.output_format,
-                output_dir=self.output_dir,
-                voice=self.voice,
-                reference_audio=self.reference_audio
-            )
+            # Reuse the resident generator for the selected engine; jobs
+            # sharing it take turns, and eviction waits for the current one
+            cache_dir = self.output_dir.parent / "models" / "tts"
+            key = ("tts", self.engine, str(cache_dir))
+            registry = get_registry()
+            with registry.usage_lock(key):
+                generator = registry.get_or_load(
+                    key,
+                    lambda: TTSGenerator(
+                        cache_dir=cache_dir, engine=self.engine, output_store=self.output_store
+                    ),
+                    device="cpu"
+                )
+
+                self.progress.emit(30)
+
+                # Generate speech with voice selection
+                audio_path = generator.generate(
+                    text=self.text,
+                    language=self.language,
+                    speed=self.speed,
+                    output_format=self.output_format,
+                    output_dir=self.output_dir,
+                    voice=self.voice,
+                    reference_audio=self.reference_audio
+                )
 
             self.progress.emit(100)
             self.finished.emit(str(audio_path))
@@ -75,6 +87,7 @@ class TTSTab(QWidget):
         self.config = config
         self.current_audio_path = None
         self.reference_audio_path = None
+        self.output_store = OutputStore.from_config(config, base_dir)
         self.worker = None
 
         # Audio player
@@ -397,7 +410,8 @@ class TTSTab(QWidget):
         # Create worker thread with engine and voice
         self.worker = TTSWorker(
             text, language, speed, output_format, output_dir,
-            engine, voice, reference_audio
+            engine, voice, reference_audio,
+            output_store=self.output_store
         )
         self.worker.finished.connect(self.on_generation_finished)
         self.worker.error.connect(self.on_generation_error)
@@ -63,7 +63,10 @@ def main():
     window.show()
 
     print("Ready! Application started successfully.")
-    print("Models will load on-demand when you generate content.")
+    if window.start_warmup():
+        print("Warming up the default image model in the background.")
+    else:
+        print("Models will load on-demand when you generate content.")
     print("=" * 60)
 
     # Run application
@@ -1,5 +1,7 @@
 """
 Run all tests for AI Content Studio
+
+Pass --profile to print per-stage timings of the image generation test.
 """
 
 import sys
@@ -36,7 +38,7 @@ def run_all_tests():
     print("#" * 70)
     try:
         from test_image_generation import test_image_generation
-        image_path = test_image_generation()
+        image_path = test_image_generation(profile="--profile" in sys.argv)
         results["image_generation"] = True
     except Exception as e:
         print(f"\n✗ Image generation test failed: {e}")
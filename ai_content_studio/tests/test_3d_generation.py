@@ -9,6 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from core.model_3d_generator import Model3DGenerator
+from core.output_store import OutputStore
 
 
 def test_3d_generation(image_path=None):
@@ -20,24 +21,24 @@ def test_3d_generation(image_path=None):
     # Initialize generator
     base_dir = Path(__file__).parent.parent
     cache_dir = base_dir / "models" / "triposr"
+    output_store = OutputStore(base_dir / "output" / "index.sqlite")
 
     # Use test image or provided image
     if image_path is None:
-        # Look for any image in output folder
-        output_images = base_dir / "output" / "images"
-        images = list(output_images.glob("*.png"))
-        if not images:
+        # Use the most recent image from the output index
+        latest = output_store.latest("image")
+        if latest is None:
             print("\n✗ No test images found!")
             print("Please run test_image_generation.py first or provide an image path")
             return None
 
-        image_path = str(images[0])
+        image_path = str(latest['path'])
         print(f"\n1. Using test image: {Path(image_path).name}")
     else:
         print(f"\n1. Using provided image: {Path(image_path).name}")
 
     print("\n2. Initializing 3D Model Generator...")
-    generator = Model3DGenerator(cache_dir=cache_dir)
+    generator = Model3DGenerator(cache_dir=cache_dir, output_store=output_store)
 
     print("\n3. Loading model...")
     generator.load_model()
@@ -53,8 +54,12 @@ def test_3d_generation(image_path=None):
         output_dir=output_dir
     )
 
+    model_asset = output_store.find_by_path(model_path)
+    assert model_asset is not None, "3D model missing from the output index"
+
     print(f"\n✓ Test completed successfully!")
     print(f"✓ 3D model saved to: {model_path}")
+    print(f"✓ Indexed as {model_asset['id']} (source image: {model_asset['parent_id']})")
     print(f"\nPlease verify:")
     print(f"1. Model file exists at the specified path")
     print(f"2. Model can be opened in a 3D viewer (Blender, Windows 3D Viewer)")
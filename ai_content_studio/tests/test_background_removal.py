@@ -0,0 +1,117 @@
+"""
+Test script for the shared rembg session pool
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from core.background_removal import (
+    RembgSessionPool, has_transparency, white_background_matte, remove_backgrounds
+)
+
+
+def _studio_render(size: int = 256) -> Image.Image:
+    """A mug-like object with an enclosed white hole on a white background"""
+    image = Image.new("RGB", (size, size), (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((64, 64, 192, 192), fill=(180, 40, 30))
+    draw.ellipse((112, 112, 144, 144), fill=(255, 255, 255))
+    return image
+
+
+def test_background_removal():
+    """Test session reuse, the analytic matte and transparency detection"""
+    print("=" * 70)
+    print("Testing Background Removal Sessions")
+    print("=" * 70)
+
+    created = []
+
+    def new_session(model_name):
+        created.append(model_name)
+        return object()
+
+    pool = RembgSessionPool(session_factory=new_session)
+
+    print("\n1. Sessions are created once per model...")
+    first = pool.session("u2net")
+    assert pool.session("u2net") is first
+    assert pool.session("isnet-general-use") is not first
+    assert created == ["u2net", "isnet-general-use"]
+    assert "u2net" in pool
+    print("   ✓ Repeated requests reuse the session")
+
+    print("\n2. Concurrent first use creates a single session...")
+    pool.clear()
+    created.clear()
+    sessions = []
+    threads = [
+        threading.Thread(target=lambda: sessions.append(pool.session("u2net")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert created == ["u2net"]
+    assert all(session is sessions[0] for session in sessions)
+    print("   ✓ 8 threads shared one session")
+
+    print("\n3. Already cut-out images are detected...")
+    assert not has_transparency(Image.new("RGB", (8, 8)))
+    assert not has_transparency(Image.new("RGBA", (8, 8), (255, 255, 255, 255)))
+    cutout = Image.new("RGBA", (8, 8), (255, 255, 255, 255))
+    cutout.putpixel((0, 0), (0, 0, 0, 0))
+    assert has_transparency(cutout)
+    print("   ✓ Only images with transparent pixels count as cut out")
+
+    print("\n4. White-background renders are matted without rembg...")
+    matte, confidence = white_background_matte(_studio_render())
+    alpha = np.asarray(matte.getchannel("A"))
+    assert confidence > 0.95, confidence
+    assert alpha[0, 0] == 0 and alpha[-1, -1] == 0
+    assert alpha[80, 128] == 255
+    assert alpha[128, 128] == 255, "White area inside the object was removed"
+    assert 0 < alpha[128, 64] < 255 or 0 < alpha[128, 65] < 255, "Edge is not feathered"
+    images, methods = remove_backgrounds([_studio_render()])
+    assert methods == ["matte"] and images[0].mode == "RGBA"
+    print(f"   ✓ Matte confidence {confidence:.2f}, path: {methods[0]}")
+
+    print("\n5. Busy backgrounds get a low confidence...")
+    rng = np.random.default_rng(0)
+    noise = Image.fromarray(rng.integers(0, 256, (256, 256, 3), dtype=np.uint8))
+    _, noise_confidence = white_background_matte(noise)
+    busy = _studio_render()
+    ImageDraw.Draw(busy).rectangle((0, 200, 255, 255), fill=(90, 70, 50))
+    _, busy_confidence = white_background_matte(busy)
+    assert noise_confidence < 0.5, noise_confidence
+    assert busy_confidence < 0.8, busy_confidence
+    print(f"   ✓ Noise: {noise_confidence:.2f}, object on a table: {busy_confidence:.2f}")
+
+    print("\n6. Already transparent images are passed through...")
+    _, methods = remove_backgrounds([matte])
+    assert methods == ["existing"]
+    print("   ✓ No second removal")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_background_removal()
+        print("\n" + "=" * 70)
+        print("BACKGROUND REMOVAL TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("BACKGROUND REMOVAL TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,166 @@
+"""
+Test script for guidance schedules (classifier-free guidance truncation)
+
+Uses the tiny randomly-initialized SDXL base and refiner from
+tiny_models.py, so it runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from core.guidance import GuidanceSchedule
+from core.image_generator import ImageGenerator
+from tiny_models import save_tiny_sdxl
+
+
+def _pixels(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+class UNetBatches:
+    """Record the batch size of every UNet forward call"""
+
+    def __init__(self, unet):
+        self.sizes = []
+        self._handle = unet.register_forward_pre_hook(
+            lambda module, args: self.sizes.append(args[0].shape[0])
+        )
+
+    def close(self):
+        self._handle.remove()
+
+
+def test_guidance_schedule():
+    """Test schedule values, UNet batch collapse, refiner/batch/tiled passes and params"""
+    print("=" * 70)
+    print("Testing Guidance Schedules")
+    print("=" * 70)
+
+    print("\n1. Schedule values...")
+    truncate = GuidanceSchedule("truncate", cutoff=0.5)
+    decay = GuidanceSchedule("decay", cutoff=0.5)
+    assert truncate.scale_at(7.5, 0.0) == 7.5 and truncate.scale_at(7.5, 0.49) == 7.5
+    assert truncate.scale_at(7.5, 0.5) == 1.0
+    assert decay.scale_at(7.5, 0.0) == 7.5 and decay.scale_at(7.5, 0.6) == 1.0
+    assert abs(decay.scale_at(7.5, 0.25) - 4.25) < 1e-9
+    assert truncate.guided_steps(7.5, 10) == 5 and decay.guided_steps(7.5, 10) == 5
+    assert GuidanceSchedule("truncate", cutoff=1.0).is_constant
+    assert GuidanceSchedule("constant").scale_at(7.5, 0.9) == 7.5
+    for mode, cutoff in (("linear", 0.5), ("truncate", 0.0), ("decay", 1.5)):
+        try:
+            GuidanceSchedule(mode, cutoff)
+            raise AssertionError(f"Expected ValueError for {mode} / {cutoff}")
+        except ValueError:
+            pass
+    config = {'generation': {'image': {'guidance_schedule': {'mode': "decay", 'cutoff': 0.4}}}}
+    assert GuidanceSchedule.from_config(config).key() == ["decay", 0.4]
+    assert GuidanceSchedule.from_config({}) is None
+    print("   ✓ truncate/decay scales, guided step counts, validation, config")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, refiner_dir = save_tiny_sdxl(tmp)
+        generator = ImageGenerator(
+            model_name=str(base_dir), tile_size=64, hardware_config={'device': "cpu"}
+        )
+        request = dict(prompt="a red cube", num_inference_steps=10, width=64, height=64,
+                       seed=11, output_dir=tmp / "out")
+
+        print("\n2. Unguided steps run the UNet on the conditional half only...")
+        generator.load_model()
+        batches = UNetBatches(generator.pipe.unet)
+        try:
+            full = generator.generate(**request)
+            assert batches.sizes == [2] * 10, batches.sizes
+            batches.sizes.clear()
+            truncated = generator.generate(**request, guidance_schedule=truncate)
+            assert batches.sizes == [2] * 5 + [1] * 5, batches.sizes
+            batches.sizes.clear()
+            decayed = generator.generate(**request, guidance_schedule=decay)
+            assert batches.sizes == [2] * 5 + [1] * 5, batches.sizes
+        finally:
+            batches.close()
+        assert _pixels(truncated).shape == _pixels(full).shape
+        assert not np.array_equal(_pixels(truncated), _pixels(full))
+        assert not np.array_equal(_pixels(truncated), _pixels(decayed))
+        print("   ✓ 10 steps: 5 guided (batch 2) + 5 conditional-only (batch 1)")
+
+        print("\n3. A cutoff of 1.0 is regular guidance...")
+        unchanged = generator.generate(**request, guidance_schedule=GuidanceSchedule("truncate", 1.0))
+        assert np.array_equal(_pixels(unchanged), _pixels(full))
+        params = generator._request_params("p", "n", 1, 10, 7.5, 64, 64, False)
+        assert 'guidance_schedule' not in params
+        params = generator._request_params("p", "n", 1, 10, 7.5, 64, 64, False,
+                                           guidance_schedule=truncate)
+        assert params['guidance_schedule'] == ["truncate", 0.5]
+        print("   ✓ Identical output; only real schedules change the request key")
+
+        print("\n4. Batched requests collapse per image like single ones...")
+        paths = generator.generate_batch(["a red cube", "a blue sphere"], num_inference_steps=10,
+                                         width=64, height=64, seeds=[11, 12], max_batch_size=2,
+                                         output_dir=tmp / "out", guidance_schedule=truncate)
+        single = generator.generate(**dict(request, prompt="a blue sphere", seed=12),
+                                    guidance_schedule=truncate)
+        assert np.allclose(_pixels(paths[0]), _pixels(truncated), atol=2)
+        assert np.allclose(_pixels(paths[1]), _pixels(single), atol=2)
+        print("   ✓ Batch of 2 matches the single-image runs")
+
+        print("\n5. Tiled generation follows the schedule...")
+        batches = UNetBatches(generator.pipe.unet)
+        try:
+            generator.generate(**dict(request, width=96), tiled=True, guidance_schedule=truncate)
+        finally:
+            batches.close()
+        tiles = len(batches.sizes) // 10
+        assert tiles > 1 and batches.sizes == [2] * 5 * tiles + [1] * 5 * tiles, batches.sizes
+        print(f"   ✓ {tiles} tiles per step, guidance off after step 5")
+        generator.unload_model()
+
+        print("\n6. The schedule continues across base and refiner...")
+        refined = ImageGenerator(
+            model_name=str(base_dir), use_refiner=True, refiner_model=str(refiner_dir),
+            hardware_config={'device': "cpu"}
+        )
+        refined.load_model()
+        base_batches = UNetBatches(refined.pipe.unet)
+        refiner_batches = UNetBatches(refined.refiner.unet)
+        try:
+            refined.generate(**request, guidance_schedule=truncate)
+            # Base covers 0-0.8 of the schedule, the refiner 0.8-1.0
+            assert base_batches.sizes == [2] * 5 + [1] * 3, base_batches.sizes
+            assert refiner_batches.sizes == [1] * 2, refiner_batches.sizes
+            base_batches.sizes.clear()
+            refiner_batches.sizes.clear()
+            refined.generate(**request, guidance_schedule=GuidanceSchedule("truncate", 0.9))
+            assert base_batches.sizes == [2] * 8, base_batches.sizes
+            assert refiner_batches.sizes == [2, 1], refiner_batches.sizes
+        finally:
+            base_batches.close()
+            refiner_batches.close()
+        print("   ✓ Refiner starts unguided past the cutoff and collapses mid-pass")
+        refined.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_guidance_schedule()
+        print("\n" + "=" * 70)
+        print("GUIDANCE SCHEDULE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("GUIDANCE SCHEDULE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,105 @@
+"""
+Test script for the two-stage hi-res mode
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py (native
+size 64 px), so it runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from core.image_generator import ImageGenerator, HIRES_STRENGTH
+from tiny_models import save_tiny_sdxl
+
+
+def test_hires():
+    """Test stage sizes, step accounting and component sharing of hi-res mode"""
+    print("=" * 70)
+    print("Testing Two-Stage Hi-Res Mode")
+    print("=" * 70)
+
+    print("\n1. Stage sizes and step counts...")
+    assert ImageGenerator._hires_base_size(1024, 1024) == (512, 512)
+    assert ImageGenerator._hires_base_size(1344, 768) == (640, 384)
+    assert ImageGenerator._hires_base_size(96, 96) == (64, 64)
+    img2img_steps, refine_steps = ImageGenerator._hires_steps(40)
+    assert refine_steps == 10 and img2img_steps == round(10 / HIRES_STRENGTH)
+    print(f"   ✓ 40 steps -> 40 at half size + {refine_steps} at full size")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir, _ = save_tiny_sdxl(Path(tmp))
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+        generator.load_model()
+        pipe = generator.pipe
+
+        print("\n2. The refine pass reuses the loaded components...")
+        img2img = generator._img2img_pipeline()
+        assert img2img.unet is pipe.unet and img2img.vae is pipe.vae
+        assert img2img.text_encoder_2 is pipe.text_encoder_2
+        assert generator._img2img_pipeline() is img2img
+        print("   ✓ Same UNet, VAE and text encoders; pipeline built once")
+
+        print("\n3. Most steps run at the low resolution...")
+        unet_sizes = []
+        hook = pipe.unet.register_forward_pre_hook(
+            lambda module, args: unet_sizes.append(tuple(args[0].shape[-2:]))
+        )
+        steps = 4
+        progress = []
+        try:
+            image = generator._run_pipeline(
+                ["a red cube"], ["blurry"], [7], steps, 5.0, 128, 128,
+                step_callback=generator._make_step_callback(
+                    steps, 1, progress_callback=lambda done, total: progress.append((done, total)),
+                    hires=True
+                ),
+                hires=True
+            )[0]
+        finally:
+            hook.remove()
+
+        scale = pipe.vae_scale_factor
+        _, refine_steps = generator._hires_steps(steps)
+        assert image.size == (128, 128), image.size
+        assert unet_sizes == [(64 // scale,) * 2] * steps + [(128 // scale,) * 2] * refine_steps, unet_sizes
+        total = steps + refine_steps
+        assert progress == [(i, total) for i in range(1, total + 1)], progress
+        print(f"   ✓ {steps} steps at 64x64, {refine_steps} at 128x128, progress reached {total}")
+
+        print("\n4. Hi-res requests get their own cache keys...")
+        plain = generator._request_params("p", "n", 1, steps, 5.0, 128, 128, False)
+        hires = generator._request_params("p", "n", 1, steps, 5.0, 128, 128, False, hires=True)
+        assert 'hires' not in plain and 'hires' in hires
+        print("   ✓ Native requests keep their keys")
+
+        print("\n5. Seeded hi-res generation is deterministic...")
+        again = generator._run_pipeline(["a red cube"], ["blurry"], [7], steps, 5.0, 128, 128,
+                                        hires=True)[0]
+        assert np.array_equal(np.asarray(again), np.asarray(image))
+        print("   ✓ Same seed, same image")
+
+        generator.unload_model()
+        assert not generator._img2img_pipes
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_hires()
+        print("\n" + "=" * 70)
+        print("HI-RES MODE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("HI-RES MODE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,129 @@
+"""
+Test script for img2img and inpainting on the loaded pipeline
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from core.image_generator import ImageGenerator
+from core.latent_cache import get_latent_cache
+from core.result_cache import ResultCache
+from tiny_models import save_tiny_sdxl
+
+
+def _gradient(size: int = 64) -> Image.Image:
+    """Deterministic RGB test image"""
+    ramp = np.linspace(0, 255, size, dtype=np.uint8)
+    pixels = np.stack([
+        np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size)), np.full((size, size), 96, np.uint8)
+    ], axis=-1)
+    return Image.fromarray(pixels)
+
+
+def test_image_editing():
+    """Test component sharing, latent caching, img2img, inpainting and cache keys"""
+    print("=" * 70)
+    print("Testing Img2img and Inpainting")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        output_dir = tmp / "output"
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"},
+                                   result_cache=ResultCache(tmp / "cache"))
+        generator.load_model()
+        pipe = generator.pipe
+        source = _gradient()
+        source_path = tmp / "source.png"
+        source.save(source_path)
+
+        print("\n1. Edit pipelines reuse the loaded components...")
+        for edit_pipe in (generator._img2img_pipeline(), generator._inpaint_pipeline()):
+            assert edit_pipe.unet is pipe.unet and edit_pipe.vae is pipe.vae
+            assert edit_pipe.text_encoder is pipe.text_encoder
+            assert edit_pipe.text_encoder_2 is pipe.text_encoder_2
+        assert generator._inpaint_pipeline() is generator._inpaint_pipeline()
+        print("   ✓ Same UNet, VAE and text encoders; nothing loaded")
+
+        encodes = []
+        hook = pipe.vae.encoder.register_forward_pre_hook(lambda module, args: encodes.append(1))
+
+        print("\n2. img2img encodes a source once...")
+        progress = []
+        first = generator.generate_from_image(
+            source_path, "a blue sphere", strength=0.5, num_inference_steps=4, seed=3,
+            output_dir=output_dir,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+        second = generator.generate_from_image(
+            source, "a green cone", strength=0.75, num_inference_steps=4, seed=3,
+            output_dir=output_dir,
+        )
+        assert Image.open(first).size == (64, 64) and second.exists()
+        assert len(encodes) == 1, f"Source encoded {len(encodes)} times"
+        assert progress == [(1, 2), (2, 2)], progress
+        print(f"   ✓ 2 edits, 1 VAE encode ({len(get_latent_cache())} cached latents)")
+
+        print("\n3. Inpainting reuses the cached source latents...")
+        mask = Image.new("L", source.size, 0)
+        mask.paste(255, (16, 16, 48, 48))
+        inpainted = generator.inpaint(source, mask, "a red cube", strength=1.0,
+                                      num_inference_steps=3, seed=5, output_dir=output_dir)
+        assert Image.open(inpainted).size == (64, 64)
+        assert len(encodes) == 1, f"Source encoded {len(encodes)} times"
+        print("   ✓ No extra VAE encode for the inpainting pass")
+
+        print("\n4. Seeded edits are deterministic and cached per source and mask...")
+        image = generator._load_source_image(source_path)
+        run = lambda: generator._run_edit(
+            image, mask, [generator._enhance_prompt("a red cube")],
+            [generator._enhance_negative_prompt("")], [5], 3, 7.5, 64, 64, 1.0
+        )[0]
+        assert np.array_equal(np.asarray(run()), np.asarray(Image.open(inpainted)))
+        for _ in range(100):  # result-cache stores run on the writer threads
+            if len(list((tmp / "cache").glob("*/*.png"))) == 3:
+                break
+            time.sleep(0.05)
+        calls = []
+        original_run = generator._run_edit
+        generator._run_edit = lambda *args, **kwargs: calls.append(1) or original_run(*args, **kwargs)
+        generator.inpaint(source, mask, "a red cube", strength=1.0, num_inference_steps=3, seed=5,
+                          output_dir=output_dir)
+        generator.inpaint(source, Image.new("L", source.size, 255), "a red cube", strength=1.0,
+                          num_inference_steps=3, seed=5, output_dir=output_dir)
+        assert len(calls) == 1, "Different mask served from the result cache"
+        print("   ✓ Repeat served from the result cache, other mask regenerated")
+
+        hook.remove()
+        generator.unload_model()
+        assert generator.pipe is None and not generator._inpaint_pipes
+        assert len(get_latent_cache()) > 0, "latents are shared with other generators of the model"
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_image_editing()
+        print("\n" + "=" * 70)
+        print("IMAGE EDITING TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("IMAGE EDITING TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -1,5 +1,7 @@
 """
 Test script for Image Generation
+
+Pass --profile to print a per-stage timing and peak-memory breakdown.
 """
 
 import sys
@@ -9,10 +11,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from core.image_generator import ImageGenerator
+from core.output_store import OutputStore
+from core.profiling import GenerationProfile
 
 
-def test_image_generation():
-    """Test basic image generation"""
+def test_image_generation(profile: bool = False):
+    """Test basic image generation (profile=True prints a per-stage breakdown)"""
     print("=" * 70)
     print("Testing Image Generation (Stable Diffusion)")
     print("=" * 70)
@@ -24,11 +28,13 @@ def test_image_generation():
     print("\n1. Initializing Image Generator...")
     generator = ImageGenerator(
         model_name="stabilityai/stable-diffusion-2-1",
-        cache_dir=cache_dir
+        cache_dir=cache_dir,
+        output_store=OutputStore(base_dir / "output" / "index.sqlite")
     )
 
     print("\n2. Loading model...")
-    generator.load_model()
+    load_profile = GenerationProfile(device=generator.device) if profile else None
+    generator.load_model(profile=load_profile)
 
     print("\n3. Generating test image...")
     prompt = "A beautiful landscape with mountains and a lake at sunset, highly detailed, 4k"
@@ -37,6 +43,7 @@ def test_image_generation():
     output_dir = base_dir / "output" / "images"
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    generate_profile = GenerationProfile(device=generator.device) if profile else None
     image_path = generator.generate(
         prompt=prompt,
         negative_prompt=negative_prompt,
@@ -44,7 +51,8 @@ def test_image_generation():
         guidance_scale=7.5,
         width=512,
         height=512,
-        output_dir=output_dir
+        output_dir=output_dir,
+        profile=generate_profile
     )
 
     print(f"\n✓ Test completed successfully!")
@@ -54,12 +62,17 @@ def test_image_generation():
     print(f"2. Image matches the prompt description")
     print(f"3. Image quality is acceptable")
 
+    if profile:
+        for stage_profile in (load_profile, generate_profile):
+            print(f"\nProfile: {stage_profile.label}")
+            print(stage_profile.format_table())
+
     return image_path
 
 
 if __name__ == "__main__":
     try:
-        test_image_generation()
+        test_image_generation(profile="--profile" in sys.argv)
         print("\n" + "=" * 70)
         print("IMAGE GENERATION TEST: PASSED")
         print("=" * 70)
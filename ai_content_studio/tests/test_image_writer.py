@@ -0,0 +1,75 @@
+"""
+Test script for the background Image Writer
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from PIL import Image
+
+from core.image_writer import ImageWriter, SaveOptions
+
+
+def test_image_writer():
+    """Test asynchronous writes in every supported format"""
+    print("=" * 70)
+    print("Testing Image Writer")
+    print("=" * 70)
+
+    image = Image.effect_noise((128, 128), 64).convert("RGB")
+    writer = ImageWriter(max_workers=2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        print("\n1. Lossless formats round-trip exactly...")
+        for options in (SaveOptions("png", png_compress_level=1), SaveOptions("webp")):
+            path = writer.submit(image, tmp / f"out{options.extension}", options).result()
+            assert path.exists()
+            assert np.array_equal(np.asarray(Image.open(path).convert("RGB")), np.asarray(image))
+            print(f"   ✓ {options.format}: {path.stat().st_size / 1024:.0f} KB")
+
+        print("\n2. JPEG flattens transparency and honors quality...")
+        rgba = image.convert("RGBA")
+        rgba.putalpha(0)
+        sizes = {}
+        for quality in (30, 95):
+            path = tmp / f"out_q{quality}.jpg"
+            writer.submit(rgba, path, SaveOptions("jpg", quality=quality)).result()
+            with Image.open(path) as written:
+                assert written.mode == "RGB"
+            sizes[quality] = path.stat().st_size
+        assert sizes[30] < sizes[95]
+        print(f"   ✓ q30: {sizes[30] / 1024:.0f} KB, q95: {sizes[95] / 1024:.0f} KB")
+
+        print("\n3. No temp files are left behind...")
+        assert not list(tmp.glob("*.tmp"))
+        print("   ✓ Writes replaced their targets atomically")
+
+        try:
+            SaveOptions("gif")
+            assert False, "Unsupported format should be rejected"
+        except ValueError:
+            pass
+
+    writer.shutdown()
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_image_writer()
+        print("\n" + "=" * 70)
+        print("IMAGE WRITER TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("IMAGE WRITER TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
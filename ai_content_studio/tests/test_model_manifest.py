@@ -0,0 +1,115 @@
+"""
+Test script for offline-first model resolution through the model manifest
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.model_manifest import ModelManifest, get_model_manifest, find_snapshot, TORCH_HUB
+from tiny_models import save_tiny_sdxl
+
+
+def _fake_snapshot(cache_dir: Path, model_id: str, revision: str, ref: bool = True) -> Path:
+    """Create a Hugging Face cache entry with one file"""
+    repo = cache_dir / ("models--" + model_id.replace("/", "--"))
+    snapshot = repo / "snapshots" / revision
+    snapshot.mkdir(parents=True)
+    (snapshot / "model_index.json").write_text("{}")
+    if ref:
+        (repo / "refs").mkdir(exist_ok=True)
+        (repo / "refs" / "main").write_text(revision)
+    return snapshot
+
+
+def test_model_manifest():
+    """Test snapshot discovery, persistence, refresh and offline pipeline loads"""
+    print("=" * 70)
+    print("Testing Model Manifest")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache_dir = tmp / "cache"
+        hub_dir = tmp / "hub"
+        manifest_path = tmp / "manifest.json"
+
+        print("\n1. Snapshots are found in the Hugging Face cache layout...")
+        old = _fake_snapshot(cache_dir, "org/model", "aaa")
+        current = _fake_snapshot(cache_dir, "org/model", "bbb", ref=False)
+        assert find_snapshot("org/model", [cache_dir]) == old, "refs/main not preferred"
+        (cache_dir / "models--org--model" / "refs" / "main").write_text("bbb")
+        assert find_snapshot("org/model", [cache_dir]) == current
+        assert find_snapshot("org/other", [cache_dir]) is None
+        print("   ✓ refs/main selects the snapshot")
+
+        print("\n2. Resolved snapshots are recorded and reloaded...")
+        manifest = ModelManifest(manifest_path, search_dirs=[cache_dir], hub_dir=hub_dir)
+        assert manifest.resolve("org/model") == current
+        assert "org/model" in manifest and manifest_path.exists()
+        reloaded = ModelManifest(manifest_path, search_dirs=[], hub_dir=hub_dir)
+        assert reloaded.resolve("org/model") == current.resolve()
+        assert reloaded.resolve("org/missing") is None
+        assert reloaded.resolve(str(current)) == current, "Local directories are used as-is"
+        print(f"   ✓ {len(reloaded.entries())} entry persisted to {manifest_path.name}")
+
+        print("\n3. Deleted snapshots and refresh requests fall back to the hub...")
+        reloaded.refresh("org/model")
+        assert reloaded.resolve("org/model") is None
+        assert reloaded.record_download("org/model", cache_dir) == current
+        assert reloaded.resolve("org/model") == current.resolve()
+        for path in current.iterdir():
+            path.unlink()
+        current.rmdir()
+        assert reloaded.resolve("org/model") is None
+        assert "org/model" not in reloaded
+        print("   ✓ Refresh forces one hub load; stale entries are dropped")
+
+        print("\n4. torch.hub checkouts resolve to a local repo...")
+        checkout = hub_dir / "intel-isl_MiDaS_master"
+        checkout.mkdir(parents=True)
+        (checkout / "hubconf.py").write_text("")
+        assert manifest.resolve_hub_repo("intel-isl/MiDaS") == checkout
+        assert manifest.entries()["intel-isl/MiDaS"]['source'] == TORCH_HUB
+        assert manifest.resolve_hub_repo("intel-isl/Other") is None
+        print("   ✓ Checkout found without resolving the default branch online")
+
+        print("\n5. Pipelines load from the snapshot by model ID...")
+        from core.image_generator import ImageGenerator
+
+        snapshot = cache_dir / "models--test-org--tiny-sdxl" / "snapshots" / "ccc"
+        base_dir, _ = save_tiny_sdxl(tmp / "tiny")
+        snapshot.parent.mkdir(parents=True)
+        base_dir.rename(snapshot)
+        get_model_manifest().configure(manifest_path, search_dirs=[], hub_dir=hub_dir)
+        try:
+            # Not a hub repository: this only loads if nothing is requested online
+            generator = ImageGenerator(model_name="test-org/tiny-sdxl", cache_dir=cache_dir,
+                                       hardware_config={'device': "cpu"})
+            generator.load_model()
+            assert generator.pipe is not None
+            assert get_model_manifest().entries()["test-org/tiny-sdxl"]['path'] == str(snapshot.resolve())
+            generator.unload_model()
+        finally:
+            get_model_manifest().configure()
+        print("   ✓ test-org/tiny-sdxl loaded from the local snapshot")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_model_manifest()
+        print("\n" + "=" * 70)
+        print("MODEL MANIFEST TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("MODEL MANIFEST TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
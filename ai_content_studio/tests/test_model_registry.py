@@ -0,0 +1,136 @@
+"""
+Test script for the shared Model Registry
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.model_registry import ModelRegistry, GB
+
+
+class _FakeModel:
+    """Stand-in for a loaded pipeline"""
+
+    def __init__(self, name):
+        self.name = name
+        self.unloaded = False
+
+    def unload_model(self):
+        self.unloaded = True
+
+
+def test_model_registry():
+    """Test caching, single-load and LRU eviction"""
+    print("=" * 70)
+    print("Testing Model Registry")
+    print("=" * 70)
+
+    registry = ModelRegistry(ram_budget_gb=2, vram_budget_gb=None)
+    load_count = {"a": 0}
+
+    def load_a():
+        load_count["a"] += 1
+        time.sleep(0.05)
+        return _FakeModel("a")
+
+    print("\n1. Loading the same key twice...")
+    first = registry.get_or_load("a", load_a, device="cpu", size_bytes=GB)
+    second = registry.get_or_load("a", load_a, device="cpu", size_bytes=GB)
+    assert first is second
+    assert load_count["a"] == 1
+    print("   ✓ Second request reused the resident model")
+
+    print("\n2. Concurrent requests wait on a single load...")
+    results = []
+    load_count["a"] = 0
+    registry.release("a")
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            registry.get_or_load("a", load_a, device="cpu", size_bytes=GB)
+        ))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load_count["a"] == 1
+    assert all(result is results[0] for result in results)
+    print("   ✓ Four concurrent requests triggered one load")
+
+    print("\n3. Exceeding the RAM budget evicts the least-recently-used model...")
+    model_b = registry.get_or_load("b", lambda: _FakeModel("b"), device="cpu", size_bytes=GB)
+    registry.get("a")  # 'a' is now most recently used
+    registry.get_or_load("c", lambda: _FakeModel("c"), device="cpu", size_bytes=GB)
+    assert "b" not in registry
+    assert "a" in registry and "c" in registry
+    assert model_b.unloaded
+    print("   ✓ Evicted 'b', kept 'a' and 'c'")
+
+    print("\n4. VRAM entries do not count against the RAM budget...")
+    registry.get_or_load("gpu", lambda: _FakeModel("gpu"), device="cuda", size_bytes=4 * GB)
+    assert "gpu" in registry and "a" in registry and "c" in registry
+    print("   ✓ GPU model kept alongside RAM models")
+
+    print("\n5. Releasing a model...")
+    assert registry.release("gpu")
+    assert not registry.release("gpu")
+    print("   ✓ Release removes the entry once")
+
+    print("\n6. Users of a key share one usage lock, also across evictions...")
+    lock = registry.usage_lock("a")
+    assert registry.usage_lock("a") is lock
+    assert registry.usage_lock("c") is not lock
+    registry.release("a")
+    assert registry.usage_lock("a") is lock
+    print("   ✓ Same lock per key")
+
+    print("\n7. Evicting a model that is in use does not unload it...")
+    busy = registry.get_or_load("busy", lambda: _FakeModel("busy"), device="cpu", size_bytes=GB)
+    held, done = threading.Event(), threading.Event()
+
+    def hold():
+        with registry.usage_lock("busy"):
+            held.set()
+            done.wait()
+
+    worker = threading.Thread(target=hold)
+    worker.start()
+    held.wait()
+    assert registry.release("busy")
+    done.set()
+    worker.join()
+    assert not busy.unloaded, "unloaded while another thread was using it"
+
+    own = registry.get_or_load("own", lambda: _FakeModel("own"), device="cpu", size_bytes=GB)
+    with registry.usage_lock("own"):
+        assert registry.release("own")
+    assert not own.unloaded, "unloaded while this thread was using it"
+
+    idle = registry.get_or_load("idle", lambda: _FakeModel("idle"), device="cpu", size_bytes=GB)
+    assert registry.release("idle")
+    assert idle.unloaded
+    assert registry.usage_lock("idle").acquire(blocking=False)
+    registry.usage_lock("idle").release()
+    print("   ✓ Busy models are only dropped; idle ones are unloaded")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_model_registry()
+        print("\n" + "=" * 70)
+        print("MODEL REGISTRY TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("MODEL REGISTRY TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Test script for the memory-budgeted Offload Policy
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.offload import OffloadPolicy, estimate_peak_bytes
+
+
+def test_offload_policy():
+    """Test execution mode selection against memory budgets"""
+    print("=" * 70)
+    print("Testing Offload Policy")
+    print("=" * 70)
+
+    print("\n1. Peak memory shrinks from resident to sequential offload...")
+    peaks = estimate_peak_bytes("sdxl")
+    assert peaks["resident"] > peaks["model_cpu_offload"] > peaks["sequential_offload"]
+    assert estimate_peak_bytes("sdxl", dtype_bits=32)["resident"] > peaks["resident"]
+    assert estimate_peak_bytes("sdxl", use_refiner=True)["resident"] > peaks["resident"]
+    print("   ✓ Estimates ordered as expected")
+
+    print("\n2. Auto mode picks the fastest mode that fits the budget...")
+    expected = {24: "resident", 8: "model_cpu_offload", 4: "sequential_offload"}
+    for budget_gb, mode in expected.items():
+        chosen = OffloadPolicy(memory_budget_gb=budget_gb).choose_mode("cuda", "sdxl")
+        assert chosen == mode, f"{budget_gb} GB: expected {mode}, got {chosen}"
+        print(f"   ✓ SDXL with {budget_gb} GB -> {chosen}")
+    assert OffloadPolicy(memory_budget_gb=8).choose_mode("cuda", "sd") == "resident"
+
+    print("\n3. Explicit modes and CPU inference...")
+    policy = OffloadPolicy(offload_mode="sequential_offload", memory_budget_gb=24)
+    assert policy.choose_mode("cuda", "sdxl") == "sequential_offload"
+    assert policy.choose_mode("cpu", "sdxl") == "resident"
+    try:
+        OffloadPolicy(offload_mode="disk")
+        assert False, "Unknown mode should be rejected"
+    except ValueError:
+        pass
+    print("   ✓ Explicit mode honored, CPU always resident, bad mode rejected")
+
+    print("\n4. Device selection from config...")
+    assert OffloadPolicy.from_config({'use_gpu': False}).resolve_device() == "cpu"
+    assert OffloadPolicy.from_config({'device': "cpu"}).resolve_device() == "cpu"
+    print("   ✓ use_gpu: false and device: cpu force the CPU")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_offload_policy()
+        print("\n" + "=" * 70)
+        print("OFFLOAD POLICY TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("OFFLOAD POLICY TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""
+Test script for the Output Store asset index
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.output_store import OutputStore, new_asset_id
+
+
+def test_output_store():
+    """Test unique IDs, recording, parent links and queries"""
+    print("=" * 70)
+    print("Testing Output Store")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        store = OutputStore(tmp / "index.sqlite")
+
+        print("\n1. Asset IDs are unique within the same second...")
+        ids = {new_asset_id() for _ in range(1000)}
+        assert len(ids) == 1000
+        print("   ✓ 1000 unique IDs")
+
+        print("\n2. Recording an image and a 3D model derived from it...")
+        image_path = tmp / "image.png"
+        image_path.write_bytes(b"png" * 10)
+        image_id = store.record("image", image_path, params={'prompt': "a mug", 'seed': 1},
+                                timings={'generate_s': 1.5})
+
+        model_path = tmp / "model.glb"
+        model_path.write_bytes(b"glb")
+        parent = store.find_by_path(image_path)
+        model_id = store.record("model_3d", model_path, params={'method': "extrusion"},
+                                parent_id=parent['id'])
+
+        image = store.get(image_id)
+        assert image['size_bytes'] == 30
+        assert image['params']['prompt'] == "a mug"
+        assert image['timings']['generate_s'] == 1.5
+        assert store.get(model_id)['parent_id'] == image_id
+        print(f"   ✓ Model {model_id} linked to image {image_id}")
+
+        print("\n3. Querying the index...")
+        assert [a['id'] for a in store.query(asset_type="image")] == [image_id]
+        assert [a['id'] for a in store.query(parent_id=image_id)] == [model_id]
+        assert store.latest("model_3d")['path'] == model_path.resolve()
+        assert store.counts() == {'image': 1, 'model_3d': 1}
+        print("   ✓ Type, parent and latest queries")
+
+        print("\n4. Deleted files drop out of the index...")
+        model_path.unlink()
+        assert store.latest("model_3d") is None
+        assert store.prune_missing() == 1
+        assert store.counts() == {'image': 1}
+        print("   ✓ Missing files pruned")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_output_store()
+        print("\n" + "=" * 70)
+        print("OUTPUT STORE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("OUTPUT STORE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,125 @@
+"""
+Test script for per-stage profiling of ImageGenerator
+
+Uses the tiny randomly-initialized SDXL base and refiner from
+tiny_models.py, so it runs offline in a few seconds.
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.image_generator import ImageGenerator
+from core.profiling import GenerationProfile, current_profile, profile_stage
+from tiny_models import save_tiny_sdxl
+
+
+def test_profiling():
+    """Test stage nesting, generate()/load_model() instrumentation and the JSONL log"""
+    print("=" * 70)
+    print("Testing Per-Stage Profiling")
+    print("=" * 70)
+
+    print("\n1. Nested stages are exclusive...")
+    profile = GenerationProfile(label="unit", sample_interval=0.005)
+    with profile.activate():
+        assert current_profile() is profile
+        with profile_stage("outer"):
+            time.sleep(0.05)
+            with profile_stage("inner"):
+                time.sleep(0.05)
+        with profile_stage("inner"):
+            time.sleep(0.02)
+    assert current_profile() is None
+    seconds = profile.stage_seconds()
+    assert 0.04 <= seconds["outer"] < 0.09, seconds
+    assert seconds["inner"] >= 0.07, seconds
+    assert profile.stages["inner"].calls == 2
+    assert abs(sum(seconds.values()) + profile.other_s() - profile.total_s) < 1e-6
+    assert profile.stages["outer"].peak_rss_bytes > 0
+    print(f"   ✓ outer {seconds['outer']:.3f}s, inner {seconds['inner']:.3f}s (2 calls)")
+
+    with profile_stage("no-profile"):
+        pass
+    print("   ✓ profile_stage() is a no-op without an active profile")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, refiner_dir = save_tiny_sdxl(tmp)
+        log_path = tmp / "logs" / "profile.jsonl"
+        generator = ImageGenerator(
+            model_name=str(base_dir), use_refiner=True, refiner_model=str(refiner_dir),
+            hardware_config={'device': "cpu"}, profile_log=log_path
+        )
+
+        print("\n2. load_model() records its own profile...")
+        load_profile = GenerationProfile()
+        generator.load_model(profile=load_profile)
+        assert load_profile.label == "load_model"
+        assert {"load_model", "encode"} <= set(load_profile.stages)
+        assert generator.last_profile is load_profile
+        print(f"   ✓ Loaded in {load_profile.total_s:.2f}s")
+
+        print("\n3. generate() breaks the request into stages...")
+        profile = GenerationProfile()
+        path = generator.generate(
+            "a red cube", num_inference_steps=4, width=64, height=64, seed=3,
+            output_dir=tmp / "out", profile=profile
+        )
+        assert path.exists()
+        stages = set(profile.stages)
+        for stage in ("encode", "denoise", "vae_decode", "refiner", "save"):
+            assert stage in stages, stages
+        assert "load_model" not in stages, "model was already loaded"
+        assert profile.params['seed'] == 3
+        staged = sum(profile.stage_seconds().values())
+        assert staged <= profile.total_s + 1e-6 and profile.other_s() < 0.5 * profile.total_s
+        assert profile.peak_rss_bytes > 0
+        print(profile.format_table())
+        print(f"   ✓ {staged:.3f}s of {profile.total_s:.3f}s inside stages")
+
+        print("\n4. Calls without a profile are logged to profile_log...")
+        generator.generate(
+            "a blue sphere", num_inference_steps=4, width=64, height=64,
+            output_dir=tmp / "out"
+        )
+        assert generator.last_profile is not None and generator.last_profile is not profile
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [record['label'] for record in records] == ["load_model", "generate", "generate"]
+        names = {stage['name'] for stage in records[-1]['stages']}
+        assert {"encode", "denoise", "vae_decode"} <= names, names
+        assert records[-1]['params']['prompt'].startswith("a blue sphere")
+        print(f"   ✓ {len(records)} JSONL records in {log_path.name}")
+
+        print("\n5. Without profile_log or a profile, nothing is recorded...")
+        quiet = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+        quiet.generate("a red cube", num_inference_steps=2, width=64, height=64,
+                       output_dir=tmp / "out")
+        assert quiet.last_profile is None
+        assert current_profile() is None
+        print("   ✓ No profile kept")
+
+        generator.unload_model()
+        quiet.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_profiling()
+        print("\n" + "=" * 70)
+        print("PROFILING TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("PROFILING TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,125 @@
+"""
+Test script for the prompt embedding cache
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import torch
+from PIL import Image
+
+from core.image_generator import ImageGenerator
+from core.prompt_cache import get_prompt_cache
+from tiny_models import save_tiny_sdxl
+
+
+def _pixels(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+class EncoderCalls:
+    """Count forward calls of a pipeline's text encoders"""
+
+    def __init__(self, pipe):
+        self.count = 0
+        self._handles = [
+            encoder.register_forward_pre_hook(lambda module, args: self._record())
+            for encoder in (pipe.text_encoder, pipe.text_encoder_2) if encoder is not None
+        ]
+
+    def _record(self):
+        self.count += 1
+
+    def close(self):
+        for handle in self._handles:
+            handle.remove()
+
+
+def test_prompt_cache():
+    """Test cache hits, key separation, the precomputed negative and unchanged output"""
+    print("=" * 70)
+    print("Testing Prompt Embedding Cache")
+    print("=" * 70)
+
+    cache = get_prompt_cache()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+        request = dict(prompt="a red cube", num_inference_steps=2, width=64, height=64,
+                       seed=3, output_dir=tmp / "out")
+
+        print("\n1. The default negative prompt is encoded on load...")
+        generator.load_model()
+        model_key = generator._embedding_key()
+        negative = generator._enhance_negative_prompt("")
+        misses = cache.misses
+        with torch.inference_mode():
+            cache.encode(generator.pipe, model_key, negative, generator.device)
+        assert cache.misses == misses, "default negative was not precomputed"
+        print("   ✓ Default negative served from the cache")
+
+        print("\n2. Repeated prompts skip the text encoders...")
+        calls = EncoderCalls(generator.pipe)
+        try:
+            first = generator.generate(**request)
+            assert calls.count > 0, "first generation must encode the prompt"
+            calls.count = 0
+            hits = cache.hits
+            second = generator.generate(**request)
+            assert calls.count == 0, f"{calls.count} text encoder calls on a cache hit"
+            assert cache.hits >= hits + 2, "prompt and negative should both hit"
+        finally:
+            calls.close()
+        print("   ✓ No text encoder calls for the repeated request")
+
+        print("\n3. The key includes clip_skip and the model...")
+        prompt = generator._enhance_prompt("a red cube")
+        with torch.inference_mode():
+            misses = cache.misses
+            default = cache.encode(generator.pipe, model_key, prompt, generator.device)
+            assert cache.misses == misses
+            skipped = cache.encode(generator.pipe, model_key, prompt, generator.device, clip_skip=1)
+            assert cache.misses == misses + 1
+            other = cache.encode(generator.pipe, ("other-model",) + model_key[1:], prompt, generator.device)
+            assert cache.misses == misses + 2
+        assert not torch.equal(default[0], skipped[0]), "clip_skip must change the embeddings"
+        assert torch.equal(default[0], other[0])
+        print("   ✓ clip_skip and model name give separate entries")
+
+        print("\n4. Cached embeddings give the same image as fresh ones...")
+        cache.clear(model_key)
+        assert not any(key[0] == model_key for key in cache._entries)
+        uncached = generator.generate(**request)
+        assert np.array_equal(_pixels(first), _pixels(second))
+        assert np.array_equal(_pixels(second), _pixels(uncached))
+        print("   ✓ Identical pixels with and without cache hits")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_prompt_cache()
+        print("\n" + "=" * 70)
+        print("PROMPT CACHE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("PROMPT CACHE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,111 @@
+"""
+Test script for the dynamic int8 CPU quantization mode
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import torch
+
+from core.cpu_profile import CPUInferenceProfile
+from core.image_generator import ImageGenerator
+from core.memory_utils import estimate_size_bytes
+from core.quantization import is_int8_quantized
+from tiny_models import save_tiny_sdxl
+
+
+def test_quantization():
+    """Test int8 quantization, the on-disk cache and cache-key separation"""
+    print("=" * 70)
+    print("Testing Int8 Quantization")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        int8_dir = tmp / "int8"
+
+        def new_generator(int8):
+            profile = CPUInferenceProfile(bf16=True, channels_last=False, int8=int8,
+                                          int8_cache_dir=str(int8_dir))
+            return ImageGenerator(model_name=str(base_dir), cpu_profile=profile,
+                                  hardware_config={'device': "cpu"})
+
+        def generate(generator):
+            return generator._run_pipeline(["a red cube"], ["blurry"], [3], 2, 5.0, 64, 64)[0]
+
+        print("\n1. int8 is opt-in and turns off bf16 autocast...")
+        fp32 = new_generator(False)
+        fp32.load_model()
+        assert not is_int8_quantized(fp32.pipe.unet)
+        fp32_bytes = estimate_size_bytes(fp32.pipe.unet)
+        int8 = new_generator(True)
+        assert not int8.cpu_profile.bf16
+        assert int8._registry_key() != fp32._registry_key()
+        assert int8._embedding_key() != fp32._embedding_key()
+        print("   ✓ Separate registry and prompt-embedding keys")
+
+        print("\n2. Text encoders and UNet are quantized and cached...")
+        int8.load_model()
+        for name in ("text_encoder", "text_encoder_2", "unet"):
+            assert is_int8_quantized(getattr(int8.pipe, name)), name
+        assert not is_int8_quantized(int8.pipe.vae)
+        assert len(list(int8_dir.glob("*.pt"))) == 3
+        for path in int8_dir.glob("*.pt"):
+            entry = torch.load(path, weights_only=True)  # State dicts, not pickled modules
+            assert set(entry) == {'class', 'config', 'state_dict'}, path.name
+        int8_bytes = estimate_size_bytes(int8.pipe.unet)
+        assert int8_bytes < fp32_bytes
+        image = generate(int8)
+        assert image.size == (64, 64)
+        print(f"   ✓ UNet {fp32_bytes / 1024 ** 2:.1f} MB -> {int8_bytes / 1024 ** 2:.1f} MB")
+
+        print("\n3. Later loads read the cached int8 modules...")
+        int8.unload_model()
+        written = {path: path.stat().st_mtime_ns for path in int8_dir.glob("*.pt")}
+        cached = new_generator(True)
+        cached.load_model()
+        assert written == {path: path.stat().st_mtime_ns for path in int8_dir.glob("*.pt")}, \
+            "Requantized despite the cache"
+        assert is_int8_quantized(cached.pipe.unet)
+        assert np.array_equal(np.asarray(generate(cached)), np.asarray(image))
+        print("   ✓ No requantization; same output as the first load")
+
+        print("\n4. Quantized and bf16 results get their own result-cache keys...")
+        params = cached._request_params("p", "n", 1, 2, 5.0, 64, 64, False)
+        assert params['quantization'] == "int8" and 'autocast' not in params
+        bf16_params = fp32._request_params("p", "n", 1, 2, 5.0, 64, 64, False)
+        assert 'quantization' not in bf16_params
+        assert bf16_params['autocast'] == "torch.bfloat16"
+        plain = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+        plain_params = plain._request_params("p", "n", 1, 2, 5.0, 64, 64, False)
+        assert 'quantization' not in plain_params and 'autocast' not in plain_params
+        print("   ✓ fp32 keys unchanged")
+
+        cached.unload_model()
+        fp32.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_quantization()
+        print("\n" + "=" * 70)
+        print("INT8 QUANTIZATION TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("INT8 QUANTIZATION TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,135 @@
+"""
+Test script for the SDXL base/refiner module sharing and latent handoff
+
+Uses the tiny randomly-initialized SDXL base and refiner from tiny_models.py,
+so it runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(BASE_DIR / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import torch
+
+from core.image_generator import ImageGenerator, REFINER_HANDOFF
+from core.memory_utils import estimate_size_bytes
+from core.offload import OffloadPolicy
+from tiny_models import save_tiny_sdxl
+
+
+def test_refiner_sharing():
+    """Test that the refiner reuses base modules and continues the base latents"""
+    print("=" * 70)
+    print("Testing SDXL Refiner Sharing")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir, refiner_dir = save_tiny_sdxl(Path(tmp))
+
+        generator = ImageGenerator(
+            model_name=str(base_dir),
+            use_refiner=True,
+            refiner_model=str(refiner_dir),
+            hardware_config={'device': "cpu"},
+        )
+        generator.load_model()
+        pipe, refiner = generator.pipe, generator.refiner
+        assert refiner is not None, "Refiner was not loaded"
+
+        print("\n1. Refiner reuses the base text encoder and VAE...")
+        assert refiner.text_encoder_2 is pipe.text_encoder_2
+        assert refiner.tokenizer_2 is pipe.tokenizer_2
+        assert refiner.vae is pipe.vae
+        assert refiner.unet is not pipe.unet
+        print("   ✓ text_encoder_2, tokenizer_2 and VAE are the same objects")
+
+        print("\n2. Refiner mode only adds the refiner UNet in memory...")
+        combined = estimate_size_bytes((pipe, refiner))
+        expected = estimate_size_bytes(pipe) + estimate_size_bytes(refiner.unet)
+        assert combined == expected, f"{combined} != {expected}"
+        print(f"   ✓ Base + refiner: {combined / 1024 ** 2:.1f} MB")
+
+        print("\n3. Base latents are handed to the refiner at the switch point...")
+        steps = 10
+        progress = []
+        handoff = {}
+        refine_latents = generator._refine_latents
+
+        def capture_handoff(latents, *args, **kwargs):
+            handoff['latents'] = latents
+            handoff['base_steps'] = len(progress)
+            return refine_latents(latents, *args, **kwargs)
+
+        generator._refine_latents = capture_handoff
+        image = generator._run_pipeline(
+            ["a red cube"], ["blurry"], [42], steps, 5.0, 64, 64,
+            step_callback=generator._make_step_callback(
+                steps, 1, progress_callback=lambda done, total: progress.append((done, total))
+            )
+        )[0]
+
+        latents = handoff['latents']
+        assert tuple(latents.shape) == (1, 4, 32, 32), latents.shape
+        assert handoff['base_steps'] == pipe.num_timesteps
+        assert 0 < handoff['base_steps'] < steps
+        # Base and refiner split one schedule: every step runs exactly once
+        assert len(progress) == steps, progress
+        assert progress[-1] == (steps, steps)
+        assert image.size == (64, 64)
+        print(f"   ✓ Base ran {handoff['base_steps']} steps, refiner "
+              f"{steps - handoff['base_steps']} (handoff at {REFINER_HANDOFF:.0%})")
+
+        print("\n4. Model CPU offload of the refiner leaves the base pipeline working...")
+        del generator._refine_latents
+
+        def base_only():
+            return np.asarray(pipe("a red cube", num_inference_steps=2, width=64, height=64,
+                                   generator=torch.Generator().manual_seed(7)).images[0])
+
+        def base_and_refiner():
+            return np.asarray(generator._run_pipeline(
+                ["a red cube"], ["blurry"], [42], steps, 5.0, 64, 64
+            )[0])
+
+        expected = base_only(), base_and_refiner()
+        policy = OffloadPolicy()
+        try:
+            assert policy.apply(pipe, "model_cpu_offload", "cpu") == "model_cpu_offload"
+            assert policy.apply(refiner, "model_cpu_offload", "cpu") == "model_cpu_offload"
+            # The refiner's offload re-hooks the shared modules for its own chain
+            assert any(hook.model is pipe.vae for hook in refiner._all_hooks)
+            assert any(hook.model is pipe.text_encoder_2 for hook in refiner._all_hooks)
+            for _ in range(2):
+                assert np.array_equal(base_only(), expected[0])
+                assert np.array_equal(base_and_refiner(), expected[1])
+                for module in (pipe.text_encoder_2, pipe.unet, pipe.vae, refiner.unet):
+                    assert hasattr(module, "_hf_hook"), "offload hook lost"
+        finally:
+            pipe.remove_all_hooks()
+            refiner.remove_all_hooks()
+        print("   ✓ Same images as resident, every module still hooked after each call")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_refiner_sharing()
+        print("\n" + "=" * 70)
+        print("REFINER SHARING TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("REFINER SHARING TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
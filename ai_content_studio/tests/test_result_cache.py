@@ -0,0 +1,68 @@
+"""
+Test script for the on-disk Result Cache
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+
+from core.result_cache import ResultCache
+
+
+def test_result_cache():
+    """Test key hashing, hits and LRU eviction"""
+    print("=" * 70)
+    print("Testing Result Cache")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("\n1. Keys are stable and parameter-sensitive...")
+        key_a = ResultCache.make_key(prompt="a red apple", seed=1, steps=30)
+        key_b = ResultCache.make_key(steps=30, seed=1, prompt="a red apple")
+        key_c = ResultCache.make_key(prompt="a red apple", seed=2, steps=30)
+        assert key_a == key_b
+        assert key_a != key_c
+        print("   ✓ Same parameters hash to the same key")
+
+        print("\n2. Storing and retrieving an image...")
+        # Cap at ~3 noise images (random data so PNG cannot compress it)
+        image = Image.effect_noise((256, 256), 64).convert("RGB")
+        cache = ResultCache(Path(tmp), max_size_mb=0.5)
+        assert cache.get(key_a) is None
+        cache.put(key_a, image)
+        hit = cache.get(key_a)
+        assert hit is not None and hit.exists()
+        assert Image.open(hit).size == (256, 256)
+        print(f"   ✓ Cache hit: {hit.name}")
+
+        print("\n3. Least-recently-used entries are evicted over the size cap...")
+        keys = [ResultCache.make_key(prompt="noise", seed=i) for i in range(6)]
+        for key in keys:
+            time.sleep(0.01)
+            cache.put(key, image)
+        assert cache.size_bytes() <= cache.max_size_bytes
+        assert cache.get(keys[-1]) is not None
+        assert cache.get(keys[0]) is None
+        print(f"   ✓ Cache size {cache.size_bytes() / 1024:.0f} KB within cap")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_result_cache()
+        print("\n" + "=" * 70)
+        print("RESULT CACHE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("RESULT CACHE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,98 @@
+"""
+Test script for generators sharing one registry pipeline across threads
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from core.image_generator import ImageGenerator
+from tiny_models import save_tiny_sdxl
+
+
+def _pixels(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_shared_pipeline():
+    """Test that concurrent generate() calls on a shared pipeline do not interfere"""
+    print("=" * 70)
+    print("Testing Shared Pipeline Concurrency")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+
+        # Two generators, like the image tab and text-to-3D on the same model
+        generators = [
+            ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+            for _ in range(2)
+        ]
+        for generator in generators:
+            generator.load_model()
+
+        print("\n1. Generators share the registry pipeline and its lock...")
+        assert generators[0].pipe is generators[1].pipe
+        assert generators[0]._pipe_lock is generators[1]._pipe_lock
+        print("   ✓ One pipeline, one lock")
+
+        print("\n2. Concurrent generations with different seeds...")
+        results = [None, None]
+
+        def run(i):
+            try:
+                results[i] = generators[i].generate(
+                    "a red cube", num_inference_steps=10, width=64, height=64,
+                    seed=i + 1, output_dir=tmp / f"thread{i}"
+                )
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(120)
+        assert all(isinstance(result, Path) for result in results), results
+        print("   ✓ Both generations finished")
+
+        print("\n3. Each output matches a sequential run with its seed...")
+        for i, generator in enumerate(generators):
+            expected = generator.generate(
+                "a red cube", num_inference_steps=10, width=64, height=64,
+                seed=i + 1, output_dir=tmp / "sequential"
+            )
+            assert np.array_equal(_pixels(results[i]), _pixels(expected)), f"seed {i + 1} differs"
+        print("   ✓ Identical to the sequential images")
+
+        for generator in generators:
+            generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_shared_pipeline()
+        print("\n" + "=" * 70)
+        print("SHARED PIPELINE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("SHARED PIPELINE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
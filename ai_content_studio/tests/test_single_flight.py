@@ -0,0 +1,213 @@
+"""
+Test script for single-flight deduplication of concurrent identical requests
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from core.image_generator import ImageGenerator, GenerationCancelled
+from core.single_flight import SingleFlight, get_single_flight
+from tiny_models import save_tiny_sdxl
+
+
+def _wait_for(condition, timeout: float = 30):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def _run_threads(*targets) -> list:
+    """Run callables on threads; returns their results (or exceptions)"""
+    results = [None] * len(targets)
+
+    def run(i, target):
+        try:
+            results[i] = target()
+        except BaseException as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, t)) for i, t in enumerate(targets)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    return results
+
+
+def test_single_flight():
+    """Test result sharing, error propagation, cancellation and generate() integration"""
+    print("=" * 70)
+    print("Testing Single-Flight Deduplication")
+    print("=" * 70)
+
+    print("\n1. Concurrent calls with one key run once...")
+    group = SingleFlight(poll_interval=0.01)
+    release = threading.Event()
+    runs = []
+
+    def slow(value):
+        def fn():
+            runs.append(value)
+            release.wait(30)
+            return value
+        return fn
+
+    def release_when_waiting(waiters):
+        _wait_for(lambda: group.shared >= waiters)
+        release.set()
+        return None
+
+    results = _run_threads(
+        lambda: group.do("a", slow(1)), lambda: group.do("a", slow(2)),
+        lambda: group.do("a", slow(3)), lambda: release_when_waiting(2),
+    )
+    assert len(runs) == 1 and group.executions == 1, runs
+    assert sorted(shared for _, shared in results[:3]) == [False, True, True]
+    assert {result for result, _ in results[:3]} == {runs[0]}
+    assert group.in_flight() == 0
+    assert group.do("b", lambda: "b") == ("b", False)
+    print("   ✓ 1 execution shared by 3 callers; later calls run again")
+
+    print("\n2. Errors reach every waiting caller...")
+    release.clear()
+
+    def failing():
+        release.wait(30)
+        raise RuntimeError("denoise failed")
+
+    shared_before = group.shared
+    results = _run_threads(
+        lambda: group.do("c", failing), lambda: group.do("c", failing),
+        lambda: release_when_waiting(shared_before + 1),
+    )
+    assert all(isinstance(result, RuntimeError) for result in results[:2]), results
+    print("   ✓ Both callers got the RuntimeError")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+
+        def new_generator():
+            return ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+
+        print("\n3. Waiting callers whose leader was cancelled run the request...")
+        generator = new_generator()
+        flights = get_single_flight()
+        leader_cancel = threading.Event()
+        computed = []
+
+        def cancelled_compute():
+            _wait_for(lambda: flights.shared > shared_at_start)
+            leader_cancel.set()
+            raise GenerationCancelled("Generation cancelled")
+
+        def compute():
+            computed.append(1)
+            return "image", {'generate_s': 0.0}
+
+        shared_at_start = flights.shared
+        results = _run_threads(
+            lambda: generator._single_flight("cancel-key", cancelled_compute, leader_cancel),
+            lambda: (_wait_for(lambda: flights.in_flight("cancel-key")),
+                     generator._single_flight("cancel-key", compute, threading.Event()))[1],
+        )
+        assert isinstance(results[0], GenerationCancelled), results
+        assert results[1][0] == "image" and computed == [1], results
+        print("   ✓ Leader cancelled, follower generated the image itself")
+
+        print("\n4. Concurrent identical generate() calls denoise once...")
+        denoises = []
+        original_run = ImageGenerator._run_pipeline
+
+        def counting_run(self, *args, **kwargs):
+            denoises.append(self)
+            _wait_for(lambda: flights.shared > shared_at_start)  # second caller is waiting
+            return original_run(self, *args, **kwargs)
+
+        # Two generators, like two GUI tabs with the same model
+        tabs = [new_generator(), new_generator()]
+        shared_at_start = flights.shared
+        ImageGenerator._run_pipeline = counting_run
+        try:
+            paths = _run_threads(*[
+                (lambda tab=tab, i=i: tab.generate(
+                    "a red cube", num_inference_steps=2, width=64, height=64, seed=11,
+                    output_dir=tmp / f"tab{i}"
+                ))
+                for i, tab in enumerate(tabs)
+            ])
+        finally:
+            ImageGenerator._run_pipeline = original_run
+        assert all(isinstance(path, Path) for path in paths), paths
+        assert len(denoises) == 1, f"{len(denoises)} denoises"
+        assert paths[0] != paths[1] and paths[0].parent.name == "tab0"
+        pixels = [np.asarray(Image.open(path)) for path in paths]
+        assert np.array_equal(pixels[0], pixels[1])
+        print(f"   ✓ 1 denoise, 2 copies: {paths[0].name}, {paths[1].name}")
+
+        print("\n5. Batched requests share seeded images with generate()...")
+        denoised = []
+
+        def counting_batch_run(self, prompts, *args, **kwargs):
+            denoised.extend(prompts)
+            _wait_for(lambda: flights.shared > shared_at_start)
+            return original_run(self, prompts, *args, **kwargs)
+
+        shared_at_start = flights.shared
+        ImageGenerator._run_pipeline = counting_batch_run
+        try:
+            single, batch = _run_threads(
+                lambda: tabs[0].generate("a blue sphere", num_inference_steps=2, width=64, height=64,
+                                         seed=21, output_dir=tmp / "tab0"),
+                lambda: tabs[1].generate_batch(["a blue sphere"], num_inference_steps=2, width=64,
+                                               height=64, num_images_per_prompt=2, seeds=[21, 22],
+                                               output_dir=tmp / "tab1"),
+            )
+        finally:
+            ImageGenerator._run_pipeline = original_run
+        assert isinstance(single, Path) and isinstance(batch, list), (single, batch)
+        assert len(denoised) == 2, f"{len(denoised)} images denoised for 3 requested"
+        assert np.allclose(np.asarray(Image.open(single)), np.asarray(Image.open(batch[0])), atol=2)
+        print("   ✓ 3 images, 2 denoised: seed 21 shared between generate() and the batch")
+
+        print("\n6. Unseeded requests are not deduplicated...")
+        executions = flights.executions
+        tabs[0].generate("a red cube", num_inference_steps=1, width=64, height=64,
+                         output_dir=tmp / "tab0")
+        assert flights.executions == executions
+        print("   ✓ Random-seed requests always run")
+
+        for tab in tabs:
+            tab.unload_model()
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_single_flight()
+        print("\n" + "=" * 70)
+        print("SINGLE-FLIGHT TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("SINGLE-FLIGHT TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,118 @@
+"""
+Test script for the draft/balanced/final speed presets
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.image_generator import ImageGenerator, SPEED_PRESETS
+from core.result_cache import ResultCache
+from tiny_models import save_tiny_sdxl
+
+
+def _count_set_timesteps(scheduler, calls: list):
+    """Record each set_timesteps() call on one scheduler instance"""
+    original = scheduler.set_timesteps
+    scheduler.set_timesteps = lambda *args, **kwargs: calls.append(scheduler) or original(*args, **kwargs)
+
+
+def test_speed_presets():
+    """Test preset schedulers and step counts, the shared base scheduler and cache keys"""
+    print("=" * 70)
+    print("Testing Speed Presets")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"},
+                                   result_cache=ResultCache(tmp / "cache"))
+        generator.load_model()
+        base_scheduler = generator.pipe.scheduler
+        base_config = dict(base_scheduler.config)
+        request = dict(prompt="a red cube", num_inference_steps=3, width=64, height=64,
+                       seed=3, output_dir=tmp / "output", tiny_vae=False)
+
+        scheduled = []
+        _count_set_timesteps(base_scheduler, scheduled)
+
+        print("\n1. Each preset runs its scheduler and step count...")
+        for preset, spec in SPEED_PRESETS.items():
+            pipe = generator._pipeline_for_preset(preset)
+            if spec["scheduler"] is None:
+                assert pipe is generator.pipe
+                expected = base_scheduler
+            else:
+                assert pipe is not generator.pipe and pipe.unet is generator.pipe.unet
+                assert type(pipe.scheduler).__name__ == spec["scheduler"]
+                for name, value in spec["scheduler_options"].items():
+                    assert pipe.scheduler.config[name] == value, (preset, name)
+                assert generator._pipeline_for_preset(preset) is pipe, "preset pipe not reused"
+                expected = pipe.scheduler
+                _count_set_timesteps(expected, scheduled)
+
+            progress = []
+            scheduled.clear()
+            generator.generate(**request, preset=preset,
+                               progress_callback=lambda done, total: progress.append(total))
+            assert progress and set(progress) == {spec["steps"]}, (preset, set(progress))
+            assert scheduled and all(s is expected for s in scheduled), f"{preset} used another scheduler"
+            print(f"   ✓ {preset}: {type(expected).__name__}, {spec['steps']} steps (3 requested)")
+
+        print("\n2. The shared base scheduler is left untouched...")
+        assert generator.pipe.scheduler is base_scheduler
+        assert type(base_scheduler).__name__ == "EulerAncestralDiscreteScheduler"
+        assert dict(base_scheduler.config) == base_config
+        print("   ✓ Base pipeline still runs EulerAncestralDiscreteScheduler")
+
+        print("\n3. The preset is part of the result-cache key...")
+
+        def key(preset, steps):
+            return ResultCache.make_key(**generator._request_params(
+                "a red cube", "", 3, generator._preset_steps(preset, steps), 7.5, 64, 64, False,
+                preset=preset
+            ))
+        keys = {preset: key(preset, 3) for preset in SPEED_PRESETS}
+        assert len(set(keys.values())) == len(SPEED_PRESETS), keys
+        assert key("balanced", 3) != key(None, SPEED_PRESETS["balanced"]["steps"])
+        assert key("final", 3) == key(None, SPEED_PRESETS["final"]["steps"])
+
+        for _ in range(100):  # result-cache stores run on the writer threads
+            if len(list((tmp / "cache").glob("*/*.png"))) == len(SPEED_PRESETS):
+                break
+            time.sleep(0.05)
+        runs = []
+        original_run = generator._run_pipeline
+        generator._run_pipeline = lambda *args, **kwargs: runs.append(1) or original_run(*args, **kwargs)
+        generator.generate(**request, preset="draft")
+        assert not runs, "Repeated draft request was not served from the cache"
+        generator.generate(**{**request, 'num_inference_steps': SPEED_PRESETS["draft"]["steps"]})
+        assert len(runs) == 1, "Request without the preset served the draft's cached image"
+        print("   ✓ Separate keys per preset; a repeat preset request hits the cache")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_speed_presets()
+        print("\n" + "=" * 70)
+        print("SPEED PRESETS TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("SPEED PRESETS TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
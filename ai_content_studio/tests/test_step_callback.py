@@ -0,0 +1,107 @@
+"""
+Test script for per-step progress, cancellation and latent previews
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import torch
+from PIL import Image
+
+from core.image_generator import ImageGenerator, GenerationCancelled
+from core.latent_preview import latents_to_rgb
+from core.result_cache import ResultCache
+from tiny_models import save_tiny_sdxl
+
+
+def test_step_callback():
+    """Test progress counts, mid-run cancellation and the latent preview image"""
+    print("=" * 70)
+    print("Testing Step Callback")
+    print("=" * 70)
+
+    print("\n1. The latent preview is an RGB image at latent resolution...")
+    latents = torch.randn(2, 4, 12, 16)
+    for is_sdxl in (True, False):
+        preview = latents_to_rgb(latents, is_sdxl, index=1)
+        assert isinstance(preview, Image.Image)
+        assert preview.mode == "RGB" and preview.size == (16, 12), (preview.mode, preview.size)
+    print("   ✓ 16x12 RGB preview for 96x128 px latents")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        cache = ResultCache(tmp / "cache")
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"},
+                                   result_cache=cache)
+        output_dir = tmp / "output"
+        request = dict(prompt="a red cube", num_inference_steps=4, width=64, height=64,
+                       seed=3, output_dir=output_dir)
+
+        print("\n2. Progress is reported once per step...")
+        progress, previews = [], []
+        path = generator.generate(
+            **request,
+            progress_callback=lambda done, total: progress.append((done, total)),
+            preview_callback=previews.append, preview_interval=2,
+        )
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)], progress
+        assert len(previews) == 2, f"{len(previews)} previews for 4 steps every 2"
+        side = 64 // generator.pipe.vae_scale_factor
+        assert all(p.mode == "RGB" and p.size == (side, side) for p in previews)
+        assert path.exists()
+        print(f"   ✓ Steps {progress}, 2 previews of {side}x{side}")
+
+        print("\n3. Setting the cancel event stops the run partway...")
+        cancel = threading.Event()
+        progress = []
+
+        def on_progress(done, total):
+            progress.append(done)
+            if done == 2:
+                cancel.set()
+
+        for _ in range(100):  # result-cache stores run on the writer threads
+            if list(cache.cache_dir.glob("*/*.png")):
+                break
+            time.sleep(0.05)
+        files_before = set(output_dir.glob("*"))
+        cached_before = set(cache.cache_dir.glob("*/*.png"))
+        try:
+            generator.generate(**{**request, 'seed': 4}, progress_callback=on_progress,
+                               cancel_event=cancel)
+            raise AssertionError("Expected GenerationCancelled")
+        except GenerationCancelled:
+            pass
+        assert progress == [1, 2], progress
+        assert set(output_dir.glob("*")) == files_before, "cancelled run wrote a file"
+        assert set(cache.cache_dir.glob("*/*.png")) == cached_before, "cancelled run was cached"
+        print("   ✓ Cancelled after 2 of 4 steps; no file, no cache entry")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_step_callback()
+        print("\n" + "=" * 70)
+        print("STEP CALLBACK TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("STEP CALLBACK TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
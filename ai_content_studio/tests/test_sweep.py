@@ -0,0 +1,141 @@
+"""
+Test script for parameter sweeps (XY grids)
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from core.image_generator import ImageGenerator
+from core.result_cache import ResultCache
+from core.sweep import plan_sweep, group_cells
+from tiny_models import save_tiny_sdxl
+
+
+def test_sweep():
+    """Test sweep planning, shared encoding and batching, contact sheet and caching"""
+    print("=" * 70)
+    print("Testing Parameter Sweep")
+    print("=" * 70)
+
+    print("\n1. Cells are grouped by what a pipeline call can share...")
+    base = dict(prompt="p", negative_prompt="n", seed=None, guidance_scale=7.0,
+                num_inference_steps=20, preset=None, clip_skip=None, width=64, height=64)
+    cells = plan_sweep(base, {'seed': [1, 2, 3], 'guidance_scale': [4.0, 8.0],
+                              'num_inference_steps': [10, 20]})
+    assert len(cells) == 12
+    assert cells[1].values == {'seed': 1, 'guidance_scale': 4.0, 'num_inference_steps': 20}
+    groups = group_cells(cells)
+    assert len(groups) == 4 and all(len(group) == 3 for group in groups)
+    assert {cell.params['seed'] for cell in groups[0]} == {1, 2, 3}
+    presets = group_cells(plan_sweep(base, {'preset': ["draft", None], 'guidance_scale': [4.0, 8.0]}))
+    assert [group[0].params['preset'] for group in presets] == ["draft", "draft", None, None]
+    try:
+        plan_sweep(base, {'sampler': ["euler"]})
+        raise AssertionError("Unknown axis accepted")
+    except ValueError:
+        pass
+    print(f"   ✓ 12 cells -> {len(groups)} pipeline groups; presets run back to back")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        output_dir = tmp / "output"
+        generator = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"},
+                                   result_cache=ResultCache(tmp / "cache"))
+        generator.load_model()
+
+        encodes = []
+        original_encode = generator.pipe.encode_prompt
+
+        def counting_encode(*args, **kwargs):
+            # The pipelines call encode_prompt(prompt=None) to pass precomputed embeddings through
+            if kwargs.get("prompt") is not None:
+                encodes.append(kwargs["prompt"])
+            return original_encode(*args, **kwargs)
+
+        calls = []
+        original_run = generator._run_pipeline
+
+        def counting_run(*args, **kwargs):
+            calls.append(len(kwargs["prompts"]))
+            return original_run(*args, **kwargs)
+
+        generator.pipe.encode_prompt = counting_encode
+        generator._run_pipeline = counting_run
+
+        print("\n2. A seed x guidance sweep encodes once and batches the seeds...")
+        axes = {'guidance_scale': [3.0, 6.0], 'seed': [1, 2, 3]}
+        progress = []
+        result = generator.sweep(
+            "a red cube", axes, num_inference_steps=2, width=64, height=64,
+            output_dir=output_dir, max_batch_size=4,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+        assert calls == [3, 3], calls
+        assert len(encodes) == 1, encodes  # the default negative was encoded by load_model()
+        assert result.timings['pipeline_calls'] == 2
+        assert progress[-1] == (4, 4), progress
+        print(f"   ✓ 6 images in {len(calls)} calls, {len(encodes)} new text encodes")
+
+        print("\n3. Cells match single generations and are saved...")
+        cell = result.cells[4]
+        assert cell.values == {'guidance_scale': 6.0, 'seed': 2}
+        single = original_run(
+            [generator._enhance_prompt("a red cube")], [generator._enhance_negative_prompt("")],
+            [2], 2, 6.0, 64, 64
+        )[0]
+        assert np.array_equal(np.asarray(cell.image), np.asarray(single))
+        assert all(path.exists() for path in result.paths)
+        assert all(cell.timings['micro_batch'] == 3 for cell in result.cells)
+        print("   ✓ Batched cell == generate() with the same seed")
+
+        print("\n4. The contact sheet holds the labelled grid...")
+        sheet = result.contact_sheet
+        assert result.contact_sheet_path.exists()
+        assert sheet.width > 3 * 64 and sheet.height > 2 * 64, sheet.size
+        assert "cfg=3.0" in result.report() and "total" in result.report()
+        print(f"   ✓ {sheet.width}x{sheet.height} sheet at {result.contact_sheet_path.name}")
+
+        print("\n5. Repeating a seeded sweep is served from the result cache...")
+        calls.clear()
+        again = generator.sweep("a red cube", axes, num_inference_steps=2, width=64, height=64,
+                                output_dir=output_dir)
+        assert calls == [] and again.timings['pipeline_calls'] == 0
+        assert all(cell.timings.get('cached') for cell in again.cells)
+        print("   ✓ No pipeline calls")
+
+        print("\n6. Without a seed axis all cells share one random seed...")
+        unseeded = generator.sweep("a red cube", {'num_inference_steps': [1, 2]},
+                                   width=64, height=64, save_images=False)
+        seeds = {cell.params['seed'] for cell in unseeded.cells}
+        assert len(seeds) == 1 and None not in seeds
+        assert unseeded.contact_sheet_path is None
+        print(f"   ✓ Seed {seeds.pop()} used for every cell")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_sweep()
+        print("\n" + "=" * 70)
+        print("PARAMETER SWEEP TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("PARAMETER SWEEP TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
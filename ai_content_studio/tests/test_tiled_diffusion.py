@@ -0,0 +1,126 @@
+"""
+Test script for tiled generation above the native resolution
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py (native
+size 64 px), so it runs offline in a few seconds.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from core.image_generator import ImageGenerator
+from core.tiled_diffusion import tile_positions, blend_weights, snapshot_native_size
+from tiny_models import save_tiny_sdxl
+
+
+def test_tiled_diffusion():
+    """Test tile layout, bounded UNet/VAE input sizes and tiled output"""
+    print("=" * 70)
+    print("Testing Tiled Generation")
+    print("=" * 70)
+
+    print("\n1. Tiles cover the latent with full-size windows...")
+    assert tile_positions(32, 32, 24) == [0]
+    assert tile_positions(100, 32, 24) == [0, 24, 48, 68]
+    weights = blend_weights(32, 32, overlap=8)
+    assert weights.shape == (1, 1, 32, 32)
+    assert weights.min() > 0 and weights[0, 0, 16, 16] == 1.0
+    print("   ✓ Last tile aligned to the edge, weights feathered and positive")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir, _ = save_tiny_sdxl(Path(tmp))
+        generator = ImageGenerator(
+            model_name=str(base_dir), tile_size=64, hardware_config={'device': "cpu"}
+        )
+        generator.load_model()
+        pipe = generator.pipe
+
+        print("\n2. Only sizes above the tile size are tiled...")
+        assert generator._tile_size(64, 64) is None
+        assert generator._tile_size(160, 96) == 64
+        assert generator._tile_size(64, 64, tiled=True) == 64
+        params = generator._request_params("p", "n", 1, 4, 5.0, 64, 64, False)
+        assert 'tile_size' not in params
+        print("   ✓ Native-size requests keep their cache keys")
+
+        print("\n3. The default tile size is the model's native size...")
+        default = ImageGenerator(model_name=str(base_dir), hardware_config={'device': "cpu"})
+        assert default.tile_size == 64, "from the configs on disk before the load"
+        default.pipe = pipe
+        assert default.tile_size == 64, "from the loaded UNet and VAE"
+        default.pipe = None
+        # SD 2.1 is 768-native: a 768 px request must not be tiled
+        sd21 = Path(tmp) / "sd21"
+        for name, config in (("unet", {'sample_size': 96}),
+                             ("vae", {'block_out_channels': [128, 256, 512, 512]})):
+            (sd21 / name).mkdir(parents=True)
+            (sd21 / name / "config.json").write_text(json.dumps(config))
+        assert snapshot_native_size(sd21) == 768
+        assert snapshot_native_size(Path(tmp) / "missing") is None
+        sd21_generator = ImageGenerator(model_name=str(sd21), hardware_config={'device': "cpu"})
+        assert sd21_generator._tile_size(768, 768) is None
+        assert sd21_generator._tile_size(1024, 768) == 768
+        print("   ✓ 64 px for the tiny model, 768 px for an SD 2.1 layout")
+
+        print("\n4. UNet and VAE never see more than one tile...")
+        unet_sizes, vae_sizes = [], []
+        hooks = [
+            pipe.unet.register_forward_pre_hook(
+                lambda module, args: unet_sizes.append(tuple(args[0].shape[-2:]))
+            ),
+            pipe.vae.decoder.register_forward_pre_hook(
+                lambda module, args: vae_sizes.append(tuple(args[0].shape[-2:]))
+            ),
+        ]
+        steps = 4
+        progress = []
+        try:
+            image = generator._run_pipeline(
+                ["a red cube"], ["blurry"], [7], steps, 5.0, 160, 96,
+                step_callback=generator._make_step_callback(
+                    steps, 1, progress_callback=lambda done, total: progress.append(done)
+                )
+            )[0]
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        tile_latent = 64 // pipe.vae_scale_factor
+        assert image.size == (160, 96), image.size
+        assert max(max(size) for size in unet_sizes) <= tile_latent, unet_sizes
+        assert max(max(size) for size in vae_sizes) <= tile_latent, vae_sizes
+        assert len(unet_sizes) == steps * 6, len(unet_sizes)  # 3 x 2 tiles per step
+        assert progress == list(range(1, steps + 1)), progress
+        print(f"   ✓ 160x96 image from {len(unet_sizes) // steps} tiles per step, "
+              f"largest UNet input {max(unet_sizes)}")
+
+        print("\n5. Seeded tiled generation is deterministic...")
+        again = generator._run_pipeline(["a red cube"], ["blurry"], [7], steps, 5.0, 160, 96)[0]
+        assert np.array_equal(np.asarray(again), np.asarray(image))
+        print("   ✓ Same seed, same image")
+
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_tiled_diffusion()
+        print("\n" + "=" * 70)
+        print("TILED GENERATION TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("TILED GENERATION TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,134 @@
+"""
+Test script for tiny-VAE drafts, previews and full re-decoding
+
+Uses the tiny randomly-initialized SDXL base and tiny autoencoder from
+tiny_models.py, so it runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from core.image_generator import ImageGenerator
+from core.model_registry import get_registry
+from core.tiny_vae import DraftLatentStore, get_draft_latents
+from tiny_models import save_tiny_sdxl, save_tiny_taesd
+
+
+def _pixels(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_tiny_vae():
+    """Test draft decoding, tiny-VAE previews, redecode() and the latent store"""
+    print("=" * 70)
+    print("Testing Tiny-VAE Drafts")
+    print("=" * 70)
+
+    print("\n1. Draft latent store...")
+    import torch
+    store = DraftLatentStore(max_entries=2)
+    for i in range(3):
+        store.put(f"key{i}", torch.full((1, 4, 2, 2), float(i)), {'seed': i})
+        store.link(Path(f"draft{i}.png"), f"key{i}")
+    assert store.get(Path("draft0.png")) is None, "oldest draft should be evicted"
+    latents, params = store.get(Path("draft2.png"))
+    assert params == {'seed': 2} and latents.dtype == torch.float32
+    store.link(Path("unknown.png"), "missing")
+    assert store.get(Path("unknown.png")) is None
+    print("   ✓ LRU eviction, path links")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        vae_dir = save_tiny_taesd(tmp)
+        generator = ImageGenerator(
+            model_name=str(base_dir), hardware_config={'device': "cpu"}, tiny_vae_model=str(vae_dir)
+        )
+        request = dict(prompt="a red cube", num_inference_steps=4, width=64, height=64,
+                       output_dir=tmp / "out")
+
+        print("\n2. Drafts decode with the tiny VAE and keep their latents...")
+        previews = []
+        draft = generator.generate(**request, seed=5, tiny_vae=True,
+                                   preview_callback=previews.append, preview_interval=2)
+        assert get_registry().get(generator._tiny_vae_key()) is not None, "tiny VAE not resident"
+        assert get_draft_latents().get(draft) is not None
+        # Tiny-VAE previews are full size (the projection is latent size)
+        assert [preview.size for preview in previews] == [(64, 64), (64, 64)], previews
+        print(f"   ✓ Draft {draft.name}, {len(previews)} tiny-VAE previews")
+
+        print("\n3. redecode() matches a full render without denoising again...")
+        runs = []
+        original_run = ImageGenerator._run_pipeline
+
+        def counting_run(self, *args, **kwargs):
+            runs.append(1)
+            return original_run(self, *args, **kwargs)
+
+        ImageGenerator._run_pipeline = counting_run
+        try:
+            final = generator.redecode(draft, output_dir=tmp / "out")
+        finally:
+            ImageGenerator._run_pipeline = original_run
+        assert runs == [], "redecode() must not run the pipeline"
+        full = generator.generate(**request, seed=5)
+        assert np.array_equal(_pixels(final), _pixels(full))
+        assert not np.array_equal(_pixels(draft), _pixels(full))
+        print(f"   ✓ {final.name} equals the full render")
+
+        print("\n4. The draft preset uses the tiny VAE; unseeded drafts get a seed...")
+        paths = generator.generate_batch(["a red cube", "a blue sphere"], num_inference_steps=2,
+                                         width=64, height=64, output_dir=tmp / "out",
+                                         preset="draft")
+        drafts = [get_draft_latents().get(path) for path in paths]
+        assert all(entry is not None for entry in drafts)
+        assert all(params['seed'] is not None and params['vae'] == str(vae_dir)
+                   for _, params in drafts)
+        assert generator.redecode(paths[1], output_dir=tmp / "out").exists()
+        print("   ✓ Batch drafts kept with their seeds and re-decoded")
+
+        print("\n5. Errors and fallbacks...")
+        try:
+            generator.redecode(full)
+            raise AssertionError("Expected ValueError for a non-draft image")
+        except ValueError as e:
+            print(f"   ✓ Non-draft rejected: {e}")
+
+        missing = ImageGenerator(
+            model_name=str(base_dir), hardware_config={'device': "cpu"},
+            tiny_vae_model=str(tmp / "no-such-vae")
+        )
+        fallback = missing.generate(**request, seed=5, tiny_vae=True)
+        assert np.array_equal(_pixels(fallback), _pixels(full))
+        assert get_draft_latents().get(fallback) is None
+        print("   ✓ Missing tiny VAE falls back to the full decode")
+
+        generator.unload_model()
+        assert generator.pipe is None
+        assert get_registry().get(generator._tiny_vae_key()) is not None, "shared tiny VAE evicted"
+        missing.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_tiny_vae()
+        print("\n" + "=" * 70)
+        print("TINY VAE TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("TINY VAE TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
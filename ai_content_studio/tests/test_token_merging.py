@@ -0,0 +1,149 @@
+"""
+Test script for token merging in the UNet self-attention blocks
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import torch
+from PIL import Image
+
+from core.image_generator import ImageGenerator
+from core.token_merging import TokenMerging, bipartite_soft_matching, is_token_merged
+from tiny_models import save_tiny_sdxl
+
+
+def _pixels(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_token_merging():
+    """Test merge/unmerge, the reversible UNet patch and ImageGenerator integration"""
+    print("=" * 70)
+    print("Testing Token Merging")
+    print("=" * 70)
+
+    print("\n1. Merging and unmerging tokens...")
+    generator = torch.Generator().manual_seed(0)
+    grid = torch.randn(2, 4, 4, 8, generator=generator)
+    # Every 2x2 window holds four copies of one token
+    tokens = grid.repeat_interleave(2, dim=1).repeat_interleave(2, dim=2).reshape(2, 64, 8)
+    merge, unmerge = bipartite_soft_matching(tokens, 8, 8, 2, 48, generator)
+    merged = merge(tokens)
+    assert merged.shape == (2, 16, 8), merged.shape
+    assert torch.allclose(unmerge(merged), tokens, atol=1e-6), "duplicates should round-trip"
+
+    noise = torch.randn(2, 64, 8, generator=generator)
+    merge, unmerge = bipartite_soft_matching(noise, 8, 8, 2, 200, generator)
+    assert merge(noise).shape == (2, 16, 8), "at most the non-destination tokens merge"
+    merge, unmerge = bipartite_soft_matching(noise, 8, 8, 2, 0)
+    assert merge(noise) is noise and unmerge(noise) is noise
+    print("   ✓ 64 -> 16 tokens, exact round trip for duplicate tokens")
+
+    for ratio in (-0.1, 1.0):
+        try:
+            TokenMerging(ratio)
+            raise AssertionError(f"Expected ValueError for ratio {ratio}")
+        except ValueError:
+            pass
+    print("   ✓ Invalid ratios rejected")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base_dir, _ = save_tiny_sdxl(tmp)
+        generator = ImageGenerator(
+            model_name=str(base_dir), tile_size=64, hardware_config={'device': "cpu"}
+        )
+        request = dict(prompt="a red cube", num_inference_steps=4, width=64, height=64,
+                       seed=5, output_dir=tmp / "out")
+        generator.load_model()
+        unet = generator.pipe.unet
+        attn = next(module for name, module in unet.named_modules() if name.endswith("attn1"))
+
+        # The query projection sees the tokens the attention actually runs on
+        query_tokens = []
+        handle = attn.to_q.register_forward_pre_hook(
+            lambda module, args: query_tokens.append(args[0].shape[1])
+        )
+
+        print("\n2. Patching a UNet in place is reversible...")
+        patch = TokenMerging(0.5).apply(unet)
+        assert is_token_merged(unet) and patch.active
+        assert len(attn._forward_pre_hooks) == 1 and len(attn._forward_hooks) == 1
+        TokenMerging(0.25).apply(unet)  # Replaces the previous patch
+        assert not patch.active and len(attn._forward_pre_hooks) == 1
+        unet._token_merging.remove()
+        assert not is_token_merged(unet)
+        assert not attn._forward_pre_hooks and not attn._forward_hooks
+        print("   ✓ Hooks added, replaced and removed")
+
+        print("\n3. Generation merges half of the self-attention tokens...")
+        try:
+            baseline = generator.generate(**request)
+            full_tokens = set(query_tokens)
+            query_tokens.clear()
+
+            pipe = generator.pipe
+            generator.set_token_merging(0.5)
+            merged = generator.generate(**request)
+            merged_tokens = set(query_tokens)
+            assert merged_tokens == {n // 2 for n in full_tokens}, (full_tokens, merged_tokens)
+            assert not is_token_merged(unet), "patch must be removed after the pass"
+            assert not attn._forward_pre_hooks and not attn._forward_hooks
+        finally:
+            handle.remove()
+        assert not np.array_equal(_pixels(merged), _pixels(baseline))
+        again = generator.generate(**request)
+        assert np.array_equal(_pixels(again), _pixels(merged)), "seeded output must be reproducible"
+        print(f"   ✓ {sorted(full_tokens)} -> {sorted(merged_tokens)} tokens, reproducible")
+
+        print("\n4. Turning it off restores the original output without reloading...")
+        generator.set_token_merging(0.0)
+        restored = generator.generate(**request)
+        assert generator.pipe is pipe
+        assert np.array_equal(_pixels(restored), _pixels(baseline))
+        params = generator._request_params("p", "n", 1, 4, 7.5, 64, 64, False)
+        assert 'token_merging' not in params
+        generator.set_token_merging(0.5)
+        params = generator._request_params("p", "n", 1, 4, 7.5, 64, 64, False)
+        assert params['token_merging'] == 0.5
+        try:
+            generator.set_token_merging(0.9)
+            raise AssertionError("Expected ValueError for ratio 0.9")
+        except ValueError:
+            assert generator.token_merging == 0.5
+        print("   ✓ Identical to the unpatched image; the ratio is part of the request key")
+
+        print("\n5. Edits and tiled generation run with merging too...")
+        edited = generator.generate_from_image(baseline, "a blue cube", strength=0.5,
+                                               num_inference_steps=4, seed=5, output_dir=tmp / "out")
+        tiled = generator.generate(**dict(request, width=96), tiled=True)
+        assert edited.exists() and tiled.exists() and not is_token_merged(unet)
+        print("   ✓ img2img and tiled passes")
+        generator.unload_model()
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_token_merging()
+        print("\n" + "=" * 70)
+        print("TOKEN MERGING TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("TOKEN MERGING TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,152 @@
+"""
+Test script for the background model warm-up
+
+Uses the tiny randomly-initialized SDXL base from tiny_models.py, so it
+runs offline in a few seconds.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src and the tests directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from diffusers import StableDiffusionXLPipeline
+
+from core.image_generator import ImageGenerator
+from core.warmup import WarmupService, get_warmup_service, COLD, WARMING, WARM
+from tiny_models import save_tiny_sdxl
+
+
+def test_warmup():
+    """Test warm-up states and that a concurrent generation shares the load"""
+    print("=" * 70)
+    print("Testing Model Warm-up")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir, _ = save_tiny_sdxl(Path(tmp))
+
+        def new_generator():
+            return ImageGenerator(model_name=str(base_dir), tile_size=64,
+                                  hardware_config={'device': "cpu"})
+
+        service = WarmupService()
+        states = []
+        service.add_listener(lambda state, model_name: states.append(state))
+
+        # Count pipeline loads across both generators
+        loads = []
+        original_load = ImageGenerator._load_pipelines
+        loading = threading.Event()
+
+        def counting_load(self):
+            loads.append(self)
+            loading.set()
+            return original_load(self)
+
+        ImageGenerator._load_pipelines = counting_load
+        try:
+            print("\n1. Warm-up runs in the background...")
+            warm_generator = new_generator()
+            assert service.state == COLD
+            assert service.start(warm_generator)
+            assert not service.start(new_generator()), "Second warm-up started"
+            assert loading.wait(60)
+            print(f"   ✓ State while loading: {service.state}")
+
+            print("\n2. A generation during warm-up waits on the same load...")
+            generator = new_generator()
+            generator.load_model()
+            assert service.wait(generator.model_name, timeout=120)
+            assert len(loads) == 1, f"{len(loads)} loads"
+            assert generator.pipe is warm_generator.pipe
+            print("   ✓ One pipeline load shared by warm-up and generation")
+        finally:
+            ImageGenerator._load_pipelines = original_load
+
+        print("\n3. The state ends warm...")
+        assert service.state == WARM, service.error
+        assert states == [WARMING, WARM], states
+        assert service.duration_s > 0
+        assert service.wait("another/model", timeout=0)
+        print(f"   ✓ States: {' -> '.join(states)} in {service.duration_s:.1f}s")
+
+        generator.unload_model()
+
+        print("\n4. An image-tab generation during warm-up reuses its load...")
+        # A fresh model directory, so nothing is resident in the registry yet
+        model_dir, _ = save_tiny_sdxl(Path(tmp) / "tab")
+        pretrained = []
+        release = threading.Event()
+        original_from_pretrained = StableDiffusionXLPipeline.from_pretrained
+
+        def counting_from_pretrained(*args, **kwargs):
+            pretrained.append(args[0])
+            release.wait(60)  # Hold the load so the generation starts while warming
+            return original_from_pretrained(*args, **kwargs)
+
+        StableDiffusionXLPipeline.from_pretrained = staticmethod(counting_from_pretrained)
+        try:
+            service = get_warmup_service()
+            warm_generator = ImageGenerator(model_name=str(model_dir), tile_size=64,
+                                            hardware_config={'device': "cpu"})
+            assert service.start(warm_generator)
+            assert service.state == WARMING
+
+            # Same sequence as ImageGenerationWorker.run()
+            results = []
+
+            def tab_generation():
+                service.wait(str(model_dir))
+                tab_generator = ImageGenerator(model_name=str(model_dir), tile_size=64,
+                                               hardware_config={'device': "cpu"})
+                results.extend(tab_generator.generate_batch(
+                    prompts=["a red cube"], num_inference_steps=2, width=64, height=64,
+                    seeds=[1], output_dir=Path(tmp) / "output"
+                ))
+                tab_generator.unload_model()
+
+            worker = threading.Thread(target=tab_generation)
+            worker.start()
+            worker.join(0.5)
+            assert worker.is_alive() and service.state == WARMING
+            release.set()
+            worker.join(120)
+            assert not worker.is_alive()
+        finally:
+            del StableDiffusionXLPipeline.from_pretrained  # Back to the inherited classmethod
+            release.set()
+
+        assert len(results) == 1 and results[0].exists()
+        assert len(pretrained) == 1, f"{len(pretrained)} from_pretrained calls"
+        assert service.state == WARM, service.error
+        warm_generator.unload_model()
+        print("   ✓ One from_pretrained call for warm-up and generation")
+
+    print("\n5. Failed warm-ups fall back to cold...")
+    service = WarmupService()
+    service.start(ImageGenerator(model_name=str(Path(tmp) / "missing"),
+                                 hardware_config={'device': "cpu"}))
+    assert service.wait(timeout=60)
+    assert service.state == COLD and service.error
+    print("   ✓ Error recorded, models load on demand")
+
+    print(f"\n✓ Test completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        test_warmup()
+        print("\n" + "=" * 70)
+        print("MODEL WARM-UP TEST: PASSED")
+        print("=" * 70)
+    except Exception as e:
+        print(f"\n✗ Test failed with error: {e}")
+        print("\n" + "=" * 70)
+        print("MODEL WARM-UP TEST: FAILED")
+        print("=" * 70)
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""
+Tiny Models - Randomly-initialized SDXL pipelines for offline tests
+
+Uses the SD 1.5 tokenizer shipped in models/3d_cache with shrunken UNet,
+VAE and text-encoder configs, so pipeline tests run without downloads in
+a few seconds. Images are noise; shapes, plumbing and timings are real.
+"""
+
+from pathlib import Path
+
+import torch
+
+BASE_DIR = Path(__file__).parent.parent
+
+# SD 1.5 tokenizer shipped in models/3d_cache (no weights needed)
+LOCAL_SD15_REPO = BASE_DIR / "models" / "3d_cache" / "models--runwayml--stable-diffusion-v1-5"
+
+
+def _tiny_unet(cross_attention_dim: int, time_ids: int):
+    from diffusers import UNet2DConditionModel
+    return UNet2DConditionModel(
+        block_out_channels=(32, 64),
+        layers_per_block=2,
+        sample_size=32,
+        in_channels=4,
+        out_channels=4,
+        down_block_types=("DownBlock2D", "CrossAttnDownBlock2D"),
+        up_block_types=("CrossAttnUpBlock2D", "UpBlock2D"),
+        attention_head_dim=(2, 4),
+        use_linear_projection=True,
+        addition_embed_type="text_time",
+        addition_time_embed_dim=8,
+        transformer_layers_per_block=(1, 2),
+        projection_class_embeddings_input_dim=time_ids * 8 + 32,
+        cross_attention_dim=cross_attention_dim,
+    )
+
+
+def save_tiny_sdxl(directory: Path) -> tuple:
+    """
+    Save a tiny SDXL base and refiner
+
+    Returns:
+        Tuple (base_dir, refiner_dir)
+    """
+    from diffusers import (
+        AutoencoderKL, EulerDiscreteScheduler, StableDiffusionXLPipeline,
+        StableDiffusionXLImg2ImgPipeline
+    )
+    from transformers import (
+        CLIPTextConfig, CLIPTextModel, CLIPTextModelWithProjection, CLIPTokenizer
+    )
+
+    snapshot = sorted((LOCAL_SD15_REPO / "snapshots").iterdir())[0]
+    tokenizer = CLIPTokenizer.from_pretrained(snapshot / "tokenizer")
+    torch.manual_seed(0)
+
+    text_config = CLIPTextConfig(
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+        hidden_size=32,
+        intermediate_size=37,
+        num_attention_heads=4,
+        num_hidden_layers=5,
+        vocab_size=tokenizer.vocab_size,
+        projection_dim=32,
+    )
+    vae = AutoencoderKL(
+        block_out_channels=[32, 64],
+        in_channels=3,
+        out_channels=3,
+        down_block_types=["DownEncoderBlock2D", "DownEncoderBlock2D"],
+        up_block_types=["UpDecoderBlock2D", "UpDecoderBlock2D"],
+        latent_channels=4,
+        sample_size=64,
+    )
+    scheduler = EulerDiscreteScheduler(
+        beta_start=0.00085, beta_end=0.012, beta_schedule="scaled_linear",
+        timestep_spacing="leading", steps_offset=1,
+    )
+    text_encoder_2 = CLIPTextModelWithProjection(text_config)
+
+    base = StableDiffusionXLPipeline(
+        vae=vae,
+        text_encoder=CLIPTextModel(text_config),
+        text_encoder_2=text_encoder_2,
+        tokenizer=tokenizer,
+        tokenizer_2=tokenizer,
+        unet=_tiny_unet(cross_attention_dim=64, time_ids=6),
+        scheduler=scheduler,
+    )
+    refiner = StableDiffusionXLImg2ImgPipeline(
+        vae=vae,
+        text_encoder=None,
+        text_encoder_2=text_encoder_2,
+        tokenizer=None,
+        tokenizer_2=tokenizer,
+        unet=_tiny_unet(cross_attention_dim=32, time_ids=5),
+        scheduler=scheduler,
+        requires_aesthetics_score=True,
+        force_zeros_for_empty_prompt=False,
+    )
+
+    base_dir = directory / "tiny-sdxl-base"
+    refiner_dir = directory / "tiny-sdxl-refiner"
+    base.save_pretrained(base_dir)
+    refiner.save_pretrained(refiner_dir)
+    return base_dir, refiner_dir
+
+
+def save_tiny_taesd(directory: Path) -> Path:
+    """
+    Save a tiny AutoencoderTiny matching the tiny SDXL VAE (2x latent scale)
+
+    Returns:
+        Model directory
+    """
+    from diffusers import AutoencoderTiny
+
+    torch.manual_seed(0)
+    vae = AutoencoderTiny(
+        encoder_block_out_channels=(8, 8),
+        decoder_block_out_channels=(8, 8),
+        num_encoder_blocks=(1, 1),
+        num_decoder_blocks=(1, 1),
+        latent_channels=4,
+    )
+    vae_dir = directory / "tiny-taesd"
+    vae.save_pretrained(vae_dir)
+    return vae_dir